@@ -0,0 +1,117 @@
+# ====================================================
+# Artifact Cache for Smart Foot Traffic Chart Generators
+# ----------------------------------------------------
+# - @cached_artifact(kind, path_fn) wraps a generator that writes
+#   one file; the call's arguments are the artifact's params
+# - Checked before any query or render: a call returns the stored
+#   path while the file exists and the artifact manifest has it at
+#   the current data version (per date by default, any version
+#   function for other inputs, e.g. a forecast's training window)
+# - New data bumps the version, so the next call rebuilds
+# - Hits are remembered in memory per (kind, params), so a repeat
+#   costs one data version lookup (cached_data_version, TTL) and
+#   a stat(); force=True always rebuilds
+# - Lookups (hit / stale / miss) per kind go to /metrics
+# - CACHED_ARTIFACTS: kind -> wrapped generator, for callers that
+#   need the path or freshness without generating
+# ====================================================
+
+import functools
+import inspect
+import os
+from threading import Lock
+
+import mysql.connector
+from rich.console import Console
+
+from backend.db.artifact_manifest import is_artifact_current, params_key, record_artifact
+from backend.db.data_versions import cached_data_version
+from backend.utils.metrics import GENERATIONS, registry
+
+console = Console()
+
+ARTIFACT_LOOKUPS = registry.counter(
+    "sft_artifact_cache_lookups_total",
+    "Chart artifact cache lookups per kind and result (hit, stale, miss)",
+    ("kind", "result")
+)
+
+CACHED_ARTIFACTS = {}   # kind -> wrapped generator
+
+_known = {}             # (kind, params key) -> (version, path) last seen current
+_known_lock = Lock()
+
+# Default version: the data version of the params' date
+def date_version(params):
+    return cached_data_version(params["date"])
+
+def _bind(signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            params.update(value)
+        else:
+            params[name] = value
+    return bound, params
+
+# =====================================================
+# FUNCTION: Is this artifact current?
+# Returns "hit", "stale" (file outdated) or "miss" (no file)
+# =====================================================
+def lookup_artifact(kind, path, params, version):
+    if not os.path.exists(path):
+        return "miss"
+
+    key = (kind, params_key(params)[0])
+    with _known_lock:
+        known = _known.get(key)
+    if known == (version, path) or is_artifact_current(kind, params, version):
+        with _known_lock:
+            _known[key] = (version, path)
+        return "hit"
+    return "stale"
+
+def remember_artifact(kind, params, version, path):
+    record_artifact(kind, params, version, path)
+    with _known_lock:
+        _known[(kind, params_key(params)[0])] = (version, path)
+
+# =====================================================
+# DECORATOR: Check-before-compute for one artifact kind
+# path_fn(**params) -> file path, version(params) -> int
+# The generator returns its path (falsy = nothing written)
+# =====================================================
+def cached_artifact(kind, path_fn, version=date_version):
+    def decorator(generate):
+        signature = inspect.signature(generate)
+
+        @functools.wraps(generate)
+        def wrapper(*args, force=False, **kwargs):
+            bound, params = _bind(signature, args, kwargs)
+            path = str(path_fn(**params))
+            current_version = version(params)
+
+            result = "miss" if force else lookup_artifact(kind, path, params, current_version)
+            ARTIFACT_LOOKUPS.inc(kind=kind, result=result)
+            if result == "hit":
+                GENERATIONS.inc(generator=kind, outcome="cached")
+                return path
+
+            # The file is written either way; a failed manifest update
+            # only means the next call rebuilds it
+            output = generate(*bound.args, **bound.kwargs)
+            if output and os.path.exists(path):
+                try:
+                    remember_artifact(kind, params, current_version, path)
+                except mysql.connector.Error as e:
+                    console.print(f"[red]Manifest update failed:[/red] {e}")
+            return output
+
+        wrapper.kind = kind
+        wrapper.artifact_path = path_fn
+        wrapper.artifact_version = version
+        CACHED_ARTIFACTS[kind] = wrapper
+        return wrapper
+    return decorator
@@ -0,0 +1,137 @@
+# ====================================================
+# Chart Specs (JSON) for Smart Foot Traffic
+# ----------------------------------------------------
+# - Line, bar, pie and forecast charts as Plotly figure JSON
+#   instead of one full HTML page per parameter combination
+# - Specs are written as small artifacts (charts/*.json, with
+#   .gz/.br siblings) and reused while the manifest entry matches
+#   the date's data version (forecasts: the training window's),
+#   checked through artifact_cache before any query
+# - charts/viewer.html is one static page that draws any spec,
+#   swapping charts without a reload (templates/chart_viewer.js)
+# - Used by /api/chart/<kind>
+# ====================================================
+
+import json
+import os
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+
+from backend.analytics.artifact_cache import cached_artifact, date_version
+from backend.analytics.chart_template import wrap_plotly_chart
+from backend.analytics.daily_linechart import line_chart_figure
+from backend.analytics.distribution_pie import pie_chart_figure
+from backend.analytics.generate_barchart import bar_chart_figure
+from backend.analytics.model import build_forecast_figure, training_data_version
+from backend.analytics.statistics import summary_key
+from backend.db.artifact_manifest import params_key
+from backend.utils.artifacts import write_artifact
+from backend.utils.metrics import stage_timer
+from backend.visualizer.services.template_renderer import TEMPLATE_DIR, minify_html
+
+CHART_VIEWER_JS_PATH = os.path.join(TEMPLATE_DIR, "chart_viewer.js")
+CHART_VIEWER_FILE = os.path.join("charts", "viewer.html")
+
+# kind -> (required params, figure builder, title)
+CHART_KINDS = {
+    "line_chart": (
+        ("date", "traffic_type"),
+        line_chart_figure,
+        lambda date, traffic_type: f"{traffic_type} — {date}"
+    ),
+    "bar_chart": (
+        ("date", "time", "traffic_type"),
+        bar_chart_figure,
+        lambda date, time, traffic_type: f"{traffic_type} — {date} at {time}"
+    ),
+    "pie_chart": (
+        ("date",),
+        pie_chart_figure,
+        lambda date: f"Traffic Distribution Dashboard — {date}"
+    ),
+    "forecast": (
+        ("traffic_type",),
+        build_forecast_figure,
+        lambda traffic_type: f"{traffic_type} — Forecast Chart"
+    )
+}
+
+# =====================================================
+# FUNCTION: Validate chart parameters
+# Returns only the kind's parameters, times as HH:MM:SS
+# Raises ValueError for unknown kinds / missing params
+# =====================================================
+def normalize_chart_params(kind, params):
+    if kind not in CHART_KINDS:
+        raise ValueError(f"Unknown chart kind: {kind}. Expected one of {sorted(CHART_KINDS)}")
+
+    required = CHART_KINDS[kind][0]
+    missing = [name for name in required if not params.get(name)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)} for {kind}")
+
+    normalized = {name: params[name] for name in required}
+    if "time" in normalized:
+        normalized["time"] = summary_key(normalized["date"], normalized["time"], None)[1]
+    return normalized
+
+# charts/{kind}_{params hash}.json
+def chart_spec_path(kind, params):
+    return os.path.join("charts", f"{kind}_{params_key(params)[0][:16]}.json")
+
+# Compact spec: {"kind", "title", "figure": {"data", "layout"}}
+def build_chart_spec(kind, params):
+    _, build_figure, title = CHART_KINDS[kind]
+    fig = build_figure(**params)
+    if fig is None:
+        return None
+    figure_json = pio.to_json(fig, validate=False, pretty=False, remove_uids=True)
+    return (
+        f'{{"kind":{json.dumps(kind)},"title":{json.dumps(title(**params), ensure_ascii=False)},'
+        f'"figure":{figure_json}}}'
+    )
+
+# Forecast specs follow the forecast's training window, the rest their date
+SPEC_VERSIONS = {"forecast": training_data_version}
+
+def _spec_generator(kind):
+    def write_spec(**params):
+        with stage_timer(f"{kind}_spec", "render"):
+            spec = build_chart_spec(kind, params)
+        if spec is None:
+            return None
+
+        path = chart_spec_path(kind, params)
+        with stage_timer(f"{kind}_spec", "save"):
+            write_artifact(path, spec)
+        return path
+
+    return cached_artifact(
+        f"{kind}_spec",
+        lambda **params: chart_spec_path(kind, params),
+        version=SPEC_VERSIONS.get(kind, date_version)
+    )(write_spec)
+
+SPEC_GENERATORS = {kind: _spec_generator(kind) for kind in CHART_KINDS}
+
+# Path of an up-to-date chart spec, built if missing or stale; None when there is no data
+def get_chart_spec(kind, params):
+    return SPEC_GENERATORS[kind](**params)
+
+# =====================================================
+# FUNCTION: Render the static chart viewer page
+# =====================================================
+def render_chart_viewer_html():
+    with open(CHART_VIEWER_JS_PATH, "r", encoding="utf-8") as f:
+        viewer_js = minify_html(f.read())
+    body = (
+        '<div id="chart"></div>'
+        f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+        f"<script>{viewer_js}</script>"
+        "<script>startChartViewer();</script>"
+    )
+    return minify_html(wrap_plotly_chart(body, "Loading chart…"))
+
+def write_chart_viewer_page(path=CHART_VIEWER_FILE):
+    return write_artifact(path, render_chart_viewer_html())
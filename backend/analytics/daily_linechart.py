@@ -1,20 +1,20 @@
 import os
-import mysql.connector
+import time
 import plotly.graph_objects as go
 from rich.console import Console
+from backend.analytics.artifact_cache import cached_artifact
 from backend.analytics.chart_template import wrap_plotly_chart
-from backend.config import DB_CONFIG
+from backend.db.connection import get_connection
+from backend.utils.artifacts import write_artifact
+from backend.utils.metrics import GENERATIONS, observe_stage, stage_timer
 
 console = Console()
 
-def generate_line_charts_combined(date: str, traffic_type: str) -> str:
-    console.print(f"\n[bold magenta]========== Generating Combined Line Chart ==========[/bold magenta]")
-    console.print(f"Traffic Type: {traffic_type} | Date: {date}")
-
+# {location: {"time": ['HH:MM', ...], "count": [...]}} for one day and type
+def fetch_line_chart_data(date: str, traffic_type: str) -> dict:
+    connection = get_connection()
+    cursor = connection.cursor(dictionary=True)
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor(dictionary=True)
-
         cursor.execute("""
             SELECT 
                 pd.Location,
@@ -25,89 +25,108 @@ def generate_line_charts_combined(date: str, traffic_type: str) -> str:
             WHERE DATE(pd.Date_Time) = %s AND tc.Traffic_Type = %s
             ORDER BY pd.Location, pd.Date_Time
         """, (date, traffic_type))
-
         rows = cursor.fetchall()
-        console.print(f"Fetched {len(rows)} rows from database.")
+    finally:
+        cursor.close()
+        connection.close()
+
+    console.print(f"Fetched {len(rows)} rows from database.")
+    location_data = {}
+    for row in rows:
+        loc = row['Location']
+        if loc not in location_data:
+            location_data[loc] = {"time": [], "count": []}
+        location_data[loc]["time"].append(row['time_label'])
+        location_data[loc]["count"].append(row['Interval_Count'])
+    return location_data
+
+# One trace per location, a dropdown switches between them
+def build_line_chart_figure(location_data: dict, date: str, traffic_type: str) -> go.Figure:
+    fig = go.Figure()
+    buttons = []
+    all_locations = list(location_data.keys())
+
+    for i, loc in enumerate(all_locations):
+        data = location_data[loc]
+        visible_array = [False] * len(all_locations)
+        visible_array[i] = True
+
+        fig.add_trace(go.Scatter(
+            x=data["time"],
+            y=data["count"],
+            mode='lines+markers',
+            name=loc,
+            line=dict(color='#FBC02D'),
+            marker=dict(color='#FBC02D'),
+            visible=(i == 0)
+        ))
+
+        buttons.append(dict(
+            label=loc,
+            method="update",
+            args=[{"visible": visible_array},
+                  {"title": f"{traffic_type} - {loc} on {date}"}]
+        ))
+
+    fig.update_layout(
+        title_x=0.5,
+        xaxis_title="Time of Day",
+        yaxis_title="Interval Count",
+        plot_bgcolor='white',
+        margin=dict(t=10),
+        height=500,
+        updatemenus=[{
+            "buttons": buttons,
+            "direction": "down",
+            "x": -0.05,
+            "xanchor": "left",
+            "y": 1.15,
+            "yanchor": "top",
+            "showactive": True
+        }]
+    )
+    return fig
+
+# Figure for /api/chart/line_chart, None when there is no data
+def line_chart_figure(date: str, traffic_type: str):
+    location_data = fetch_line_chart_data(date, traffic_type)
+    return build_line_chart_figure(location_data, date, traffic_type) if location_data else None
+
+def line_chart_path(date: str, traffic_type: str) -> str:
+    return os.path.join("linecharts", f"line_{date}_{traffic_type.replace(' ', '')}.html")
+
+# Reused while the date's data version is unchanged (artifact_cache)
+@cached_artifact("line_chart", line_chart_path)
+def generate_line_charts_combined(date: str, traffic_type: str) -> str:
+    console.print(f"\n[bold magenta]========== Generating Combined Line Chart ==========[/bold magenta]")
+    console.print(f"Traffic Type: {traffic_type} | Date: {date}")
+
+    try:
+        with stage_timer("line_chart", "fetch"):
+            location_data = fetch_line_chart_data(date, traffic_type)
 
-        if not rows:
+        if not location_data:
             console.print("No data found for the given date and type.")
             return ""
 
-        location_data = {}
-        for row in rows:
-            loc = row['Location']
-            time_label = row['time_label']
-            count = row['Interval_Count']
-            if loc not in location_data:
-                location_data[loc] = {"time": [], "count": []}
-            location_data[loc]["time"].append(time_label)
-            location_data[loc]["count"].append(count)
-
-        os.makedirs("linecharts", exist_ok=True)
-
-        fig = go.Figure()
-        buttons = []
-        all_locations = list(location_data.keys())
-
-        for i, loc in enumerate(all_locations):
-            data = location_data[loc]
-            visible_array = [False] * len(all_locations)
-            visible_array[i] = True
-
-            fig.add_trace(go.Scatter(
-                x=data["time"],
-                y=data["count"],
-                mode='lines+markers',
-                name=loc,
-                line=dict(color='#FBC02D'),
-                marker=dict(color='#FBC02D'),
-                visible=(i == 0)
-            ))
-
-            buttons.append(dict(
-                label=loc,
-                method="update",
-                args=[{"visible": visible_array},
-                      {"title": f"{traffic_type} - {loc} on {date}"}]
-            ))
-
-        fig.update_layout(
-            title_x=0.5,
-            xaxis_title="Time of Day",
-            yaxis_title="Interval Count",
-            plot_bgcolor='white',
-            margin=dict(t=10),
-            height=500,
-            updatemenus=[{
-                "buttons": buttons,
-                "direction": "down",
-                "x": -0.05,
-                "xanchor": "left",
-                "y": 1.15,
-                "yanchor": "top",
-                "showactive": True
-            }]
-        )
-
-        safe_type = traffic_type.replace(" ", "")
-        filename = f"line_{date}_{safe_type}.html"
-        output_path = os.path.join("linecharts", filename)
+        t1 = time.perf_counter()
+        fig = build_line_chart_figure(location_data, date, traffic_type)
+
+        output_path = line_chart_path(date, traffic_type)
 
         fig_html = fig.to_html(full_html=False, include_plotlyjs='cdn')
         full_html = wrap_plotly_chart(fig_html, f"{traffic_type} — {date}")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_html)
+        observe_stage("line_chart", "render", time.perf_counter() - t1)
+
+        with stage_timer("line_chart", "save"):
+            write_artifact(output_path, full_html)
+        GENERATIONS.inc(generator="line_chart", outcome="generated")
 
         console.print(f"Chart saved to: {output_path}")
         return output_path
 
     except Exception as e:
         console.print(f"Error generating line chart: {e}")
+        GENERATIONS.inc(generator="line_chart", outcome="failed")
         return ""
-
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
@@ -1,9 +1,12 @@
 import os
-import mysql.connector
+import time
 import plotly.graph_objects as go
 from rich.console import Console
-from backend.config import DB_CONFIG
+from backend.db.connection import get_connection
+from backend.analytics.artifact_cache import cached_artifact
 from backend.analytics.chart_template import wrap_plotly_chart
+from backend.utils.artifacts import write_artifact
+from backend.utils.metrics import GENERATIONS, observe_stage, stage_timer
 
 console = Console()
 
@@ -21,14 +24,11 @@ type_color_map = {
     "Vehicle": "#8b4dff"
 }
 
-def generate_combined_pie_dashboard(date: str) -> str:
-    console.print(f"\n[bold magenta]========== Generating Pie Chart Dashboard ==========[/bold magenta]")
-    console.print(f"Date: [green]{date}[/green]")
-
+# {location: {"Pedestrian": n, "Cyclist": n, "Vehicle": n}} for one day
+def fetch_pie_data(date: str) -> dict:
+    connection = get_connection()
+    cursor = connection.cursor(dictionary=True)
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor(dictionary=True)
-
         cursor.execute("""
             SELECT 
                 pd.Location,
@@ -40,125 +40,145 @@ def generate_combined_pie_dashboard(date: str) -> str:
             GROUP BY pd.Location, tc.Traffic_Type
             ORDER BY pd.Location;
         """, (date,))
-
         rows = cursor.fetchall()
-        console.print(f"Fetched [cyan]{len(rows)}[/cyan] rows from database.")
+    finally:
+        cursor.close()
+        connection.close()
+
+    console.print(f"Fetched [cyan]{len(rows)}[/cyan] rows from database.")
+
+    # Organize counts per location
+    data_by_location = {}
+    for row in rows:
+        loc = row["Location"]
+        raw_type = row["Traffic_Type"]
+        ttype = normalize_type.get(raw_type, raw_type)
+        if loc not in data_by_location:
+            data_by_location[loc] = {}
+        data_by_location[loc][ttype] = row["Total_Count"]
+    return data_by_location
+
+# One pie per location, a dropdown switches between them
+# Returns None if every location is all zeros
+def build_pie_figure(data_by_location: dict, date: str):
+    traffic_types = ["Pedestrian", "Cyclist", "Vehicle"]
+    fig = go.Figure()
+    valid_locations = []
+
+    # Add all pie chart traces
+    for loc, counts in data_by_location.items():
+        labels = []
+        values = []
+        colors = []
+
+        for t in traffic_types:
+            labels.append(t)
+            values.append(counts.get(t, 0))
+            colors.append(type_color_map[t])
+
+        if sum(values) == 0:
+            console.print(f"[yellow]Skipping {loc} — all values are 0[/yellow]")
+            continue
+
+        fig.add_trace(go.Pie(
+            labels=labels,
+            values=values,
+            hole=0.3,
+            name=loc,
+            visible=False,
+            marker=dict(colors=colors),
+            text=[loc] * len(labels),
+            textinfo='label+percent+value+text',
+            textposition='outside',
+            automargin=True
+        ))
+
+        valid_locations.append(loc)
+
+    if not valid_locations:
+        return None
+
+    # Show only the first location by default
+    fig.data[0].visible = True
+
+    # Fix visibility toggling with correctly sized arrays
+    buttons = []
+    for i, loc in enumerate(valid_locations):
+        visible_array = [j == i for j in range(len(valid_locations))]
+        buttons.append({
+            "label": loc,
+            "method": "update",
+            "args": [
+                {"visible": visible_array},
+                {"title": f"Traffic Distribution — {loc} ({date})"}
+            ]
+        })
+
+    fig.update_layout(
+        showlegend=True,
+        uniformtext_minsize=10,
+        uniformtext_mode='hide',
+        updatemenus=[{
+            "buttons": buttons,
+            "direction": "down",
+            "x": 0.5,
+            "xanchor": "center",
+            "y": 1.35,
+            "yanchor": "top",
+            "showactive": True
+        }],
+        margin=dict(t=30, b=30),
+        height=500
+    )
+    return fig
+
+# Figure for /api/chart/pie_chart, None when there is no data
+def pie_chart_figure(date: str):
+    data_by_location = fetch_pie_data(date)
+    return build_pie_figure(data_by_location, date) if data_by_location else None
+
+def pie_chart_path(date: str) -> str:
+    return os.path.join("piecharts", f"pie_dashboard_{date}.html")
+
+# Reused while the date's data version is unchanged (artifact_cache)
+@cached_artifact("pie_chart", pie_chart_path)
+def generate_combined_pie_dashboard(date: str) -> str:
+    console.print(f"\n[bold magenta]========== Generating Pie Chart Dashboard ==========[/bold magenta]")
+    console.print(f"Date: [green]{date}[/green]")
+
+    output_path = pie_chart_path(date)
+
+    try:
+        with stage_timer("pie_chart", "fetch"):
+            data_by_location = fetch_pie_data(date)
 
-        if not rows:
+        if not data_by_location:
             console.print("[yellow]No data available for this date.[/yellow]")
             return ""
 
-        # Organize counts per location
-        data_by_location = {}
-        for row in rows:
-            loc = row["Location"]
-            raw_type = row["Traffic_Type"]
-            ttype = normalize_type.get(raw_type, raw_type)
-            count = row["Total_Count"]
-            if loc not in data_by_location:
-                data_by_location[loc] = {}
-            data_by_location[loc][ttype] = count
-
-        traffic_types = ["Pedestrian", "Cyclist", "Vehicle"]
-        fig = go.Figure()
-        valid_locations = []
-
-        # Add all pie chart traces
-        for loc, counts in data_by_location.items():
-            labels = []
-            values = []
-            colors = []
-
-            for t in traffic_types:
-                labels.append(t)
-                values.append(counts.get(t, 0))
-                colors.append(type_color_map[t])
-
-            if sum(values) == 0:
-                console.print(f"[yellow]Skipping {loc} — all values are 0[/yellow]")
-                continue
-
-            fig.add_trace(go.Pie(
-                labels=labels,
-                values=values,
-                hole=0.3,
-                name=loc,
-                visible=False,
-                marker=dict(colors=colors),
-                text=[loc] * len(labels),
-                textinfo='label+percent+value+text',
-                textposition='outside',
-                automargin=True
-            ))
-
-            valid_locations.append(loc)
-
-        if not valid_locations:
+        t1 = time.perf_counter()
+        fig = build_pie_figure(data_by_location, date)
+        if fig is None:
             console.print("[red]No non-zero traffic data found for any location.[/red]")
             return ""
 
-        # Show only the first location by default
-        fig.data[0].visible = True
-
-        # Fix visibility toggling with correctly sized arrays
-        buttons = []
-        for i, loc in enumerate(valid_locations):
-            visible_array = [j == i for j in range(len(valid_locations))]
-            buttons.append({
-                "label": loc,
-                "method": "update",
-                "args": [
-                    {"visible": visible_array},
-                    {"title": f"Traffic Distribution — {loc} ({date})"}
-                ]
-            })
-
-        fig.update_layout(
-            showlegend=True,
-            uniformtext_minsize=10,
-            uniformtext_mode='hide',
-            updatemenus=[{
-                "buttons": buttons,
-                "direction": "down",
-                "x": 0.5,
-                "xanchor": "center",
-                "y": 1.35,
-                "yanchor": "top",
-                "showactive": True
-            }],
-            margin=dict(t=30, b=30),
-            height=500
-        )
-
-        # Create folder and set path
-        os.makedirs("piecharts", exist_ok=True)
-        filename = f"pie_dashboard_{date}.html"
-        output_path = os.path.join("piecharts", filename)
-
-        # Use cached file if already exists
-        if os.path.exists(output_path):
-            console.print(f"[green]Chart already exists:[/] {output_path}")
-            return output_path
-
         fig_html = fig.to_html(full_html=False, include_plotlyjs='cdn')
         full_html = wrap_plotly_chart(fig_html, f"Traffic Distribution Dashboard — {date}")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_html)
+        observe_stage("pie_chart", "render", time.perf_counter() - t1)
+
+        with stage_timer("pie_chart", "save"):
+            write_artifact(output_path, full_html)
+        GENERATIONS.inc(generator="pie_chart", outcome="generated")
 
         console.print(f"[green]Dashboard saved to:[/] {output_path}")
         return output_path
 
     except Exception as e:
         console.print(f"[bold red]Error generating dashboard:[/bold red] {e}")
+        GENERATIONS.inc(generator="pie_chart", outcome="failed")
         return ""
 
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
-
 # Run directly for testing
 if __name__ == "__main__":
     test_date = "2024-06-27"  # Change as needed
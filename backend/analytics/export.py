@@ -3,10 +3,12 @@
 # ----------------------------------------------
 # - Generates analysis report based on filters
 # - Outputs a formatted .html file with visuals
+# - export_report() builds the chart URLs for a filter set
 # ==============================================
 
 from datetime import datetime
 import os
+from backend.utils.artifacts import write_artifact
 
 def export_report_html(
     date,
@@ -111,7 +113,24 @@ def export_report_html(
     </html>
     """
 
-    with open(save_path, "w", encoding="utf-8") as file:
-        file.write(html_content)
+    write_artifact(save_path, html_content)
 
     return save_path
+
+# Builds the chart URLs for (date, time 'HH:MM', type) and exports the report
+def export_report(date, time, traffic_type, base_url="http://localhost:5000"):
+    safe_time = time.replace(":", "-")
+    safe_type = traffic_type.replace(" ", "")
+    safe_traffic = traffic_type.replace(" ", "_")
+    safe_traffic_lower = traffic_type.replace(" ", "_").lower()
+
+    return export_report_html(
+        date=date,
+        time=time,
+        traffic_type=traffic_type,
+        heatmap_url=f"{base_url}/heatmaps/heatmap_{date}_{safe_time}-00_{safe_traffic}.html",
+        bar_chart_url=f"{base_url}/barchart/bar_{date}_{safe_time}-00_{safe_type}.html",
+        line_chart_url=f"{base_url}/linecharts/line_{date}_{safe_type}.html",
+        pie_chart_url=f"{base_url}/piecharts/pie_dashboard_{date}.html",
+        forecast_chart_url=f"{base_url}/forecast/forecast_chart_{safe_traffic_lower}.html"
+    )
@@ -37,6 +37,27 @@ holiday_ranges = [pd.date_range(start, end) for start, end in VU_HOLIDAYS]
 all_holidays = pd.DatetimeIndex(np.concatenate(holiday_ranges))
 VU_HOLIDAY_DATES = all_holidays
 
+# Daily series Prophet is trained on
+def prepare_prophet_data(df):
+    df = df.dropna(subset=['ds', 'y'])
+    if df.empty:
+        raise ValueError("Dataframe is empty after dropping invalid rows.")
+    return df.set_index('ds').asfreq('D').ffill().reset_index()
+
+def create_prophet_model():
+    return Prophet(
+        daily_seasonality=True,
+        weekly_seasonality=True,
+        yearly_seasonality=True,
+        changepoint_prior_scale=0.05,
+        interval_width=0.95
+    )
+
+def fit_prophet(df):
+    model = create_prophet_model()
+    model.fit(df)
+    return model
+
 class TrafficForecaster:
     def __init__(self, location, traffic_type, start_datetime, end_datetime, forecast_end_date):
         conn_str = (
@@ -72,41 +93,29 @@ class TrafficForecaster:
         df['y'] = df['y'].clip(lower=0)
         return df[['ds', 'y']]
 
-    def _create_prophet_model(self):
-        return Prophet(
-            daily_seasonality=True,
-            weekly_seasonality=True,
-            yearly_seasonality=True,
-            changepoint_prior_scale=0.05,
-            interval_width=0.95
-        )
-
-    def prophet_forecast(self, df):
-        df = df.dropna(subset=['ds', 'y'])
-        if df.empty:
-            raise ValueError("Dataframe is empty after dropping invalid rows.")
-        df = df.set_index('ds').asfreq('D').fillna(method='ffill').reset_index()
+    def prophet_forecast(self, df, model=None):
+        df = prepare_prophet_data(df)
         logger.info(f"Sample data passed to Prophet:\n{df.head()}")
 
-        model = self._create_prophet_model()
-        model.fit(df)
-        forecast_periods = (self.forecast_end_date - df['ds'].max().date()).days
-        future = model.make_future_dataframe(periods=forecast_periods)
-
+        # A fitted model (e.g. loaded by prophet_batch) counts as the first run;
+        # otherwise every run fits exactly one model
         all_forecasts = []
+        future = None
         for run in range(NUM_TRAINING_RUNS):
-            logger.info(f"Training Prophet model {run + 1}/{NUM_TRAINING_RUNS}")
-            model = self._create_prophet_model()
-            model.fit(df)
+            if run > 0 or model is None:
+                logger.info(f"Training Prophet model {run + 1}/{NUM_TRAINING_RUNS}")
+                model = fit_prophet(df)
+            if future is None:
+                future = model.make_future_dataframe(periods=(self.forecast_end_date - df['ds'].max().date()).days)
             forecast = model.predict(future)
             all_forecasts.append(forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].set_index('ds'))
 
         combined = pd.concat(all_forecasts, axis=1)
         avg_forecast = pd.DataFrame({
             'ds': future['ds'],
-            'yhat': combined.filter(like='yhat').mean(axis=1),
-            'yhat_lower': combined.filter(like='yhat_lower').min(axis=1),
-            'yhat_upper': combined.filter(like='yhat_upper').max(axis=1)
+            'yhat': combined.filter(regex='^yhat$').mean(axis=1).values,
+            'yhat_lower': combined.filter(regex='^yhat_lower$').min(axis=1).values,
+            'yhat_upper': combined.filter(regex='^yhat_upper$').max(axis=1).values
         })
         return avg_forecast
 
@@ -1,64 +1,50 @@
 # ====================================================
 # Bar Chart Generator for Smart Foot Traffic System
 # ----------------------------------------------------
-# - Checks if chart exists and is linked in DB
+# - Checks if chart is current (artifact manifest) and linked in DB
 # - If not, generates Plotly bar chart HTML and saves it
 # - Updates heatmaps table with chart URL
+#   (on the caller's connection when one is passed)
+# - build_bar_chart_html() is the pure render step (batch rendering)
+# - export_day_bar_charts() renders all 24 hours of a day from one
+#   grouped query and links them with one UPDATE (process pool only
+#   from the CLI; server jobs render serially in their own thread)
+#
+# Usage (whole day):
+#   python -m backend.analytics.generate_barchart --date 2025-03-01 --type "Vehicle Count"
 # ====================================================
 
+import argparse
 import os
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+
 import mysql.connector
 import plotly.graph_objects as go
 from rich.console import Console
 from backend.analytics.chart_template import wrap_plotly_chart
-from backend.config import DB_CONFIG
+from backend.db.connection import get_connection
+from backend.db.artifact_manifest import current_artifacts, is_artifact_current, params_key, record_artifact, record_artifacts
+from backend.db.data_versions import get_data_version
+from backend.utils.artifacts import public_url, write_artifact
+from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 
 console = Console()
 
-def export_bar_chart_html(
-    selected_data: dict,
-    total_data: dict,
-    average_data: dict,
-    date=None,
-    time=None,
-    traffic_type=None
-):
-    console.print("\n[bold magenta]========== Generating Bar Chart ==========[/bold magenta]")
-
-    if not selected_data and not total_data and not average_data:
-        console.print("[bold red]No bar chart data to export.[/bold red]")
-        return None
-
-    os.makedirs("barchart", exist_ok=True)
+# Render processes for the CLI (server jobs always render serially)
+BAR_CHART_WORKERS = int(os.getenv("BAR_CHART_WORKERS", min(4, os.cpu_count() or 2)))
 
+# barchart/bar_{date}_{HH-MM-SS}_{TypeNoSpaces}.html
+def bar_chart_path(date=None, time=None, traffic_type=None):
     filename = "bar_chart.html"
     if date and time and traffic_type:
         safe_type = traffic_type.replace(" ", "")
         safe_time = time.replace(":", "-")
         filename = f"bar_{date}_{safe_time}_{safe_type}.html"
+    return os.path.join("barchart", filename)
 
-    output_path = os.path.join("barchart", filename)
-
-    # Check if file exists and it's already linked in DB
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT BarChart_URL FROM heatmaps
-            WHERE Traffic_Type = %s AND Date_Filter = %s AND Time_Filter = %s
-        """, (traffic_type, date, time))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if result and result["BarChart_URL"] and os.path.exists(output_path):
-            console.print(f"[green]Bar chart already exists and is linked in DB.[/green]")
-            return result["BarChart_URL"]
-
-    except mysql.connector.Error as e:
-        console.print(f"[red]DB check failed:[/red] {e}")
-
-    # 🔧 Generate bar chart
+# Selected hour / total / daily average bars, a dropdown switches between them
+def build_bar_chart_figure(selected_data, total_data, average_data):
     locations = sorted(set(selected_data.keys()) | set(total_data.keys()) | set(average_data.keys()))
     fig = go.Figure()
 
@@ -115,19 +101,72 @@ def export_bar_chart_html(
         }]
     )
 
+    return fig
+
+# Builds the bar chart page (no file or DB access)
+def build_bar_chart_html(selected_data, total_data, average_data, date=None, time=None, traffic_type=None):
+    fig = build_bar_chart_figure(selected_data, total_data, average_data)
     html_code = fig.to_html(full_html=False, include_plotlyjs='cdn')
 
-    scrollable_html = wrap_plotly_chart(html_code, f"{traffic_type} — {date} at {time}")
+    return wrap_plotly_chart(html_code, f"{traffic_type} — {date} at {time}")
+
+def export_bar_chart_html(
+    selected_data: dict,
+    total_data: dict,
+    average_data: dict,
+    date=None,
+    time=None,
+    traffic_type=None,
+    conn=None
+):
+    console.print("\n[bold magenta]========== Generating Bar Chart ==========[/bold magenta]")
+    own_conn = conn is None
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(scrollable_html)
+    if not selected_data and not total_data and not average_data:
+        console.print("[bold red]No bar chart data to export.[/bold red]")
+        return None
+
+    os.makedirs("barchart", exist_ok=True)
+
+    output_path = bar_chart_path(date, time, traffic_type)
+    filename = os.path.basename(output_path)
+
+    # Check if the chart is current (manifest) and already linked in DB
+    params = {"date": date, "time": time, "type": traffic_type}
+    version = 0
+    try:
+        version = get_data_version(date) if date else 0
+        if own_conn:
+            conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT BarChart_URL FROM heatmaps
+            WHERE Traffic_Type = %s AND Date_Filter = %s AND Time_Filter = %s
+        """, (traffic_type, date, time))
+        result = cursor.fetchone()
+        cursor.close()
+        current = is_artifact_current("bar_chart", params, version, conn)
+        if own_conn:
+            conn.close()
+
+        if result and result["BarChart_URL"] and current:
+            console.print(f"[green]Bar chart is up to date and linked in DB.[/green]")
+            return result["BarChart_URL"]
+
+    except mysql.connector.Error as e:
+        console.print(f"[red]DB check failed:[/red] {e}")
+
+    scrollable_html = build_bar_chart_html(selected_data, total_data, average_data, date, time, traffic_type)
+
+    write_artifact(output_path, scrollable_html)
 
     console.print("[bold magenta]" + "=" * 50 + "[/bold magenta]")
     console.print(f"Bar chart saved to: [green]{output_path}[/green]")
 
     # Update BarChart_URL in DB
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        if own_conn:
+            conn = get_connection()
         cursor = conn.cursor()
 
         # Use localhost or prod URL
@@ -141,11 +180,127 @@ def export_bar_chart_html(
             SET BarChart_URL = %s
             WHERE Traffic_Type = %s AND Date_Filter = %s AND Time_Filter = %s
         """, (chart_url, traffic_type, date, time))
+        record_artifact("bar_chart", params, version, output_path, conn)
         conn.commit()
         cursor.close()
-        conn.close()
+        if own_conn:
+            conn.close()
 
     except mysql.connector.Error as e:
         console.print(f"[red]Failed to update BarChart_URL in DB:[/red] {e}")
 
     return chart_url
+
+# =====================================================
+# Whole-day batch: all 24 bar charts of one (date, type)
+# One grouped query, renders in a process pool, one UPDATE
+# =====================================================
+HOURLY_TIMES = [f"{h:02}:00:00" for h in range(24)]
+
+# Per-location counts for every hour of a day in one grouped query
+# Returns (selected_by_hour, total_data, average_data)
+def fetch_day_bar_chart_inputs(date, traffic_type, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT HOUR(pd.Date_Time) AS hour, pd.Location, SUM(tc.Interval_Count) AS count
+        FROM processed_data pd
+        JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
+        WHERE pd.Date = %s AND tc.Traffic_Type = %s
+        GROUP BY hour, pd.Location
+    """, (date, traffic_type))
+    rows = cursor.fetchall()
+    cursor.close()
+    if own_conn:
+        conn.close()
+
+    selected_by_hour, total_data = {}, {}
+    for hour, loc, count in rows:
+        count = int(count or 0)
+        selected_by_hour.setdefault(int(hour), {})[loc] = count
+        total_data[loc] = total_data.get(loc, 0) + count
+    average_data = {
+        loc: round(total_data.get(loc, 0) / 24, 2)
+        for loc in LOCATION_COORDINATES
+    }
+    return selected_by_hour, total_data, average_data
+
+# Figure for /api/chart/bar_chart, None when there is no data
+def bar_chart_figure(date, time, traffic_type):
+    selected_by_hour, total_data, average_data = fetch_day_bar_chart_inputs(date, traffic_type)
+    if not total_data:
+        return None
+    return build_bar_chart_figure(selected_by_hour.get(int(time[:2]), {}), total_data, average_data)
+
+# Pool worker: render + write one hour, returns its path
+def _render_bar_hour(selected_data, total_data, average_data, date, time, traffic_type):
+    return write_artifact(
+        bar_chart_path(date, time, traffic_type),
+        build_bar_chart_html(selected_data, total_data, average_data, date, time, traffic_type)
+    )
+
+# =====================================================
+# FUNCTION: Export every hour's bar chart for one day
+# Skips hours whose manifest entry is current (unless force)
+# workers > 1 renders in a process pool, otherwise serially
+# Returns {time: chart URL} for all hours on disk
+# =====================================================
+def export_day_bar_charts(date, traffic_type, workers=None, force=False):
+    start = time_module.time()
+    workers = workers or 1
+    version = get_data_version(date)
+    paths = {t: bar_chart_path(date, t, traffic_type) for t in HOURLY_TIMES}
+    params = {t: {"date": date, "time": t, "type": traffic_type} for t in HOURLY_TIMES}
+
+    done = set() if force else current_artifacts("bar_chart", list(params.values()), version)
+    todo = [t for t in HOURLY_TIMES if force or params_key(params[t])[0] not in done or not os.path.exists(paths[t])]
+
+    if todo:
+        selected_by_hour, total_data, average_data = fetch_day_bar_chart_inputs(date, traffic_type)
+        if not total_data:
+            console.print(f"[yellow]No traffic data for {traffic_type} on {date}[/yellow]")
+            return {}
+
+        # Workers only pay off for more than a couple of charts
+        args = [(selected_by_hour.get(int(t[:2]), {}), total_data, average_data, date, t, traffic_type) for t in todo]
+        if workers > 1 and len(todo) > 2:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                list(pool.map(_render_bar_hour, *zip(*args)))
+        else:
+            for arg in args:
+                _render_bar_hour(*arg)
+
+    urls = {t: public_url(paths[t]) for t in HOURLY_TIMES if os.path.exists(paths[t])}
+
+    # One UPDATE for every hour's link, one manifest upsert for the new files
+    if urls:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            UPDATE heatmaps
+            SET BarChart_URL = CASE Time_Filter {' '.join(['WHEN %s THEN %s'] * len(urls))} END
+            WHERE Traffic_Type = %s AND Date_Filter = %s
+              AND Time_Filter IN ({', '.join(['%s'] * len(urls))})
+        """, [value for t, url in urls.items() for value in (t, url)] + [traffic_type, date] + list(urls))
+        record_artifacts([("bar_chart", params[t], version, paths[t]) for t in todo if t in urls], conn)
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    console.print(
+        f"[green]Bar charts for {traffic_type} on {date}: {len(todo)} rendered, "
+        f"{len(HOURLY_TIMES) - len(todo)} up to date in {time_module.time() - start:.2f}s[/green]"
+    )
+    return urls
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render all 24 bar charts of one day")
+    parser.add_argument("--date", required=True, help="Date (YYYY-MM-DD)")
+    parser.add_argument("--type", dest="traffic_type", default="Pedestrian Count", help="Traffic type")
+    parser.add_argument("--workers", type=int, default=BAR_CHART_WORKERS, help="Render processes")
+    parser.add_argument("--force", action="store_true", help="Re-render even if charts are current")
+    args = parser.parse_args()
+
+    export_day_bar_charts(args.date, args.traffic_type, args.workers, args.force)
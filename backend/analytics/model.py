@@ -6,11 +6,19 @@
 # - Uses linear regression to generate daily forecasts
 # - Adds observed + linear regression
 # - Single dropdown HTML with all locations
+# - One query fetches every location's series
+# - Fits run in parallel (FORECAST_WORKERS) and are persisted with
+#   joblib (model_results/cache/linear_fits_<type>.joblib) together with
+#   the training window's data version and a hash per series;
+#   a refresh refits only the locations whose series changed
+# - Rebuilt only when data in the training window changes
 # ====================================================
 
+import hashlib
 import os
 from pathlib import Path
 from datetime import datetime
+import joblib
 import pandas as pd
 import numpy as np
 from sqlalchemy import create_engine, text
@@ -18,14 +26,22 @@ from sklearn.linear_model import LinearRegression
 import plotly.graph_objects as go
 from rich.console import Console
 from rich.prompt import Prompt
+from backend.analytics.artifact_cache import cached_artifact
 from backend.analytics.chart_template import wrap_plotly_chart
 from backend.config import DB_CONFIG
+from backend.db.data_versions import get_range_version
+from backend.utils.artifacts import write_artifact
+from backend.utils.metrics import GENERATIONS, stage_timer
 
 # Setup
 console = Console()
 RESULTS_DIR = Path("model_results")
 RESULTS_DIR.mkdir(exist_ok=True)
 
+# Fitted models live outside what /forecast/ serves
+CACHE_DIR = RESULTS_DIR / "cache"
+CACHE_DIR.mkdir(exist_ok=True)
+
 ALL_LOCATIONS = [
     'Footscray Library Car Park', 'Footscray Market Hopkins And Irving',
     'Footscray Market Hopkins And Leeds', 'Nic St Campus',
@@ -39,91 +55,152 @@ START_DATETIME = "2024-03-04 00:00:00"
 END_DATETIME = "2025-03-04 23:59:00"
 FORECAST_END_DATE = datetime(2026, 12, 31).date()
 
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", min(4, os.cpu_count() or 1)))
+
 conn_str = (
     f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}@"
     f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 )
 engine = create_engine(conn_str)
 
-def fetch_data(location, traffic_type):
-    query = text("""
-        SELECT p.Date_Time AS ds, t.Total_Count AS y
+# =====================================================
+# FUNCTION: Every location's hourly series in one query
+# Returns {location: DataFrame[ds, y]} for the training window
+# =====================================================
+def fetch_forecast_data(traffic_type, locations):
+    placeholders = ", ".join(f":loc{i}" for i in range(len(locations)))
+    query = text(f"""
+        SELECT p.Location AS location, p.Date_Time AS ds, t.Total_Count AS y
         FROM processed_data p
         JOIN traffic_counts t ON p.Data_ID = t.Data_ID
-        WHERE p.Location = :location AND t.Traffic_Type = :traffic_type
+        WHERE t.Traffic_Type = :traffic_type AND p.Location IN ({placeholders})
           AND p.Date_Time BETWEEN :start AND :end
     """)
-    df = pd.read_sql(query, engine, params={
-        'location': location,
-        'traffic_type': traffic_type,
-        'start': START_DATETIME,
-        'end': END_DATETIME
-    })
+    params = {f"loc{i}": loc for i, loc in enumerate(locations)}
+    params.update({'traffic_type': traffic_type, 'start': START_DATETIME, 'end': END_DATETIME})
+    df = pd.read_sql(query, engine, params=params)
+
     df['ds'] = pd.to_datetime(df['ds'], errors='coerce')
-    df = df.dropna(subset=['ds']).drop_duplicates('ds').sort_values('ds')
+    df = df.dropna(subset=['ds']).drop_duplicates(['location', 'ds']).sort_values(['location', 'ds'])
     df['y'] = df['y'].clip(lower=0)
-    return df[['ds', 'y']]
-
-def create_linear_regression(df, future_dates):
-    df = df.copy()
-    df['timestamp'] = df['ds'].astype(np.int64) // 10 ** 9
-    X = df['timestamp'].values.reshape(-1, 1)
-    y = df['y'].values
-    model = LinearRegression().fit(X, y)
-    future_ts = (future_dates.astype(np.int64) // 10 ** 9).values.reshape(-1, 1)
-    y_pred = model.predict(future_ts)
-    return y_pred
+    return {
+        location: group[['ds', 'y']].reset_index(drop=True)
+        for location, group in df.groupby('location', sort=False)
+    }
 
-def generate_forecast_chart(traffic_type: str):
-    console.print("\n[bold magenta]========== Forecast Chart Generation ==========[/bold magenta]")
-    console.print(f"Traffic Type: [green]{traffic_type}[/green]")
+# Unix seconds, whatever datetime unit pandas picked
+def _seconds(dates):
+    return pd.DatetimeIndex(dates).values.astype('datetime64[s]').astype(np.int64).reshape(-1, 1)
 
-    if traffic_type == "Vehicle Count":
-        locations = [loc for loc in ALL_LOCATIONS if loc not in VEHICLE_EXCLUDE]
-    else:
-        locations = ALL_LOCATIONS[:]
+# Identifies a series' content; unchanged hash = no refit needed
+def series_hash(df):
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+def fit_linear_trend(df):
+    model = LinearRegression().fit(_seconds(df['ds']), df['y'].values)
+    return {"coef": float(model.coef_[0]), "intercept": float(model.intercept_)}
+
+def predict_linear_trend(fit, future_dates):
+    return _seconds(future_dates)[:, 0] * fit["coef"] + fit["intercept"]
+
+def fits_path(traffic_type):
+    return CACHE_DIR / f"linear_fits_{traffic_type.replace(' ', '_').lower()}.joblib"
+
+# {"data_version": int, "fits": {location: {"hash", "coef", "intercept", "n_rows", "fitted_at"}}}
+def load_fits(traffic_type):
+    path = fits_path(traffic_type)
+    if not path.exists():
+        return {"data_version": None, "fits": {}}
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        console.print(f"[yellow]Ignoring unreadable fits {path}:[/yellow] {e}")
+        return {"data_version": None, "fits": {}}
+
+def save_fits(traffic_type, fits):
+    path = fits_path(traffic_type)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    joblib.dump(fits, tmp_path)
+    os.replace(tmp_path, path)
+
+# =====================================================
+# FUNCTION: Observed series + linear fit per location
+# One query; only locations whose series changed since the
+# persisted fits are refit (in parallel, FORECAST_WORKERS)
+# Returns ({location: df}, {location: fit})
+# =====================================================
+def fit_forecasts(traffic_type, locations, force=False):
+    with stage_timer("forecast", "fetch"):
+        series = fetch_forecast_data(traffic_type, locations)
+
+    stored = load_fits(traffic_type)
+    fits = {} if force else dict(stored["fits"])
+    hashes = {location: series_hash(df) for location, df in series.items()}
+    todo = [
+        location for location, df in series.items()
+        if len(df) > 1 and (location not in fits or fits[location]["hash"] != hashes[location])
+    ]
 
-    safe_name = traffic_type.replace(" ", "_").lower()
-    output_path = RESULTS_DIR / f"forecast_chart_{safe_name}.html"
+    if todo:
+        with stage_timer("forecast", "fit"):
+            results = joblib.Parallel(n_jobs=min(FORECAST_WORKERS, len(todo)), prefer="threads")(
+                joblib.delayed(fit_linear_trend)(series[location]) for location in todo
+            )
+        fitted_at = datetime.now().isoformat(timespec="seconds")
+        for location, fit in zip(todo, results):
+            fits[location] = {**fit, "hash": hashes[location], "n_rows": len(series[location]), "fitted_at": fitted_at}
 
-    if output_path.exists():
-        console.print(f"[green]Chart already exists:[/] {output_path}")
-        return
+    # Locations without data this time keep no stale fit
+    fits = {location: fit for location, fit in fits.items() if location in series}
+    console.print(f"[cyan]Refit {len(todo)} location(s), reused {len(fits) - len(todo)}[/cyan]")
+    version = training_data_version()
+    if todo or set(fits) != set(stored["fits"]) or stored["data_version"] != version:
+        save_fits(traffic_type, {"data_version": version, "fits": fits})
+    return series, fits
 
+def forecast_locations(traffic_type: str):
+    if traffic_type == "Vehicle Count":
+        return [loc for loc in ALL_LOCATIONS if loc not in VEHICLE_EXCLUDE]
+    return ALL_LOCATIONS[:]
+
+# Observed + linear regression per location, a dropdown switches between them
+def build_forecast_figure(traffic_type: str) -> go.Figure:
+    locations = forecast_locations(traffic_type)
     fig = go.Figure()
     buttons = []
 
+    series, fits = fit_forecasts(traffic_type, locations)
+    for location in locations:
+        if location not in fits:
+            console.print(f"[red]❌ No data to forecast {location}[/red]")
+    locations = [location for location in locations if location in fits]
+
     for i, location in enumerate(locations):
-        console.print(f"\n[yellow]📍 Forecasting: {location}[/yellow]")
-        try:
-            df = fetch_data(location, traffic_type)
-            future_dates = pd.date_range(start=df['ds'].max() + pd.Timedelta(days=1), end=FORECAST_END_DATE, freq='D')
-            linreg_y = create_linear_regression(df, future_dates)
-
-            visibility = [False] * (2 * len(locations))
-            visibility[i * 2 + 0] = True  # Observed
-            visibility[i * 2 + 1] = True  # Linear
-
-            buttons.append({
-                "label": location,
-                "method": "update",
-                "args": [{"visible": visibility}]
-            })
-
-            fig.add_trace(go.Scatter(
-                x=df['ds'], y=df['y'], mode='lines+markers',
-                name="Observed", visible=(i == 0),
-                line=dict(color='black')
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=future_dates, y=linreg_y, mode='lines',
-                name="Linear Regression", visible=(i == 0),
-                line=dict(color='red', dash='dash')
-            ))
-
-        except Exception as e:
-            console.print(f"[red]❌ Failed for {location}: {e}[/red]")
+        df = series[location]
+        future_dates = pd.date_range(start=df['ds'].max() + pd.Timedelta(days=1), end=FORECAST_END_DATE, freq='D')
+        linreg_y = predict_linear_trend(fits[location], future_dates)
+
+        visibility = [False] * (2 * len(locations))
+        visibility[i * 2 + 0] = True  # Observed
+        visibility[i * 2 + 1] = True  # Linear
+
+        buttons.append({
+            "label": location,
+            "method": "update",
+            "args": [{"visible": visibility}]
+        })
+
+        fig.add_trace(go.Scatter(
+            x=df['ds'], y=df['y'], mode='lines+markers',
+            name="Observed", visible=(i == 0),
+            line=dict(color='black')
+        ))
+
+        fig.add_trace(go.Scatter(
+            x=future_dates, y=linreg_y, mode='lines',
+            name="Linear Regression", visible=(i == 0),
+            line=dict(color='red', dash='dash')
+        ))
 
     fig.update_layout(
         xaxis_title="Date",
@@ -140,13 +217,32 @@ def generate_forecast_chart(traffic_type: str):
             "showactive": True
         }]
     )
+    return fig
+
+def forecast_chart_path(traffic_type: str) -> Path:
+    return RESULTS_DIR / f"forecast_chart_{traffic_type.replace(' ', '_').lower()}.html"
+
+# Version of every date the fits are trained on
+def training_data_version(params=None) -> int:
+    return get_range_version(START_DATETIME[:10], END_DATETIME[:10])
+
+@cached_artifact("forecast", forecast_chart_path, version=training_data_version)
+def generate_forecast_chart(traffic_type: str):
+    console.print("\n[bold magenta]========== Forecast Chart Generation ==========[/bold magenta]")
+    console.print(f"Traffic Type: [green]{traffic_type}[/green]")
+
+    output_path = forecast_chart_path(traffic_type)
+    fig = build_forecast_figure(traffic_type)
 
-    fig_html = fig.to_html(full_html=False, include_plotlyjs='cdn')
-    final_html = wrap_plotly_chart(fig_html, f"{traffic_type} — Forecast Chart")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(final_html)
+    with stage_timer("forecast", "render"):
+        fig_html = fig.to_html(full_html=False, include_plotlyjs='cdn')
+        final_html = wrap_plotly_chart(fig_html, f"{traffic_type} — Forecast Chart")
+    with stage_timer("forecast", "save"):
+        write_artifact(output_path, final_html)
+    GENERATIONS.inc(generator="forecast", outcome="generated")
 
     console.print(f"\n[green]Forecast chart saved to:[/] {output_path}")
+    return str(output_path)
 
 if __name__ == "__main__":
     with engine.connect() as conn:
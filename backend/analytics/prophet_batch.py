@@ -0,0 +1,239 @@
+# ====================================================
+# Prophet Batch Forecasts for Smart Foot Traffic
+# ----------------------------------------------------
+# - Forecasts every (location, traffic type) without prompts
+# - One query fetches every series in the training window
+# - Each model is fitted exactly once, PROPHET_WORKERS at a time,
+#   and saved with prophet's JSON serializer to
+#   model_results/cache/prophet/<type>__<location>.json (not served)
+#   together with a hash of its series, fit time and the training
+#   data version
+# - The CLI fits in a process pool; server jobs use threads (Stan
+#   runs each fit as a subprocess, so they still overlap, and a
+#   process pool started from the server would re-import it)
+# - Saved models are reused for prediction until their series
+#   changes; forecasts already written for the same model and end
+#   date are skipped (--force refits everything)
+# - Prints fit time per model, fit times also go to /metrics
+#
+# Usage:
+#   python -m backend.analytics.prophet_batch
+#   python -m backend.analytics.prophet_batch --types "Vehicle Count" --until 2026-12-31 --workers 4
+# ====================================================
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+from prophet.serialize import model_from_json, model_to_json
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import text
+
+from backend.analytics.forecast import RESULTS_DIR, fit_prophet, prepare_prophet_data
+from backend.analytics.model import (
+    END_DATETIME, FORECAST_END_DATE, START_DATETIME, engine, forecast_locations, series_hash, training_data_version
+)
+from backend.pipeline.helpers.helpers import TRAFFIC_TYPES
+from backend.utils.artifacts import write_artifact
+from backend.utils.metrics import GENERATIONS, observe_stage
+
+console = Console()
+
+PROPHET_DIR = RESULTS_DIR / "cache" / "prophet"
+PROPHET_WORKERS = int(os.getenv("PROPHET_WORKERS", min(4, os.cpu_count() or 1)))
+
+def _safe(name):
+    return name.replace(" ", "_").lower()
+
+def model_path(location, traffic_type):
+    return PROPHET_DIR / f"{_safe(traffic_type)}__{_safe(location)}.json"
+
+def forecast_path(location, traffic_type):
+    return PROPHET_DIR / f"forecast_{_safe(traffic_type)}__{_safe(location)}.csv"
+
+# =====================================================
+# FUNCTION: Every series for the given types in one query
+# Returns {(location, traffic_type): DataFrame[ds, y]}
+# =====================================================
+def fetch_all_series(traffic_types):
+    placeholders = ", ".join(f":type{i}" for i in range(len(traffic_types)))
+    query = text(f"""
+        SELECT p.Location AS location, t.Traffic_Type AS traffic_type,
+               p.Date_Time AS ds, t.Interval_Count AS y
+        FROM processed_data p
+        JOIN traffic_counts t ON p.Data_ID = t.Data_ID
+        WHERE t.Traffic_Type IN ({placeholders})
+          AND p.Date_Time BETWEEN :start AND :end
+    """)
+    params = {f"type{i}": traffic_type for i, traffic_type in enumerate(traffic_types)}
+    params.update({'start': START_DATETIME, 'end': END_DATETIME})
+    df = pd.read_sql(query, engine, params=params)
+
+    df['ds'] = pd.to_datetime(df['ds'], errors='coerce')
+    df = df.dropna(subset=['ds']).drop_duplicates(['location', 'traffic_type', 'ds'])
+    df = df.sort_values(['location', 'traffic_type', 'ds'])
+    df['y'] = df['y'].clip(lower=0)
+    return {
+        key: group[['ds', 'y']].reset_index(drop=True)
+        for key, group in df.groupby(['location', 'traffic_type'], sort=False)
+    }
+
+# Saved model + metadata, or None if missing / unreadable
+def load_model_record(location, traffic_type):
+    path = model_path(location, traffic_type)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        console.print(f"[yellow]Ignoring unreadable model {path}:[/yellow] {e}")
+        return None
+
+def save_model_record(location, traffic_type, record):
+    path = model_path(location, traffic_type)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+# =====================================================
+# Worker: fit (if no model is given) and predict one series
+# Returns (model JSON, fit seconds or None, forecast DataFrame)
+# =====================================================
+def _forecast_series(df, model_json, forecast_until):
+    df = prepare_prophet_data(df)
+
+    fit_seconds = None
+    if model_json is None:
+        start = time.perf_counter()
+        model = fit_prophet(df)
+        fit_seconds = time.perf_counter() - start
+        model_json = model_to_json(model)
+    else:
+        model = model_from_json(model_json)
+
+    future = model.make_future_dataframe(periods=max((forecast_until - df['ds'].max().date()).days, 0))
+    forecast = model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    return model_json, fit_seconds, forecast
+
+# =====================================================
+# FUNCTION: Forecast every sensor for the given types
+# processes: fit in a process pool (CLI) instead of threads
+# Returns [{location, traffic_type, status, rows, fit_seconds}]
+# with status fitted / reused / current / failed
+# =====================================================
+def run_prophet_batch(traffic_types=None, forecast_until=None, workers=None, force=False, processes=False):
+    start = time.time()
+    traffic_types = list(traffic_types or TRAFFIC_TYPES)
+    forecast_until = forecast_until or FORECAST_END_DATE
+    workers = workers or PROPHET_WORKERS
+    PROPHET_DIR.mkdir(parents=True, exist_ok=True)
+
+    series = fetch_all_series(traffic_types)
+    version = training_data_version()
+    wanted = [
+        (location, traffic_type)
+        for traffic_type in traffic_types
+        for location in forecast_locations(traffic_type)
+        if (location, traffic_type) in series
+    ]
+
+    report = []
+    todo = {}   # (location, type) -> (df, saved model JSON or None, series hash)
+    for location, traffic_type in wanted:
+        df = series[(location, traffic_type)]
+        digest = series_hash(df)
+        record = None if force else load_model_record(location, traffic_type)
+        if record is None or record["series_hash"] != digest:
+            todo[(location, traffic_type)] = (df, None, digest)
+        elif record.get("forecast_until") != str(forecast_until) or not forecast_path(location, traffic_type).exists():
+            todo[(location, traffic_type)] = (df, record["model"], digest)
+        else:
+            report.append({"location": location, "traffic_type": traffic_type, "status": "current",
+                           "rows": len(df), "fit_seconds": record["fit_seconds"]})
+
+    fits = sum(1 for _, model_json, _ in todo.values() if model_json is None)
+    console.print(
+        f"[cyan]{len(wanted)} series: {fits} to fit, {len(todo) - fits} to re-predict, "
+        f"{len(wanted) - len(todo)} current ({min(workers, max(len(todo), 1))} workers)[/cyan]"
+    )
+
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=min(workers, max(len(todo), 1))) as pool:
+        futures = {
+            pool.submit(_forecast_series, df, model_json, forecast_until): key
+            for key, (df, model_json, _) in todo.items()
+        }
+        for future in as_completed(futures):
+            location, traffic_type = futures[future]
+            df, saved_json, digest = todo[(location, traffic_type)]
+            try:
+                model_json, fit_seconds, forecast = future.result()
+            except Exception as e:
+                console.print(f"[red]❌ {traffic_type} at {location} failed: {e}[/red]")
+                GENERATIONS.inc(generator="prophet", outcome="failed")
+                report.append({"location": location, "traffic_type": traffic_type, "status": "failed",
+                               "rows": len(df), "fit_seconds": None})
+                continue
+
+            write_artifact(str(forecast_path(location, traffic_type)), forecast.to_csv(index=False))
+            if fit_seconds is None:
+                record = load_model_record(location, traffic_type)
+                fit_seconds = record["fit_seconds"]
+                status = "reused"
+            else:
+                record = {
+                    "location": location,
+                    "traffic_type": traffic_type,
+                    "series_hash": digest,
+                    "data_version": version,
+                    "rows": len(df),
+                    "fit_seconds": round(fit_seconds, 3),
+                    "fitted_at": datetime.now().isoformat(timespec="seconds"),
+                    "model": model_json
+                }
+                observe_stage("prophet", "fit", fit_seconds)
+                status = "fitted"
+            record["forecast_until"] = str(forecast_until)
+            save_model_record(location, traffic_type, record)
+            GENERATIONS.inc(generator="prophet", outcome="generated" if status == "fitted" else "cached")
+            report.append({"location": location, "traffic_type": traffic_type, "status": status,
+                           "rows": len(df), "fit_seconds": record["fit_seconds"]})
+
+    print_report(report, time.time() - start)
+    return report
+
+def print_report(report, duration):
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Traffic Type")
+    table.add_column("Location")
+    table.add_column("Status")
+    table.add_column("Rows", justify="right")
+    table.add_column("Fit (s)", justify="right")
+    for row in sorted(report, key=lambda r: (r["traffic_type"], r["location"])):
+        fit = f"{row['fit_seconds']:.2f}" if row["fit_seconds"] is not None else "-"
+        table.add_row(row["traffic_type"], row["location"], row["status"], str(row["rows"]), fit)
+    console.print(table)
+
+    fitted = [row["fit_seconds"] for row in report if row["status"] == "fitted"]
+    console.print(
+        f"[green]{len(fitted)} fitted ({sum(fitted):.2f}s of fitting), "
+        f"{len(report) - len(fitted)} reused/current/failed in {duration:.2f}s; "
+        f"models in {PROPHET_DIR.resolve()}[/green]"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit and forecast Prophet models for every sensor")
+    parser.add_argument("--types", nargs="+", default=TRAFFIC_TYPES, help="Traffic types")
+    parser.add_argument("--until", default=str(FORECAST_END_DATE), help="Forecast end date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=PROPHET_WORKERS, help="Fit processes")
+    parser.add_argument("--force", action="store_true", help="Refit even if the data is unchanged")
+    args = parser.parse_args()
+
+    run_prophet_batch(args.types, datetime.strptime(args.until, "%Y-%m-%d").date(), args.workers, args.force, processes=True)
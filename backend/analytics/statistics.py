@@ -3,23 +3,43 @@
 # ----------------------------------------------------
 # - Gets traffic data and makes summary report
 # - Makes bar chart and saves URL to database
-# - Uses cache if summary already exists
+# - Two-tier cache: in-process LRU (SUMMARY_CACHE_MAX_MB) in
+#   front of the summary_cache table, one key format for both;
+#   entries only count while their date's data version matches
+# - A miss uses one connection for lookup, query and writes
+# - Stage timings (fetch/render/db) and hit/miss per tier go to /metrics
 # - Called by /api/summary_stats in the backend
 # ====================================================
 
 import os
 import json
-import mysql.connector
 import time
 from pprint import pprint
 from rich.console import Console
 
-from backend.analytics.generate_barchart import export_bar_chart_html
-from backend.config import DB_CONFIG
+from backend.analytics.generate_barchart import bar_chart_path, export_bar_chart_html
+from backend.db.connection import get_connection
+from backend.db.data_versions import cached_data_version
+from backend.forecast.weather_index import is_weather_complete
+from backend.forecast.weather_jobs import enqueue_weather_assignment
+from backend.pipeline.helpers.helpers import normalize_time
+from backend.utils.lru_cache import ByteLRUCache
+from backend.utils.metrics import GENERATIONS, observe_stage, registry
 from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 
 console = Console()
 
+SUMMARY_CACHE_MAX_MB = float(os.getenv("SUMMARY_CACHE_MAX_MB", 16))
+
+# summary_key() -> (data version, result); sized by its JSON length
+summary_memory = ByteLRUCache("summaries", int(SUMMARY_CACHE_MAX_MB * 1024 * 1024), sizeof=lambda entry: entry[2])
+
+SUMMARY_LOOKUPS = registry.counter(
+    "sft_summary_cache_lookups_total",
+    "Summary cache lookups per tier (memory, db) and result",
+    ("tier", "result")
+)
+
 def get_season_from_month(month):
     if month in [12, 1, 2]:
         return "Summer"
@@ -31,38 +51,94 @@ def get_season_from_month(month):
         return "Spring"
     return "Unknown"
 
+# Same key for every caller: ('YYYY-MM-DD', 'HH:MM:SS', type)
+def summary_key(date, time_input, traffic_type):
+    return str(date)[:10], normalize_time(time_input), traffic_type
+
+# Response shape shared by computed and cached summaries
+def build_summary_result(summary, location_availability=None):
+    per_location = summary['selected_hour']['per_location']
+    line_chart = {
+        label: sum(counts.values())
+        for label, counts in sorted(summary.get("hourly_data", {}).items())
+    }
+    if location_availability is None:
+        location_availability = {loc: loc in per_location for loc in LOCATION_COORDINATES}
+    return {
+        "summary": summary,
+        "bar_chart": per_location,
+        "line_chart": line_chart,
+        "location_availability": location_availability
+    }
+
+def _remember(key, version, summary_json):
+    result = build_summary_result(json.loads(summary_json))
+    summary_memory.put(key, (version, result, len(summary_json)))
+    return result
+
+# =====================================================
+# FUNCTION: Cached summary, or None
+# Tier 1: in-process LRU, tier 2: summary_cache table;
+# both only count while the date's data version matches
+# and the bar chart file is on disk
+# =====================================================
+def get_cached_summary(key, version, cursor=None):
+    chart_exists = os.path.exists(bar_chart_path(*key))
+
+    # An entry from another data version counts as a miss in the LRU stats too
+    entry = summary_memory.get(key, valid=lambda entry: entry[0] == version) if chart_exists else None
+    if entry is not None:
+        SUMMARY_LOOKUPS.inc(tier="memory", result="hit")
+        return entry[1]
+    SUMMARY_LOOKUPS.inc(tier="memory", result="miss")
+
+    if cursor is None or not chart_exists:
+        return None
+
+    cursor.execute("""
+        SELECT Summary_JSON, Data_Version FROM summary_cache
+        WHERE Date_Filter = %s AND Time_Filter = %s AND Traffic_Type = %s
+    """, key)
+    cached = cursor.fetchone()
+    if cached and cached['Data_Version'] == version:
+        SUMMARY_LOOKUPS.inc(tier="db", result="hit")
+        return _remember(key, version, cached['Summary_JSON'])
+
+    SUMMARY_LOOKUPS.inc(tier="db", result="miss")
+    return None
+
 def get_summary_stats(date, time_input, traffic_type):
     start_main = time.time()
     timings = {}
+    key = summary_key(date, time_input, traffic_type)
+    date, time_input, traffic_type = key
+
+    # In-memory completeness check, weather work is queued only when needed
+    if not is_weather_complete(date):
+        enqueue_weather_assignment(date)
+
+    version = cached_data_version(date)
+    cached = get_cached_summary(key, version)
+    if cached is not None:
+        observe_stage("summary", "total", time.time() - start_main)
+        GENERATIONS.inc(generator="summary", outcome="cached")
+        return cached
 
     console.print("\n[bold magenta]========== SUMMARY GENERATION ==========[/bold magenta]")
     console.print(f"Date: [green]{date}[/green] | Time: [green]{time_input}[/green] | Type: [green]{traffic_type}[/green]")
 
-    connection = mysql.connector.connect(**DB_CONFIG)
+    # One connection for the cache lookup, the query and every write
+    connection = get_connection()
     cursor = connection.cursor(dictionary=True)
 
-    cursor.execute("""
-        SELECT Summary_JSON FROM summary_cache
-        WHERE Date_Filter = %s AND Time_Filter = %s AND Traffic_Type = %s
-    """, (date, time_input, traffic_type))
-
-    cached = cursor.fetchone()
-    if cached:
-        summary_data = json.loads(cached['Summary_JSON'])
-        filename = f"{date}_{time_input[:2]}-{traffic_type}.html"
-        barchart_path = os.path.join("barchart", filename)
-
-        if os.path.exists(barchart_path):
-            console.print("[cyan]Summary loaded from cache[/cyan]")
-            return {
-                "summary": summary_data,
-                "bar_chart": summary_data['selected_hour']['per_location'],
-                "line_chart": {},
-                "location_availability": {
-                    loc: loc in summary_data['selected_hour']['per_location']
-                    for loc in LOCATION_COORDINATES
-                }
-            }
+    cached = get_cached_summary(key, version, cursor)
+    if cached is not None:
+        console.print("[cyan]Summary loaded from cache[/cyan]")
+        cursor.close()
+        connection.close()
+        observe_stage("summary", "total", time.time() - start_main)
+        GENERATIONS.inc(generator="summary", outcome="cached")
+        return cached
 
     summary = {
         "date": date,
@@ -83,7 +159,6 @@ def get_summary_stats(date, time_input, traffic_type):
     }
 
     bar_chart = {}
-    line_chart = {}
 
     try:
         t0 = time.time()
@@ -101,7 +176,7 @@ def get_summary_stats(date, time_input, traffic_type):
         """, (date, traffic_type))
 
         rows = cursor.fetchall()
-        timings["data_query"] = round(time.time() - t0, 2)
+        timings["data_query"] = time.time() - t0
         console.print(f"Fetched {len(rows)} rows of data.")
 
         location_totals = {}
@@ -117,7 +192,6 @@ def get_summary_stats(date, time_input, traffic_type):
             location_totals[loc] = location_totals.get(loc, 0) + cnt
             bar_chart[loc] = bar_chart.get(loc, 0) + cnt
             time_label = f"{hr:02}:00"
-            line_chart[time_label] = line_chart.get(time_label, 0) + cnt
 
             if time_label not in hourly_data:
                 hourly_data[time_label] = {}
@@ -151,71 +225,51 @@ def get_summary_stats(date, time_input, traffic_type):
 
         t1 = time.time()
         console.print("[cyan]Generating bar chart...[/cyan]")
-        barchart_path = export_bar_chart_html(
+        export_bar_chart_html(
             selected_data,
             total_data,
             average_data,
             date=date,
             time=time_input,
-            traffic_type=traffic_type
+            traffic_type=traffic_type,
+            conn=connection
         )
-        timings["chart_render"] = round(time.time() - t1, 2)
+        timings["chart_render"] = time.time() - t1
 
-        barchart_url = None
         t2 = time.time()
-        if barchart_path:
-            base_url = os.getenv("BASE_URL", "http://localhost:5000")
-            prod_url = os.getenv("PROD_URL", "https://smart-foot-traffic-backend.onrender.com")
-            barchart_url = f"{prod_url}/{barchart_path.replace(os.sep, '/')}" if "localhost" not in base_url else f"{base_url}/{barchart_path.replace(os.sep, '/')}"
-
-            cursor.close()
-            connection.close()
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT Heatmap_ID FROM heatmaps
-                WHERE Traffic_Type = %s AND Date_Filter = %s AND Time_Filter = %s
-            """, (traffic_type, date, time_input))
-            result = cursor.fetchone()
-
-            if result:
-                heatmap_id = result[0]
-                cursor.execute("""
-                    UPDATE heatmaps
-                    SET BarChart_URL = %s
-                    WHERE Heatmap_ID = %s
-                """, (barchart_url, heatmap_id))
-                console.print(f"[green]Bar chart URL updated in heatmaps for ID {heatmap_id}[/green]")
-            connection.commit()
-            cursor = connection.cursor(dictionary=True)
-        timings["db_update"] = round(time.time() - t2, 2)
-
+        summary_json = json.dumps(summary)
         cursor.execute("""
-            INSERT INTO summary_cache (Date_Filter, Time_Filter, Traffic_Type, Summary_JSON)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE Summary_JSON = VALUES(Summary_JSON), Generated_At = CURRENT_TIMESTAMP
-        """, (
-            date, time_input, traffic_type,
-            json.dumps(summary)
-        ))
+            INSERT INTO summary_cache (Date_Filter, Time_Filter, Traffic_Type, Summary_JSON, Data_Version)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                Summary_JSON = VALUES(Summary_JSON),
+                Data_Version = VALUES(Data_Version),
+                Generated_At = CURRENT_TIMESTAMP
+        """, (date, time_input, traffic_type, summary_json, version))
         connection.commit()
+        timings["db_update"] = time.time() - t2
         console.print("[green]Summary cached to database[/green]")
 
-        included_locations = summary['selected_hour']['per_location'].keys()
-        location_availability = {
-            loc: loc in included_locations
-            for loc in LOCATION_COORDINATES
-        }
+        result = _remember(key, version, summary_json)
+        location_availability = result["location_availability"]
 
     except Exception as e:
         console.print(f"[bold red]Error in seasonal_stats:[/bold red] {e}")
+        GENERATIONS.inc(generator="summary", outcome="failed")
         location_availability = {}
+        result = build_summary_result(summary, location_availability)
 
     finally:
         if cursor: cursor.close()
         if connection: connection.close()
 
     total_duration = round(time.time() - start_main, 2)
+    for stage, name in (("fetch", "data_query"), ("render", "chart_render"), ("db", "db_update")):
+        if name in timings:
+            observe_stage("summary", stage, timings[name])
+    observe_stage("summary", "total", time.time() - start_main)
+    if location_availability:
+        GENERATIONS.inc(generator="summary", outcome="generated")
 
     console.print("[bold magenta]" + "-" * 50 + "[/bold magenta]")
     console.print(f"[bold]📅 Date:[/]    {date}    [bold]🕒 Time:[/] {time_input}")
@@ -227,12 +281,7 @@ def get_summary_stats(date, time_input, traffic_type):
     console.print(f"[bold]⏱️ Total Duration        [/bold]{total_duration:>6.2f}s")
     console.print("[bold magenta]" + "=" * 50 + "[/bold magenta]")
 
-    return {
-        "summary": summary,
-        "bar_chart": summary['selected_hour']['per_location'],
-        "line_chart": line_chart,
-        "location_availability": location_availability
-    }
+    return result
 
 if __name__ == "__main__":
     result = get_summary_stats("2024-05-05", "14:00:00", "Vehicle Count")
@@ -0,0 +1,102 @@
+# ======================================
+# Generated Artifact Manifest for Smart Foot Traffic
+# ======================================
+# - One row per artifact: (kind, params) -> path, content hash
+#   and the data version of the date it was built from
+# - An artifact is current only if its row carries the date's
+#   current version (data_versions) and the file still exists
+# - Replaces "skip if the file exists" in the generators
+# - Kept across DB resets, like the files it describes
+# ======================================
+
+import hashlib
+import json
+import os
+
+from backend.db.connection import get_connection
+from backend.utils.artifacts import artifact_hash
+
+CREATE_ARTIFACT_MANIFEST = """
+    CREATE TABLE IF NOT EXISTS artifact_manifest (
+        Kind VARCHAR(30) NOT NULL,
+        Params_Key CHAR(40) NOT NULL,
+        Params_JSON VARCHAR(500) NOT NULL,
+        Data_Version INT NOT NULL,
+        Path VARCHAR(255) NOT NULL,
+        Content_Hash CHAR(64) NOT NULL,
+        Size_Bytes INT NOT NULL,
+        Updated_At DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (Kind, Params_Key)
+    );
+"""
+
+# Params are stored as canonical JSON, keyed by its SHA-1
+def params_key(params):
+    params_json = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(params_json.encode("utf-8")).hexdigest(), params_json
+
+def _connect(conn):
+    if conn is not None:
+        return conn, False
+    return get_connection(), True
+
+# =====================================================
+# FUNCTION: Which of these artifacts are current
+# Returns the subset of params_list (as params keys) whose
+# manifest row matches version and whose file exists
+# =====================================================
+def current_artifacts(kind, params_list, version, conn=None):
+    keys = [params_key(params)[0] for params in params_list]
+    if not keys:
+        return set()
+
+    conn, own_conn = _connect(conn)
+    cursor = conn.cursor()
+    cursor.execute(CREATE_ARTIFACT_MANIFEST)
+    placeholders = ", ".join(["%s"] * len(keys))
+    cursor.execute(f"""
+        SELECT Params_Key, Path FROM artifact_manifest
+        WHERE Kind = %s AND Data_Version = %s AND Params_Key IN ({placeholders})
+    """, (kind, version, *keys))
+    current = {key for key, path in cursor.fetchall() if os.path.exists(path)}
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return current
+
+def is_artifact_current(kind, params, version, conn=None):
+    return params_key(params)[0] in current_artifacts(kind, [params], version, conn)
+
+# =====================================================
+# FUNCTION: Record freshly written artifacts
+# rows: iterable of (kind, params, version, path)
+# Content hash comes from write_artifact's hash index
+# =====================================================
+def record_artifacts(rows, conn=None):
+    values = []
+    for kind, params, version, path in rows:
+        key, params_json = params_key(params)
+        values.append((kind, key, params_json, version, path, artifact_hash(path), os.path.getsize(path)))
+    if not values:
+        return 0
+
+    conn, own_conn = _connect(conn)
+    cursor = conn.cursor()
+    cursor.execute(CREATE_ARTIFACT_MANIFEST)
+    cursor.executemany("""
+        INSERT INTO artifact_manifest (Kind, Params_Key, Params_JSON, Data_Version, Path, Content_Hash, Size_Bytes)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Data_Version = VALUES(Data_Version),
+            Path = VALUES(Path),
+            Content_Hash = VALUES(Content_Hash),
+            Size_Bytes = VALUES(Size_Bytes)
+    """, values)
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return len(values)
+
+def record_artifact(kind, params, version, path, conn=None):
+    return record_artifacts([(kind, params, version, path)], conn)
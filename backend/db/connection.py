@@ -0,0 +1,116 @@
+# ======================================
+# Pooled MySQL Connections for Smart Foot Traffic
+# --------------------------------------
+# - get_connection() hands out a connection from a shared pool
+#   (DB_POOL_SIZE, default 8); conn.close() returns it
+# - When every connection is checked out the caller waits (up to
+#   DB_POOL_TIMEOUT seconds) instead of failing at once
+# - Checkout waits go to the sft_db_pool_checkout_seconds histogram
+# - DB_POOL_SIZE=0 opens a plain connection per call (old behaviour)
+# - The pool is created lazily per process, so forked workers
+#   never share sockets with their parent
+# - Used by the generators and the artifact/version lookups;
+#   one-off scripts keep calling mysql.connector.connect()
+# ======================================
+
+import os
+import time
+from threading import Lock
+
+import mysql.connector
+from mysql.connector import pooling
+
+from backend.config import DB_CONFIG
+from backend.utils.metrics import registry
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
+CHECKOUT_SECONDS = registry.histogram(
+    "sft_db_pool_checkout_seconds",
+    "Time spent waiting for a database connection",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+CHECKOUT_TIMEOUTS = registry.counter(
+    "sft_db_pool_timeouts_total",
+    "Connection requests that gave up waiting for the pool"
+)
+
+_pool = None
+_pool_pid = None
+_pool_lock = Lock()
+_checked_out = 0
+
+class _Connection:
+    # Counts the connection back in exactly once, then closes/returns it
+    def __init__(self, conn):
+        self._conn = conn
+        self._closed = False
+
+    def close(self):
+        global _checked_out
+        if self._closed:
+            return
+        self._closed = True
+        with _pool_lock:
+            _checked_out -= 1
+        self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    # A connection dropped without close() (error paths) still goes back
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=f"sft_{os.getpid()}", pool_size=DB_POOL_SIZE, **DB_CONFIG
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+# =====================================================
+# FUNCTION: Check out a database connection
+# Raises mysql.connector.errors.PoolError after DB_POOL_TIMEOUT
+# =====================================================
+def get_connection():
+    global _checked_out
+    start = time.perf_counter()
+    if DB_POOL_SIZE <= 0:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+        return conn
+
+    pool = _get_pool()
+    delay = 0.005
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except mysql.connector.errors.PoolError:
+            if time.perf_counter() - start > DB_POOL_TIMEOUT:
+                CHECKOUT_TIMEOUTS.inc()
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+    with _pool_lock:
+        _checked_out += 1
+    return _Connection(conn)
+
+def pool_status():
+    return {"size": max(DB_POOL_SIZE, 0), "checked_out": _checked_out}
@@ -0,0 +1,100 @@
+# ======================================
+# Per-Date Data Versions for Smart Foot Traffic
+# ======================================
+# - One row per date: a counter + timestamp bumped whenever
+#   that date's traffic or weather data changes
+# - Bumped by preprocess (traffic) and weather_writer (weather)
+# - Generated artifacts older than their date's version are stale
+# - Kept across DB resets so versions only ever go up
+# - cached_data_version() serves hot paths from memory for a
+#   few seconds (DATA_VERSION_TTL); bumps in this process
+#   clear it at once
+# ======================================
+
+import os
+import time
+from threading import Lock
+from backend.db.connection import get_connection
+
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", 5))
+
+_version_cache = {}     # 'YYYY-MM-DD' -> (version, fetched at)
+_version_lock = Lock()
+
+CREATE_DATA_VERSIONS = """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        Date DATE NOT NULL PRIMARY KEY,
+        Version INT NOT NULL DEFAULT 1,
+        Updated_At DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+"""
+
+# =====================================================
+# FUNCTION: Mark dates as changed
+# dates: iterable of 'YYYY-MM-DD' strings or date objects
+# =====================================================
+def bump_data_versions(dates, conn=None):
+    rows = [(str(d)[:10],) for d in sorted({str(d)[:10] for d in dates})]
+    if not rows:
+        return 0
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(CREATE_DATA_VERSIONS)
+    cursor.executemany("""
+        INSERT INTO data_versions (Date, Version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE Version = Version + 1, Updated_At = CURRENT_TIMESTAMP
+    """, rows)
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+
+    with _version_lock:
+        for (date,) in rows:
+            _version_cache.pop(date, None)
+    return len(rows)
+
+# =====================================================
+# FUNCTION: Current versions for a date range
+# Returns {'YYYY-MM-DD': (version, updated_at)}
+# Dates that never changed are simply missing
+# =====================================================
+def get_data_versions(date_from, date_to=None):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(CREATE_DATA_VERSIONS)
+    cursor.execute("""
+        SELECT Date, Version, Updated_At FROM data_versions
+        WHERE Date BETWEEN %s AND %s
+    """, (date_from, date_to or date_from))
+    versions = {date.strftime('%Y-%m-%d'): (version, updated_at) for date, version, updated_at in cursor.fetchall()}
+    cursor.close()
+    conn.close()
+    return versions
+
+# Current version of one date (0 if its data never changed)
+def get_data_version(date_filter):
+    date_filter = str(date_filter)[:10]
+    return get_data_versions(date_filter).get(date_filter, (0, None))[0]
+
+# get_data_version() at most max_age seconds old
+def cached_data_version(date_filter, max_age=DATA_VERSION_TTL):
+    date_filter = str(date_filter)[:10]
+    now = time.monotonic()
+    with _version_lock:
+        cached = _version_cache.get(date_filter)
+    if cached is not None and now - cached[1] < max_age:
+        return cached[0]
+
+    version = get_data_version(date_filter)
+    with _version_lock:
+        _version_cache[date_filter] = (version, now)
+    return version
+
+# Version of a whole date range: the sum only ever goes up
+# when any date in the range changes
+def get_range_version(date_from, date_to):
+    return sum(version for version, _ in get_data_versions(date_from, date_to).values())
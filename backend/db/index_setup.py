@@ -22,6 +22,12 @@ def create_indexes_if_missing():
             ON processed_data (Data_ID)
         """),
 
+        # Index for joining weather_hourly on (Location, Date_Time)
+        ("idx_processed_location_datetime", """
+            CREATE INDEX idx_processed_location_datetime
+            ON processed_data (Location, Date_Time)
+        """),
+
         # Index for filtering and joining in traffic_counts
         ("idx_traffic_type_dataid", """
             CREATE INDEX idx_traffic_type_dataid
@@ -3,6 +3,15 @@
 # ------------------------------------------------
 # - Drops and recreates all required tables
 # - Includes new summary_cache table to cache summary stats
+# - weather_hourly is kept across resets (keyed by location + hour,
+#   not Data_ID), so fetched weather never has to be downloaded twice
+# - weather_completeness is reset with processed_data (it describes
+#   which traffic hours have weather, so it is rebuilt on demand)
+# - data_versions is kept across resets so versions only go up
+# - traffic rollups are reset with processed_data (derived from it)
+# - artifact_manifest is kept too (it describes files on disk)
+# - heatmaps has one row per (type, date, time) (unique_heatmap);
+#   older databases: run backend/db/migrate_heatmaps_unique.py
 # ================================================================
 
 import mysql.connector
@@ -10,6 +19,11 @@ import sys, os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from backend.config import DB_CONFIG
+from backend.forecast.weather_writer import CREATE_WEATHER_HOURLY
+from backend.forecast.weather_index import CREATE_WEATHER_COMPLETENESS
+from backend.db.data_versions import CREATE_DATA_VERSIONS
+from backend.db.artifact_manifest import CREATE_ARTIFACT_MANIFEST
+from backend.db.traffic_rollups import CREATE_TRAFFIC_ROLLUP_DAILY, CREATE_TRAFFIC_ROLLUP_HOURLY
 
 # Create database if it doesn't exist
 def create_database_if_not_exists():
@@ -33,6 +47,9 @@ def create_database_if_not_exists():
 # Step 1: Drop old tables (drop summary_cache too)
 DROP_QUERIES = [
     "DROP TABLE IF EXISTS summary_cache;",
+    "DROP TABLE IF EXISTS weather_completeness;",
+    "DROP TABLE IF EXISTS traffic_rollup_hourly;",
+    "DROP TABLE IF EXISTS traffic_rollup_daily;",
     "DROP TABLE IF EXISTS weather_season_data;",
     "DROP TABLE IF EXISTS traffic_counts;",
     "DROP TABLE IF EXISTS processed_data;"
@@ -64,20 +81,33 @@ CREATE_QUERIES = [
     );
     """,
 
-    # Weather & Season
+    # Season (weather/temperature now live in weather_hourly)
     """
     CREATE TABLE IF NOT EXISTS weather_season_data (
         Weather_ID INT AUTO_INCREMENT PRIMARY KEY,
         Data_ID INT NOT NULL,
-        Weather VARCHAR(50) NOT NULL,
-        Temperature FLOAT,
         Season VARCHAR(50) NOT NULL,
         FOREIGN KEY (Data_ID) REFERENCES processed_data(Data_ID),
-        INDEX idx_season (Season),
-        INDEX idx_weather (Weather)
+        INDEX idx_season (Season)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
     """,
 
+    # Hourly Weather (one row per location-hour, joined on Location + Date_Time)
+    CREATE_WEATHER_HOURLY,
+
+    # Weather completeness per (location, date), backs the in-memory index
+    CREATE_WEATHER_COMPLETENESS,
+
+    # Per-date data versions (kept across resets, used to spot stale artifacts)
+    CREATE_DATA_VERSIONS,
+
+    # Daily/hourly traffic rollups for range heatmaps (rebuilt by preprocess)
+    CREATE_TRAFFIC_ROLLUP_HOURLY,
+    CREATE_TRAFFIC_ROLLUP_DAILY,
+
+    # Generated artifacts: (kind, params) -> path, content hash, data version
+    CREATE_ARTIFACT_MANIFEST,
+
     # Heatmap Table
     """
     CREATE TABLE IF NOT EXISTS heatmaps (
@@ -88,7 +118,8 @@ CREATE_QUERIES = [
         Time_Filter TIME,
         Status VARCHAR(20) DEFAULT 'Generated',
         Heatmap_URL VARCHAR(255),
-        BarChart_URL VARCHAR(255)
+        BarChart_URL VARCHAR(255),
+        UNIQUE KEY unique_heatmap (Traffic_Type, Date_Filter, Time_Filter)
     );
     """,
 
@@ -100,6 +131,7 @@ CREATE_QUERIES = [
         Time_Filter TIME,
         Traffic_Type VARCHAR(50),
         Summary_JSON TEXT,
+        Data_Version INT NOT NULL DEFAULT 0,
         Generated_At DATETIME DEFAULT CURRENT_TIMESTAMP,
         UNIQUE KEY unique_summary (Date_Filter, Time_Filter, Traffic_Type)
     );
@@ -0,0 +1,86 @@
+# ================================================================
+# Migration: one heatmaps row per (type, date, time)
+# ------------------------------------------------
+# - Removes duplicate heatmaps rows left by the old
+#   SELECT-then-INSERT (keeps the newest row of each group)
+# - Adds the unique_heatmap key the generators now upsert on
+# - Creates artifact_manifest (if missing)
+#
+# Usage:
+#   python backend/db/migrate_heatmaps_unique.py
+# ================================================================
+
+import mysql.connector
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.config import DB_CONFIG
+from backend.db.artifact_manifest import CREATE_ARTIFACT_MANIFEST
+
+def unique_key_exists(cursor):
+    cursor.execute("""
+        SELECT COUNT(1)
+        FROM information_schema.statistics
+        WHERE table_schema = %s AND table_name = 'heatmaps'
+          AND index_name = 'unique_heatmap'
+    """, (DB_CONFIG["database"],))
+    return cursor.fetchone()[0] > 0
+
+def migrate_heatmaps_unique():
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+
+        print("\n========================================")
+        print("Creating artifact_manifest (if missing)...")
+        print("========================================")
+        cursor.execute(CREATE_ARTIFACT_MANIFEST)
+
+        if unique_key_exists(cursor):
+            print("heatmaps already has unique_heatmap. Nothing to migrate.")
+            cursor.close()
+            conn.close()
+            return
+
+        print("\n========================================")
+        print("Removing duplicate heatmaps rows...")
+        print("========================================")
+        # Keep the newest row; fill its missing bar chart URL from an older duplicate first
+        cursor.execute("""
+            UPDATE heatmaps keep
+            JOIN heatmaps dup
+              ON dup.Traffic_Type = keep.Traffic_Type
+             AND dup.Date_Filter = keep.Date_Filter
+             AND dup.Time_Filter = keep.Time_Filter
+             AND dup.Heatmap_ID < keep.Heatmap_ID
+            SET keep.BarChart_URL = dup.BarChart_URL
+            WHERE keep.BarChart_URL IS NULL AND dup.BarChart_URL IS NOT NULL
+        """)
+        cursor.execute("""
+            DELETE dup FROM heatmaps dup
+            JOIN heatmaps keep
+              ON dup.Traffic_Type = keep.Traffic_Type
+             AND dup.Date_Filter = keep.Date_Filter
+             AND dup.Time_Filter = keep.Time_Filter
+             AND dup.Heatmap_ID < keep.Heatmap_ID
+        """)
+        print(f"Removed {cursor.rowcount} duplicate rows.")
+
+        print("\n========================================")
+        print("Adding unique_heatmap key...")
+        print("========================================")
+        cursor.execute("""
+            ALTER TABLE heatmaps
+            ADD UNIQUE KEY unique_heatmap (Traffic_Type, Date_Filter, Time_Filter)
+        """)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        print("\nMigration to unique heatmaps rows completed successfully.")
+
+    except mysql.connector.Error as err:
+        print(f"\nMySQL Error: {err}")
+
+if __name__ == "__main__":
+    migrate_heatmaps_unique()
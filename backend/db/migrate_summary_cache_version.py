@@ -0,0 +1,56 @@
+# ================================================================
+# Migration: data version on summary_cache rows
+# ------------------------------------------------
+# - Adds summary_cache.Data_Version; summaries are only reused
+#   while it matches their date's data_versions entry
+# - Existing rows get 0, so they are recomputed on first use
+#   for any date whose data has changed since
+#
+# Usage:
+#   python backend/db/migrate_summary_cache_version.py
+# ================================================================
+
+import mysql.connector
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.config import DB_CONFIG
+
+def version_column_exists(cursor):
+    cursor.execute("""
+        SELECT COUNT(1)
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = 'summary_cache'
+          AND column_name = 'Data_Version'
+    """, (DB_CONFIG["database"],))
+    return cursor.fetchone()[0] > 0
+
+def migrate_summary_cache_version():
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+
+        if version_column_exists(cursor):
+            print("summary_cache already has Data_Version. Nothing to migrate.")
+            cursor.close()
+            conn.close()
+            return
+
+        print("\n========================================")
+        print("Adding summary_cache.Data_Version...")
+        print("========================================")
+        cursor.execute("""
+            ALTER TABLE summary_cache
+            ADD COLUMN Data_Version INT NOT NULL DEFAULT 0 AFTER Summary_JSON
+        """)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        print("\nMigration of summary_cache completed successfully.")
+
+    except mysql.connector.Error as err:
+        print(f"\nMySQL Error: {err}")
+
+if __name__ == "__main__":
+    migrate_summary_cache_version()
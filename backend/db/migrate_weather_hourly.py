@@ -0,0 +1,109 @@
+# ================================================================
+# Migration: weather_season_data -> weather_hourly
+# ------------------------------------------------
+# - Creates the weather_hourly table (one row per location-hour)
+# - Backfills it from the old per-Data_ID Weather/Temperature columns
+# - Restores Weather_Code from the stored weather label
+# - Drops the old columns from weather_season_data afterwards
+#   (pass --keep-legacy-columns to keep them)
+#
+# Usage:
+#   python backend/db/migrate_weather_hourly.py [--keep-legacy-columns]
+# ================================================================
+
+import argparse
+import mysql.connector
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.config import DB_CONFIG
+from backend.forecast.weather import WEATHER_MAP
+from backend.forecast.weather_writer import CREATE_WEATHER_HOURLY
+
+def legacy_columns_exist(cursor):
+    cursor.execute("""
+        SELECT COUNT(1)
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = 'weather_season_data'
+          AND column_name IN ('Weather', 'Temperature')
+    """, (DB_CONFIG["database"],))
+    return cursor.fetchone()[0] == 2
+
+def migrate_weather_hourly(keep_legacy_columns=False):
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+
+        print("\n========================================")
+        print("Creating weather_hourly (if missing)...")
+        print("========================================")
+        cursor.execute(CREATE_WEATHER_HOURLY)
+
+        if not legacy_columns_exist(cursor):
+            print("weather_season_data has no Weather/Temperature columns. Nothing to migrate.")
+            cursor.close()
+            conn.close()
+            return
+
+        print("\n========================================")
+        print("Backfilling weather_hourly from weather_season_data...")
+        print("========================================")
+        # The three traffic-type rows of one hour carry the same values,
+        # so collapse them with one grouped INSERT ... SELECT
+        cursor.execute("""
+            INSERT INTO weather_hourly (Location, Hour_TS, Weather, Temperature)
+            SELECT pd.Location, pd.Date_Time,
+                   MAX(NULLIF(wsd.Weather, 'Undefined')),
+                   MAX(wsd.Temperature)
+            FROM processed_data pd
+            JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
+            GROUP BY pd.Location, pd.Date_Time
+            HAVING MAX(NULLIF(wsd.Weather, 'Undefined')) IS NOT NULL
+                OR MAX(wsd.Temperature) IS NOT NULL
+            ON DUPLICATE KEY UPDATE
+                Weather = COALESCE(weather_hourly.Weather, VALUES(Weather)),
+                Temperature = COALESCE(weather_hourly.Temperature, VALUES(Temperature))
+        """)
+        print(f"Backfilled {cursor.rowcount} location-hours.")
+
+        # Map labels back to Open-Meteo codes
+        case_sql = " ".join("WHEN %s THEN %s" for _ in WEATHER_MAP)
+        params = [value for code, label in WEATHER_MAP.items() for value in (label, code)]
+        cursor.execute(f"""
+            UPDATE weather_hourly
+            SET Weather_Code = CASE Weather {case_sql} END
+            WHERE Weather_Code IS NULL AND Weather IS NOT NULL
+        """, params)
+        conn.commit()
+
+        if keep_legacy_columns:
+            # New inserts only write Season, so the old columns must accept defaults
+            cursor.execute("""
+                ALTER TABLE weather_season_data
+                MODIFY Weather VARCHAR(50) NULL DEFAULT 'Undefined'
+            """)
+            print("\nKept legacy Weather/Temperature columns (no longer updated).")
+        else:
+            print("\n========================================")
+            print("Dropping legacy Weather/Temperature columns...")
+            print("========================================")
+            cursor.execute("""
+                ALTER TABLE weather_season_data
+                DROP COLUMN Weather,
+                DROP COLUMN Temperature
+            """)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        print("\nMigration to weather_hourly completed successfully.")
+
+    except mysql.connector.Error as err:
+        print(f"\nMySQL Error: {err}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move weather/temperature into weather_hourly")
+    parser.add_argument("--keep-legacy-columns", action="store_true",
+                        help="Keep the old columns on weather_season_data instead of dropping them")
+    args = parser.parse_args()
+    migrate_weather_hourly(args.keep_legacy_columns)
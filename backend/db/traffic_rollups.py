@@ -0,0 +1,85 @@
+# ======================================
+# Traffic Rollups for Smart Foot Traffic
+# ======================================
+# - traffic_rollup_hourly: one row per (type, date, hour, location)
+# - traffic_rollup_daily: one row per (type, date, location)
+# - Both carry the weekday, so range heatmaps filter and sum a
+#   few thousand pre-aggregated rows instead of joining raw data
+# - Rebuilt by preprocess after every load (derived data only)
+#
+# Usage (rebuild by hand):
+#   python -m backend.db.traffic_rollups
+# ======================================
+
+import time
+import mysql.connector
+from backend.config import DB_CONFIG
+
+# Weekday follows MySQL WEEKDAY() / Python date.weekday(): 0 = Monday
+CREATE_TRAFFIC_ROLLUP_HOURLY = """
+    CREATE TABLE IF NOT EXISTS traffic_rollup_hourly (
+        Traffic_Type VARCHAR(50) NOT NULL,
+        Date DATE NOT NULL,
+        Hour TINYINT NOT NULL,
+        Weekday TINYINT NOT NULL,
+        Location VARCHAR(255) NOT NULL,
+        Count_Sum INT NOT NULL,
+        PRIMARY KEY (Traffic_Type, Date, Hour, Location)
+    );
+"""
+
+CREATE_TRAFFIC_ROLLUP_DAILY = """
+    CREATE TABLE IF NOT EXISTS traffic_rollup_daily (
+        Traffic_Type VARCHAR(50) NOT NULL,
+        Date DATE NOT NULL,
+        Weekday TINYINT NOT NULL,
+        Location VARCHAR(255) NOT NULL,
+        Count_Sum INT NOT NULL,
+        PRIMARY KEY (Traffic_Type, Date, Location)
+    );
+"""
+
+# =====================================================
+# FUNCTION: Rebuild both rollups from traffic_counts
+# Returns (hourly rows, daily rows)
+# =====================================================
+def rebuild_rollups(conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    cursor.execute(CREATE_TRAFFIC_ROLLUP_HOURLY)
+    cursor.execute(CREATE_TRAFFIC_ROLLUP_DAILY)
+    cursor.execute("DELETE FROM traffic_rollup_hourly")
+    cursor.execute("DELETE FROM traffic_rollup_daily")
+
+    cursor.execute("""
+        INSERT INTO traffic_rollup_hourly (Traffic_Type, Date, Hour, Weekday, Location, Count_Sum)
+        SELECT tc.Traffic_Type, pd.Date, HOUR(pd.Date_Time), WEEKDAY(pd.Date), pd.Location,
+               SUM(COALESCE(tc.Interval_Count, 0))
+        FROM processed_data pd
+        JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
+        WHERE pd.Date IS NOT NULL AND pd.Date_Time IS NOT NULL
+        GROUP BY tc.Traffic_Type, pd.Date, HOUR(pd.Date_Time), pd.Location
+    """)
+    hourly_rows = cursor.rowcount
+
+    cursor.execute("""
+        INSERT INTO traffic_rollup_daily (Traffic_Type, Date, Weekday, Location, Count_Sum)
+        SELECT Traffic_Type, Date, MIN(Weekday), Location, SUM(Count_Sum)
+        FROM traffic_rollup_hourly
+        GROUP BY Traffic_Type, Date, Location
+    """)
+    daily_rows = cursor.rowcount
+
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return hourly_rows, daily_rows
+
+if __name__ == "__main__":
+    start = time.time()
+    hourly_rows, daily_rows = rebuild_rollups()
+    print(f"Rollups rebuilt: {hourly_rows} hourly rows, {daily_rows} daily rows in {time.time() - start:.2f}s")
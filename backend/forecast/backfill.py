@@ -0,0 +1,188 @@
+# ===========================================================
+# Concurrent Weather Backfill for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Finds every (date, location) still missing weather or temp
+# - Fetches them through a bounded thread pool
+# - Throttles API calls with a requests-per-second limiter
+# - Reuses one keep-alive requests.Session with retry + backoff
+# - Only the main thread writes to MySQL (single DB writer)
+# - Each finished date is committed, so a rerun resumes
+#   from whatever is still missing
+# ===========================================================
+
+import os
+import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import mysql.connector
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rich.console import Console
+from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
+
+from backend.config import DB_CONFIG
+from backend.forecast.weather import fetch_hourly_weather
+from backend.forecast.weather_writer import write_weather_rows
+
+console = Console()
+
+# Defaults (override with CLI flags or env vars)
+DEFAULT_WORKERS = int(os.getenv("WEATHER_BACKFILL_WORKERS", 8))
+DEFAULT_RATE = float(os.getenv("WEATHER_API_RATE", 5))  # requests per second
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 4
+BACKOFF_FACTOR = 1  # 1s, 2s, 4s, 8s between retries
+
+# =====================================================
+# Simple thread-safe rate limiter
+# Hands out evenly spaced time slots to callers
+# =====================================================
+class RateLimiter:
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        # Sleep outside the lock so other threads can reserve their slot
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+# Keep-alive session shared by all workers, retries 429/5xx with backoff
+def create_session(pool_size=DEFAULT_WORKERS):
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# =====================================================
+# FUNCTION: List (date, location) pairs missing weather
+# Optional date range to limit the backfill
+# =====================================================
+def find_missing_location_dates(date_from=None, date_to=None):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    query = """
+        SELECT DISTINCT pd.Date, pd.Location
+        FROM processed_data pd
+        LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+        WHERE (wh.Weather IS NULL OR wh.Temperature IS NULL)
+    """
+    params = []
+    if date_from:
+        query += " AND pd.Date >= %s"
+        params.append(date_from)
+    if date_to:
+        query += " AND pd.Date <= %s"
+        params.append(date_to)
+    query += " ORDER BY pd.Date, pd.Location"
+
+    cursor.execute(query, params)
+    pairs = [(row[0].strftime('%Y-%m-%d'), row[1]) for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return pairs
+
+def _fetch_task(session, limiter, location, date):
+    limiter.wait()
+    return fetch_hourly_weather(location, date, session=session, timeout=REQUEST_TIMEOUT)
+
+# =====================================================
+# FUNCTION: Run the concurrent backfill
+# Returns a dict with counts of dates written and failures
+# =====================================================
+def backfill_weather(date_from=None, date_to=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE):
+    pairs = find_missing_location_dates(date_from, date_to)
+    result = {"dates": 0, "rows": 0, "failed": [], "interrupted": False}
+
+    if not pairs:
+        console.print("[bold yellow]No dates found with missing weather or temperature.[/bold yellow]")
+        return result
+
+    # How many locations each date still waits on before it can be written
+    remaining = defaultdict(int)
+    for date, _ in pairs:
+        remaining[date] += 1
+    pending_rows = defaultdict(list)
+
+    console.print(
+        f"[cyan]Backfilling {len(pairs)} location-days across {len(remaining)} date(s) "
+        f"with {workers} workers @ {rate:g} req/s[/cyan]"
+    )
+
+    session = create_session(workers)
+    limiter = RateLimiter(rate)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def flush(date):
+        rows = pending_rows.pop(date, [])
+        result["rows"] += write_weather_rows(conn, rows)
+        result["dates"] += 1
+
+    try:
+        with Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            "[progress.percentage]{task.percentage:>3.0f}%",
+            TextColumn("{task.completed}/{task.total}"),
+            TimeElapsedColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task("[green]Fetching weather...", total=len(pairs))
+
+            futures = {
+                pool.submit(_fetch_task, session, limiter, location, date): (date, location)
+                for date, location in pairs
+            }
+
+            for future in as_completed(futures):
+                date, location = futures[future]
+                try:
+                    pending_rows[date].extend(future.result())
+                except Exception as e:
+                    result["failed"].append((date, location, str(e)))
+
+                remaining[date] -= 1
+                if remaining[date] == 0:
+                    # Main thread is the only DB writer
+                    flush(date)
+
+                progress.update(task, advance=1)
+
+    except KeyboardInterrupt:
+        result["interrupted"] = True
+        pool.shutdown(wait=False, cancel_futures=True)
+        # Keep whatever was already fetched, rerun resumes from the rest
+        for date in list(pending_rows):
+            flush(date)
+        console.print("\n[bold yellow]Backfill interrupted — progress saved. Run again to resume.[/bold yellow]")
+
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        session.close()
+        conn.close()
+
+    if result["failed"]:
+        console.print(f"[red]{len(result['failed'])} location-day fetch(es) failed and will be retried next run.[/red]")
+
+    return result
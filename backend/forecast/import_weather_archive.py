@@ -0,0 +1,266 @@
+# ===========================================================
+# Offline Weather Archive Import for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Reads Open-Meteo archive exports (JSON or CSV) from a folder
+# - Works with no outbound network (for locked-down servers)
+# - Matches each file to sensor locations by name or coordinates
+# - Loads everything into weather_hourly in one set-based load
+# - Reports any location/hours that are still missing afterwards
+#
+# Usage:
+#   python -m backend.forecast.import_weather_archive <folder> [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+#
+# File matching:
+#   - If the file name contains a sensor name (e.g. nic-st-campus.json)
+#     it is loaded for that location only
+#   - Otherwise it is loaded for every sensor within MATCH_RADIUS_KM of
+#     the file's latitude/longitude (all Footscray sensors share weather)
+# ===========================================================
+
+import os
+import csv
+import json
+import math
+import argparse
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from collections import defaultdict
+
+import mysql.connector
+from rich.console import Console
+
+from backend.config import DB_CONFIG
+from backend.forecast.weather import get_weather_label
+from backend.forecast.weather_writer import bulk_load_weather_rows
+from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
+
+console = Console()
+
+MATCH_RADIUS_KM = 10
+LOCAL_TZ = ZoneInfo("Australia/Melbourne")
+UTC_NAMES = {"GMT", "UTC"}
+
+def _slug(text):
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+def _distance_km(lat1, lon1, lat2, lon2):
+    # Haversine distance, good enough for matching grid cells to sensors
+    r = 6371.0
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = math.radians(lat2 - lat1), math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+# =====================================================
+# FUNCTION: Decide which sensor locations a file covers
+# =====================================================
+def match_locations(filename, lat=None, lon=None):
+    name = _slug(os.path.splitext(os.path.basename(filename))[0])
+    for location in LOCATION_COORDINATES:
+        if _slug(location) in name:
+            return [location]
+
+    if lat is None or lon is None:
+        return []
+
+    return [
+        location for location, (loc_lat, loc_lon) in LOCATION_COORDINATES.items()
+        if _distance_km(lat, lon, loc_lat, loc_lon) <= MATCH_RADIUS_KM
+    ]
+
+# Open-Meteo column names vary by version/format, e.g.
+# "weathercode", "weather_code", "weather_code (wmo code)", "temperature_2m (°C)"
+def _normalize_column(name):
+    name = name.split(" (")[0].strip().lower()
+    return "weathercode" if name == "weather_code" else name
+
+def _to_local_hour(time_str, is_utc):
+    ts = datetime.strptime(time_str.strip()[:16], "%Y-%m-%dT%H:%M")
+    if is_utc:
+        ts = ts.replace(tzinfo=ZoneInfo("UTC")).astimezone(LOCAL_TZ).replace(tzinfo=None)
+    return ts.strftime("%Y-%m-%d %H:00:00")
+
+def _to_number(value, cast):
+    if value is None or value == "":
+        return None
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        return None
+
+# Builds weather_hourly rows from parallel hourly arrays
+def _build_rows(locations, times, codes, temps, is_utc):
+    rows = []
+    for time_str, code, temp in zip(times, codes, temps):
+        code = _to_number(code, int)
+        temp = _to_number(temp, float)
+        weather = get_weather_label(code) if code is not None else "Unknown"
+        if weather == "Unknown":
+            code, weather = None, None
+        if weather is None and temp is None:
+            continue
+
+        hour_ts = _to_local_hour(time_str, is_utc)
+        for location in locations:
+            rows.append((location, hour_ts, code, weather, temp))
+    return rows
+
+# =====================================================
+# PARSERS: one Open-Meteo export -> list of rows
+# =====================================================
+def parse_json_export(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Multi-coordinate requests come back as a list of objects
+    blocks = data if isinstance(data, list) else [data]
+
+    rows = []
+    for block in blocks:
+        hourly = {_normalize_column(k): v for k, v in block.get("hourly", {}).items()}
+        if "time" not in hourly:
+            continue
+
+        locations = match_locations(path, block.get("latitude"), block.get("longitude"))
+        if not locations:
+            logging.warning(f"{os.path.basename(path)}: no sensor location matched, skipped")
+            continue
+
+        times = hourly["time"]
+        codes = hourly.get("weathercode") or [None] * len(times)
+        temps = hourly.get("temperature_2m") or [None] * len(times)
+        is_utc = block.get("timezone", "GMT") in UTC_NAMES
+        rows.extend(_build_rows(locations, times, codes, temps, is_utc))
+
+    return rows
+
+def parse_csv_export(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        lines = list(csv.reader(f))
+
+    # Layout: metadata header + values, blank line, hourly header + values
+    lat = lon = None
+    is_utc = True
+    start = 0
+    if lines and lines[0] and lines[0][0].strip().lower() == "latitude":
+        meta = dict(zip([c.strip().lower() for c in lines[0]], lines[1] if len(lines) > 1 else []))
+        lat = _to_number(meta.get("latitude"), float)
+        lon = _to_number(meta.get("longitude"), float)
+        is_utc = meta.get("timezone", "GMT").strip() in UTC_NAMES
+        start = 2
+
+    while start < len(lines) and not lines[start]:
+        start += 1
+    if start >= len(lines):
+        return []
+
+    header = [_normalize_column(c) for c in lines[start]]
+    if "time" not in header:
+        logging.warning(f"{os.path.basename(path)}: no 'time' column, skipped")
+        return []
+
+    locations = match_locations(path, lat, lon)
+    if not locations:
+        logging.warning(f"{os.path.basename(path)}: no sensor location matched, skipped")
+        return []
+
+    records = [dict(zip(header, line)) for line in lines[start + 1:] if line]
+    times = [r["time"] for r in records]
+    codes = [r.get("weathercode") for r in records]
+    temps = [r.get("temperature_2m") for r in records]
+    return _build_rows(locations, times, codes, temps, is_utc)
+
+# =====================================================
+# FUNCTION: Report location/hours still without weather
+# =====================================================
+def report_missing_weather(date_from=None, date_to=None):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    query = """
+        SELECT pd.Location, pd.Date, COUNT(DISTINCT pd.Date_Time) AS Missing_Hours
+        FROM processed_data pd
+        LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+        WHERE (wh.Weather IS NULL OR wh.Temperature IS NULL)
+    """
+    params = []
+    if date_from:
+        query += " AND pd.Date >= %s"
+        params.append(date_from)
+    if date_to:
+        query += " AND pd.Date <= %s"
+        params.append(date_to)
+    query += " GROUP BY pd.Location, pd.Date ORDER BY pd.Location, pd.Date"
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    if not rows:
+        console.print("\n[green]Weather coverage complete — no missing location/hours.[/green]")
+        return {}
+
+    missing = defaultdict(list)
+    for location, date, hours in rows:
+        missing[location].append((date, hours))
+
+    console.print("\n[bold red]Missing Weather Report (Grouped by Location):[/bold red]\n")
+    for location in sorted(missing):
+        days = missing[location]
+        total_hours = sum(hours for _, hours in days)
+        console.print(f"[bold]📍 -- {location} --[/bold]  {len(days)} day(s), {total_hours} hour(s)")
+        for date, hours in days[:10]:
+            console.print(f"    • [blue]{date}[/blue] → {hours} hour(s) missing")
+        if len(days) > 10:
+            console.print(f"    … and {len(days) - 10} more day(s)")
+    return dict(missing)
+
+# =====================================================
+# FUNCTION: Import every export in a folder
+# =====================================================
+def import_weather_archive(folder, date_from=None, date_to=None):
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if name.lower().endswith((".json", ".csv"))
+    )
+    if not files:
+        console.print(f"[bold yellow]No .json or .csv files found in {folder}[/bold yellow]")
+        return 0
+
+    rows = []
+    for path in files:
+        try:
+            parsed = parse_json_export(path) if path.lower().endswith(".json") else parse_csv_export(path)
+            console.print(f"[cyan]{os.path.basename(path)}[/cyan]: {len(parsed)} location-hours")
+            rows.extend(parsed)
+        except Exception as e:
+            console.print(f"[red]Failed to read {path}: {e}[/red]")
+
+    if date_from or date_to:
+        rows = [
+            r for r in rows
+            if (not date_from or r[1][:10] >= date_from) and (not date_to or r[1][:10] <= date_to)
+        ]
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    loaded = bulk_load_weather_rows(conn, rows)
+    conn.close()
+
+    console.print(f"\n[bold green]Imported {loaded} location-hours into weather_hourly.[/bold green]")
+    report_missing_weather(date_from, date_to)
+    return loaded
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Import Open-Meteo archive exports from a local folder")
+    parser.add_argument("folder", help="Folder containing Open-Meteo .json/.csv exports")
+    parser.add_argument("--from", dest="date_from", help="Only import/report from this date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Only import/report up to this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    import_weather_archive(args.folder, args.date_from, args.date_to)
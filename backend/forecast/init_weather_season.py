@@ -1,8 +1,7 @@
 # ===========================================================
-# Step 2: Set Default Weather & Season Values in Database
+# Step 2: Set Season Values in Database
 # -----------------------------------------------------------
 # - Loops through all cleaned traffic data rows
-# - Resets weather to 'Undefined' and temperature to NULL
 # - Detects and assigns season based on the month
 # - Saves or updates each record in weather_season_data table
 # ===========================================================
@@ -19,8 +18,8 @@ console = Console()
 
 # =====================================================
 # FUNCTION: Reset all rows in weather_season_data
-# Sets default values for weather + temperature,
-# and assigns season based on the timestamp month.
+# Assigns season based on the timestamp month.
+# (Weather/temperature live in weather_hourly.)
 # =====================================================
 def reset_weather_season_values():
     try:
@@ -59,11 +58,9 @@ def reset_weather_season_values():
 
                     # Insert new record or update existing one
                     cursor.execute("""
-                        INSERT INTO weather_season_data (Data_ID, Weather, Temperature, Season)
-                        VALUES (%s, 'Undefined', NULL, %s)
+                        INSERT INTO weather_season_data (Data_ID, Season)
+                        VALUES (%s, %s)
                         ON DUPLICATE KEY UPDATE
-                            Weather = 'Undefined',
-                            Temperature = NULL,
                             Season = VALUES(Season)
                     """, (data_id, season))
 
@@ -3,27 +3,16 @@
 # -----------------------------------------------------------
 # - Gets hourly temperature from Open-Meteo API
 # - Matches by date, time, and location
-# - Batch updates with lock retry logic (for stability)
+# - Bulk writes to weather_hourly with batch-level lock retry
 # ===========================================================
 
 import mysql.connector
+import logging
 import requests
-import time
 from backend.config import DB_CONFIG
+from backend.forecast.weather_writer import write_weather_rows
 from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 
-def safe_execute_with_retry(cursor, query, params, retries=2, delay=2):
-    for attempt in range(retries + 1):
-        try:
-            cursor.execute(query, params)
-            return True
-        except mysql.connector.Error as e:
-            if e.errno == 1205:  # Lock wait timeout
-                time.sleep(delay)
-            else:
-                raise
-    return False
-
 def assign_temperature(target_date):
     try:
         conn = mysql.connector.connect(**DB_CONFIG)
@@ -33,15 +22,15 @@ def assign_temperature(target_date):
         cursor.execute("""
             SELECT DISTINCT pd.Location
             FROM processed_data pd
-            JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
-            WHERE pd.Date = %s AND wsd.Temperature IS NULL
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+            WHERE pd.Date = %s AND wh.Temperature IS NULL
         """, (target_date,))
         locations = [row[0] for row in cursor.fetchall()]
 
         if not locations:
             return
 
-        total_updated = 0
+        rows = []
 
         for location in locations:
             lat, lon = LOCATION_COORDINATES.get(location, (-37.798, 144.888))
@@ -63,23 +52,18 @@ def assign_temperature(target_date):
                     if temp is None:
                         continue
 
-                    hour = hour_ts.split("T")[1] + ":00"
-
-                    safe_execute_with_retry(cursor, """
-                        UPDATE weather_season_data wsd
-                        JOIN processed_data pd ON pd.Data_ID = wsd.Data_ID
-                        SET wsd.Temperature = %s
-                        WHERE pd.Date = %s AND pd.Time = %s AND pd.Location = %s AND wsd.Temperature IS NULL
-                    """, (temp, target_date, hour, location))
+                    rows.append((location, hour_ts.replace("T", " ") + ":00", None, None, temp))
 
-                    total_updated += cursor.rowcount
-
-            except Exception:
+            except Exception as e:
+                logging.warning(f"Temperature fetch failed for {location} on {target_date}: {e}")
                 continue
 
-        conn.commit()
+        # Stored once per location-hour, in batched upserts
+        write_weather_rows(conn, rows)
+
         cursor.close()
         conn.close()
 
-    except Exception:
-        pass  # Silent fail for background use
+    except Exception as e:
+        # Still non-fatal for background use, but no longer silent
+        logging.error(f"Temperature assignment failed for {target_date}: {e}")
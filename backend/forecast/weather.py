@@ -2,8 +2,9 @@
 # Assign Real Weather per Hour (Step 3)
 # -----------------------------------------------------------
 # - Gets hourly weather from Open-Meteo API using weather codes
+# - Fetches weather code and temperature in one request per location
 # - Converts weather codes to readable labels (e.g. "Clear", "Rain")
-# - Updates the Weather column in weather_season_data
+# - Collects all hours first, then bulk writes them to weather_hourly
 # - Matches by date, time, and location for accuracy
 # ===========================================================
 
@@ -12,6 +13,7 @@ import logging
 import requests
 from datetime import datetime
 from backend.config import DB_CONFIG
+from backend.forecast.weather_writer import write_weather_rows
 from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 
 # Convert weather code to label
@@ -27,9 +29,53 @@ WEATHER_MAP = {
     95: "Thunderstorm", 96: "Thunderstorm + Hail", 99: "Thunderstorm + Heavy Hail"
 }
 
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
 def get_weather_label(code):
     return WEATHER_MAP.get(code, "Unknown")
 
+# =====================================================
+# FUNCTION: Fetch weather code + temperature for one
+# location/date in a single Open-Meteo call
+# Returns rows ready for write_weather_rows:
+# [(location, hour_ts, weather_code, weather, temperature), ...]
+# Pass a requests.Session to reuse keep-alive connections
+# =====================================================
+def fetch_hourly_weather(location, target_date, session=None, timeout=10):
+    lat, lon = LOCATION_COORDINATES.get(location, (-37.798, 144.888))
+    http = session or requests
+
+    response = http.get(OPEN_METEO_ARCHIVE_URL, params={
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": target_date,
+        "end_date": target_date,
+        "hourly": "weathercode,temperature_2m",
+        "timezone": "Australia/Melbourne"
+    }, timeout=timeout)
+    response.raise_for_status()
+    hourly = response.json().get("hourly", {})
+
+    if "time" not in hourly:
+        logging.warning(f"No weather data for {location} on {target_date}")
+        return []
+
+    codes = hourly.get("weathercode") or [None] * len(hourly["time"])
+    temps = hourly.get("temperature_2m") or [None] * len(hourly["time"])
+
+    rows = []
+    for hour_ts, code, temp in zip(hourly["time"], codes, temps):
+        weather = get_weather_label(code)
+        if weather == "Unknown":
+            code, weather = None, None
+        if weather is None and temp is None:
+            continue
+
+        # Convert timestamp (e.g., '2024-01-01T14:00') to processed_data.Date_Time format
+        rows.append((location, hour_ts.replace("T", " ") + ":00", code, weather, temp))
+
+    return rows
+
 def assign_weather(target_date):
     try:
         conn = mysql.connector.connect(**DB_CONFIG)
@@ -37,59 +83,27 @@ def assign_weather(target_date):
 
         logging.info(f"Assigning accurate weather for {target_date}...")
 
-        # Get all distinct locations that still have undefined weather
+        # Get all distinct locations that still have hours without weather
         cursor.execute("""
             SELECT DISTINCT pd.Location
             FROM processed_data pd
-            JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
-            WHERE pd.Date = %s AND wsd.Weather = 'Undefined'
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+            WHERE pd.Date = %s AND wh.Weather IS NULL
         """, (target_date,))
         locations = [row[0] for row in cursor.fetchall()]
 
-        total_updated = 0
+        rows = []
 
         for location in locations:
-            lat, lon = LOCATION_COORDINATES.get(location, (-37.798, 144.888))
-            date_str = target_date
-
-            # Fetch hourly weather for this location/date
-            url = (
-                f"https://archive-api.open-meteo.com/v1/archive?"
-                f"latitude={lat}&longitude={lon}&start_date={date_str}&end_date={date_str}"
-                f"&hourly=weathercode&timezone=Australia/Melbourne"
-            )
-            response = requests.get(url)
-            data = response.json()
-
-            if "hourly" not in data or "weathercode" not in data["hourly"]:
-                logging.warning(f"No weather data for {location} on {date_str}")
-                continue
-
-            time_map = dict(zip(data["hourly"]["time"], data["hourly"]["weathercode"]))
-
-            for hour_ts, code in time_map.items():
-                weather = get_weather_label(code)
-                if weather == "Unknown":
-                    continue
-
-                # Extract hour from timestamp (e.g., '2024-01-01T14:00')
-                hour = hour_ts.split("T")[1] + ":00"
-
-                # Bulk update all matching rows at once
-                cursor.execute("""
-                    UPDATE weather_season_data wsd
-                    JOIN processed_data pd ON pd.Data_ID = wsd.Data_ID
-                    SET wsd.Weather = %s
-                    WHERE pd.Date = %s AND pd.Time = %s AND pd.Location = %s AND wsd.Weather = 'Undefined'
-                """, (weather, target_date, hour, location))
-
-                total_updated += cursor.rowcount
-
-        conn.commit()
+            rows.extend(fetch_hourly_weather(location, target_date))
+
+        # Stored once per location-hour, in batched upserts
+        total_updated = write_weather_rows(conn, rows)
+
         cursor.close()
         conn.close()
 
-        logging.info(f"Assigned weather to {total_updated} rows on {target_date}.")
+        logging.info(f"Assigned weather to {total_updated} location-hours on {target_date}.")
 
     except Exception as e:
         logging.error(f"Weather assignment failed: {e}")
@@ -0,0 +1,171 @@
+# ===========================================================
+# Weather Completeness Index for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Tracks, per (location, date), how many traffic hours exist
+#   and how many of them already have weather + temperature
+# - Backed by the small weather_completeness table
+# - Mirrored in memory (loaded at server start, reloaded every
+#   WEATHER_INDEX_TTL seconds) so heatmap and summary requests can
+#   check a date in O(1), no big joins
+# - Kept up to date by weather_writer after every write and by
+#   preprocess after every traffic load
+# - Dates without traffic rows are unknown, never complete
+#
+# Usage (full rebuild):
+#   python -m backend.forecast.weather_index
+# ===========================================================
+
+import os
+import time
+from threading import Lock
+import mysql.connector
+from rich.console import Console
+
+from backend.config import DB_CONFIG
+
+console = Console()
+
+CREATE_WEATHER_COMPLETENESS = """
+    CREATE TABLE IF NOT EXISTS weather_completeness (
+        Location VARCHAR(255) NOT NULL,
+        Date DATE NOT NULL,
+        Expected_Hours SMALLINT NOT NULL,
+        Filled_Hours SMALLINT NOT NULL,
+        Updated_At DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (Location, Date)
+    );
+"""
+
+# Dates per refresh query (keeps the IN list reasonable)
+REFRESH_CHUNK = 500
+
+# Picks up changes made by other processes (preprocess, backfill CLI)
+WEATHER_INDEX_TTL = float(os.getenv("WEATHER_INDEX_TTL", 300))
+
+_lock = Lock()
+_loaded_at = None        # time.monotonic() of the last full load
+_by_date = {}            # 'YYYY-MM-DD' -> {location: complete?}
+_complete_dates = set()  # dates where every location is complete
+
+def _set_location(date, location, complete):
+    locations = _by_date.setdefault(date, {})
+    locations[location] = complete
+    if all(locations.values()):
+        _complete_dates.add(date)
+    else:
+        _complete_dates.discard(date)
+
+# =====================================================
+# FUNCTION: Load the whole index into memory
+# One small query, run at server start (or first use / TTL)
+# =====================================================
+def load_index():
+    global _loaded_at
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute(CREATE_WEATHER_COMPLETENESS)
+    cursor.execute("SELECT Location, Date, Expected_Hours, Filled_Hours FROM weather_completeness")
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    with _lock:
+        _by_date.clear()
+        _complete_dates.clear()
+        for location, date, expected, filled in rows:
+            _set_location(date.strftime('%Y-%m-%d'), location, filled >= expected)
+        _loaded_at = time.monotonic()
+
+    return len(rows)
+
+# =====================================================
+# FUNCTION: Is weather complete for this date?
+# In-memory lookup (reloaded once the copy is older than
+# WEATHER_INDEX_TTL). Unknown dates count as incomplete,
+# the weather job refreshes them before doing any work.
+# =====================================================
+def is_weather_complete(date_filter):
+    if _loaded_at is None or time.monotonic() - _loaded_at > WEATHER_INDEX_TTL:
+        try:
+            load_index()
+        except mysql.connector.Error:
+            if _loaded_at is None:
+                return False
+    return str(date_filter) in _complete_dates
+
+# Has this date any traffic rows in the index?
+def has_traffic(date_filter):
+    return str(date_filter)[:10] in _by_date
+
+# =====================================================
+# FUNCTION: Recompute the index for specific dates
+# Reads only those dates' rows, upserts the small table
+# and updates the in-memory copy
+# =====================================================
+def refresh_dates(dates, conn=None):
+    dates = sorted({str(d)[:10] for d in dates})
+    if not dates:
+        return
+
+    own_conn = conn is None
+    if own_conn:
+        conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute(CREATE_WEATHER_COMPLETENESS)
+
+    for start in range(0, len(dates), REFRESH_CHUNK):
+        chunk = dates[start:start + REFRESH_CHUNK]
+        placeholders = ", ".join(["%s"] * len(chunk))
+
+        cursor.execute(f"""
+            SELECT pd.Location, pd.Date,
+                   COUNT(DISTINCT pd.Date_Time) AS Expected_Hours,
+                   COUNT(DISTINCT CASE WHEN wh.Weather IS NOT NULL AND wh.Temperature IS NOT NULL
+                                       THEN pd.Date_Time END) AS Filled_Hours
+            FROM processed_data pd
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+            WHERE pd.Date IN ({placeholders})
+            GROUP BY pd.Location, pd.Date
+        """, chunk)
+        rows = [(loc, date.strftime('%Y-%m-%d'), expected, filled) for loc, date, expected, filled in cursor.fetchall()]
+
+        if rows:
+            cursor.executemany("""
+                INSERT INTO weather_completeness (Location, Date, Expected_Hours, Filled_Hours)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    Expected_Hours = VALUES(Expected_Hours),
+                    Filled_Hours = VALUES(Filled_Hours)
+            """, rows)
+            conn.commit()
+
+        with _lock:
+            for date in chunk:
+                # Dates without traffic rows stay unknown (their data may not be loaded yet)
+                _by_date.pop(date, None)
+                _complete_dates.discard(date)
+            for location, date, expected, filled in rows:
+                _set_location(date, location, filled >= expected)
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+
+# =====================================================
+# FUNCTION: Rebuild the index for every date in the DB
+# =====================================================
+def rebuild_index():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT Date FROM processed_data")
+    dates = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+
+    refresh_dates(dates, conn)
+    conn.close()
+    return len(dates)
+
+if __name__ == "__main__":
+    count = rebuild_index()
+    console.print(f"[green]Weather completeness index rebuilt for {count} date(s). "
+                  f"{len(_complete_dates)} complete.[/green]")
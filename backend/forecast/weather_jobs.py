@@ -0,0 +1,52 @@
+# ===========================================================
+# Background Weather Assignment Jobs
+# -----------------------------------------------------------
+# - One shared queue for all weather/temperature assignment
+# - Dedupes by (job type, date), so many heatmap clicks on the
+#   same date only trigger one fetch-and-write
+# - Skips dates whose weather is already complete (completeness index)
+# - Used by generate_heatmap and smart_generate
+# ===========================================================
+
+import os
+from rich.console import Console
+
+from backend.forecast.temperature import assign_temperature
+from backend.forecast.weather import assign_weather
+from backend.forecast.weather_index import has_traffic, is_weather_complete, refresh_dates
+from backend.jobs.job_queue import JobQueue
+
+console = Console()
+
+WEATHER_JOB_WORKERS = int(os.getenv("WEATHER_JOB_WORKERS", 2))
+
+weather_queue = JobQueue("weather", workers=WEATHER_JOB_WORKERS)
+
+# Re-reads this date's completeness from the DB (another process
+# such as the backfill CLI may have filled it) and checks the index;
+# a date without traffic rows has nothing to fill yet
+def _refresh_and_check(date_filter):
+    refresh_dates([date_filter])
+    return is_weather_complete(date_filter) or not has_traffic(date_filter)
+
+def _assign_weather_and_temperature(date_filter):
+    assign_weather(date_filter)
+    assign_temperature(date_filter)
+
+    # assign_* only log their errors, so surface an incomplete result as a failure
+    # (their writes already refreshed the index for this date)
+    if not is_weather_complete(date_filter):
+        raise RuntimeError(f"Weather still incomplete for {date_filter} after assignment")
+
+    console.print(f"[green]Weather/temp background assignment finished for {date_filter}[/green]")
+
+# =====================================================
+# FUNCTION: Queue weather + temperature for a date
+# Returns False if the date is already queued/running
+# =====================================================
+def enqueue_weather_assignment(date_filter):
+    return weather_queue.submit(
+        "weather", date_filter,
+        _assign_weather_and_temperature, date_filter,
+        skip_if=lambda: _refresh_and_check(date_filter)
+    )
@@ -0,0 +1,150 @@
+# ===========================================================
+# Bulk Weather Write-Back for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Stores fetched weather/temperature once per location-hour
+#   in the weather_hourly table (not once per Data_ID)
+# - Each batch is one multi-row INSERT ... ON DUPLICATE KEY UPDATE
+# - Batches are kept small enough to avoid lock wait timeouts
+# - Lock retry is done once per batch, not once per hour
+# - Offline imports can load everything in one staged INSERT ... SELECT
+# - Every write refreshes the weather completeness index and
+#   bumps the data version for the dates it touched
+# ===========================================================
+
+import logging
+import time
+import mysql.connector
+
+from backend.db.data_versions import bump_data_versions
+from backend.forecast.weather_index import refresh_dates
+
+# Location-hours per batch
+BATCH_SIZE = 2000
+
+CREATE_WEATHER_HOURLY = """
+    CREATE TABLE IF NOT EXISTS weather_hourly (
+        Location VARCHAR(255) NOT NULL,
+        Hour_TS DATETIME NOT NULL,
+        Weather_Code SMALLINT,
+        Weather VARCHAR(50),
+        Temperature FLOAT,
+        PRIMARY KEY (Location, Hour_TS)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+"""
+
+def safe_execute_with_retry(cursor, query, params=None, retries=2, delay=2, many=False):
+    for attempt in range(retries + 1):
+        try:
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+            return True
+        except mysql.connector.Error as e:
+            if e.errno == 1205:  # Lock wait timeout
+                time.sleep(delay)
+            else:
+                raise
+    return False
+
+# =====================================================
+# FUNCTION: Write hourly weather results in bulk
+# rows = [(location, hour_ts, weather_code, weather, temperature), ...]
+# hour_ts is 'YYYY-MM-DD HH:MM:SS' (matches processed_data.Date_Time)
+# Any value may be None when only part of it is known
+# Returns the number of location-hours written
+# =====================================================
+def write_weather_rows(conn, rows, batch_size=BATCH_SIZE):
+    if not rows:
+        return 0
+
+    cursor = conn.cursor()
+    total_written = 0
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        # Newer non-null values win, nulls never wipe what is already stored
+        applied = safe_execute_with_retry(cursor, """
+            INSERT INTO weather_hourly (Location, Hour_TS, Weather_Code, Weather, Temperature)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                Weather_Code = COALESCE(VALUES(Weather_Code), Weather_Code),
+                Weather = COALESCE(VALUES(Weather), Weather),
+                Temperature = COALESCE(VALUES(Temperature), Temperature)
+        """, batch, many=True)
+
+        if applied:
+            total_written += len(batch)
+            conn.commit()
+        else:
+            conn.rollback()
+            logging.warning(f"Skipped weather batch of {len(batch)} rows after repeated lock wait timeouts")
+
+    cursor.close()
+    if total_written:
+        touched = {row[1][:10] for row in rows}
+        refresh_dates(touched, conn)
+        bump_data_versions(touched, conn)
+    return total_written
+
+# =====================================================
+# FUNCTION: Load a large set of rows in one statement
+# Rows go into a temporary staging table first, then a single
+# INSERT ... SELECT merges them into weather_hourly
+# Used by offline archive imports (years of data at once)
+# =====================================================
+def bulk_load_weather_rows(conn, rows, chunk_size=10000):
+    if not rows:
+        return 0
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMPORARY TABLE IF NOT EXISTS weather_staging (
+            Location VARCHAR(255) NOT NULL,
+            Hour_TS DATETIME NOT NULL,
+            Weather_Code SMALLINT,
+            Weather VARCHAR(50),
+            Temperature FLOAT,
+            PRIMARY KEY (Location, Hour_TS)
+        )
+    """)
+    cursor.execute("DELETE FROM weather_staging")
+
+    # Staging table is private to this connection, so no lock contention here
+    for start in range(0, len(rows), chunk_size):
+        cursor.executemany("""
+            INSERT INTO weather_staging (Location, Hour_TS, Weather_Code, Weather, Temperature)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                Weather_Code = COALESCE(VALUES(Weather_Code), Weather_Code),
+                Weather = COALESCE(VALUES(Weather), Weather),
+                Temperature = COALESCE(VALUES(Temperature), Temperature)
+        """, rows[start:start + chunk_size])
+
+    applied = safe_execute_with_retry(cursor, """
+        INSERT INTO weather_hourly (Location, Hour_TS, Weather_Code, Weather, Temperature)
+        SELECT Location, Hour_TS, Weather_Code, Weather, Temperature
+        FROM weather_staging
+        ON DUPLICATE KEY UPDATE
+            Weather_Code = COALESCE(VALUES(Weather_Code), weather_hourly.Weather_Code),
+            Weather = COALESCE(VALUES(Weather), weather_hourly.Weather),
+            Temperature = COALESCE(VALUES(Temperature), weather_hourly.Temperature)
+    """)
+
+    cursor.execute("SELECT COUNT(*) FROM weather_staging")
+    loaded = cursor.fetchone()[0] if applied else 0
+
+    if applied:
+        conn.commit()
+    else:
+        conn.rollback()
+        logging.warning(f"Bulk weather load of {len(rows)} rows failed after repeated lock wait timeouts")
+
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS weather_staging")
+    cursor.close()
+    if applied:
+        touched = {row[1][:10] for row in rows}
+        refresh_dates(touched, conn)
+        bump_data_versions(touched, conn)
+    return loaded
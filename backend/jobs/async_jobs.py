@@ -0,0 +1,167 @@
+# ===========================================================
+# Async Job Pool for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Bounded queue + fixed worker threads for slow renders,
+#   so Flask request threads return immediately
+# - Every job gets an ID; its state (queued/running/done/failed),
+#   timings, result and error stay queryable for a while
+# - Jobs are looked up by kind in a handler registry
+# - Identical jobs already queued/running are not queued again,
+#   the caller gets the existing job back
+# ===========================================================
+
+import queue
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from threading import Lock, Thread
+from rich.console import Console
+
+console = Console()
+
+class QueueFullError(Exception):
+    pass
+
+class AsyncJobPool:
+    def __init__(self, name, workers=2, max_queue=100, max_records=1000):
+        self.name = name
+        self.workers = workers
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.lock = Lock()
+        self.handlers = {}              # kind -> callable(**params)
+        self.records = OrderedDict()    # job_id -> record, oldest first
+        self.active = {}                # dedupe key -> job_id (queued or running)
+        self.max_records = max_records
+        self.counts = {"submitted": 0, "deduped": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self.threads = []
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    # Workers are started on first use so importing never spawns threads
+    def _ensure_workers(self):
+        if self.threads:
+            return
+        for i in range(self.workers):
+            thread = Thread(target=self._worker, name=f"{self.name}-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    # Finished records beyond max_records are dropped, oldest first
+    def _trim_records(self):
+        for job_id in list(self.records):
+            if len(self.records) <= self.max_records:
+                break
+            if self.records[job_id]["state"] in ("done", "failed"):
+                del self.records[job_id]
+
+    # =====================================================
+    # FUNCTION: Queue a job
+    # Returns (record, created); created is False when an
+    # identical job was already queued/running
+    # Raises KeyError for unknown kinds, QueueFullError when full
+    # =====================================================
+    def submit(self, kind, dedupe_key, params, extra=None):
+        if kind not in self.handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+
+        with self.lock:
+            existing = self.active.get(dedupe_key)
+            if existing is not None:
+                self.counts["deduped"] += 1
+                return self._public(self.records[existing]), False
+
+            record = {
+                "job_id": uuid.uuid4().hex,
+                "kind": kind,
+                "params": params,
+                "state": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                **(extra or {})
+            }
+            # Recorded before it is queued, so a worker always finds it
+            self.records[record["job_id"]] = record
+            try:
+                self.jobs.put_nowait((record["job_id"], dedupe_key))
+            except queue.Full:
+                del self.records[record["job_id"]]
+                self.counts["rejected"] += 1
+                raise QueueFullError(f"{self.name} queue is full ({self.jobs.maxsize} jobs)")
+
+            self.active[dedupe_key] = record["job_id"]
+            self.counts["submitted"] += 1
+            self._trim_records()
+            self._ensure_workers()
+            return self._public(record), True
+
+    def _worker(self):
+        while True:
+            job_id, dedupe_key = self.jobs.get()
+            with self.lock:
+                record = self.records.get(job_id)
+                if record is not None:
+                    record["state"] = "running"
+                    record["started_at"] = time.time()
+            try:
+                if record is not None:
+                    result = self.handlers[record["kind"]](**record["params"])
+                    with self.lock:
+                        record["result"] = result
+                        record["state"] = "done"
+                        self.counts["completed"] += 1
+
+            except Exception as e:
+                with self.lock:
+                    record["state"] = "failed"
+                    record["error"] = str(e)
+                    record["trace"] = traceback.format_exc(limit=3)
+                    self.counts["failed"] += 1
+                console.print(f"[red]{self.name} job {record['kind']} {job_id} failed: {e}[/red]")
+
+            finally:
+                with self.lock:
+                    if record is not None:
+                        record["finished_at"] = time.time()
+                    if self.active.get(dedupe_key) == job_id:
+                        del self.active[dedupe_key]
+                self.jobs.task_done()
+
+    # Record as returned by the API, with derived timings
+    def _public(self, record):
+        now = time.time()
+        submitted, started, finished = record["submitted_at"], record["started_at"], record["finished_at"]
+        public = {key: value for key, value in record.items() if key != "trace"}
+        public["timings"] = {
+            "queue_wait": round((started or now) - submitted, 3),
+            "run": round((finished or now) - started, 3) if started else None,
+            "total": round((finished or now) - submitted, 3)
+        }
+        for key in ("submitted_at", "started_at", "finished_at"):
+            if public[key] is not None:
+                public[key] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(public[key]))
+        return public
+
+    def get(self, job_id):
+        with self.lock:
+            record = self.records.get(job_id)
+            return self._public(record) if record is not None else None
+
+    def status(self):
+        with self.lock:
+            return {
+                "queue_depth": self.jobs.qsize(),
+                "max_queue": self.jobs.maxsize,
+                "workers": self.workers,
+                "kinds": sorted(self.handlers),
+                "running": [
+                    {"job_id": job_id, "kind": record["kind"], "running_for": round(time.time() - record["started_at"], 2)}
+                    for job_id, record in self.records.items()
+                    if record["state"] == "running"
+                ],
+                "counts": dict(self.counts)
+            }
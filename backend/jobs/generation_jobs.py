@@ -0,0 +1,168 @@
+# ===========================================================
+# Background Generation Jobs for Smart Foot Traffic
+# -----------------------------------------------------------
+# - One bounded worker pool for every slow render:
+#   heatmaps, timelines, range heatmaps, bar/line/pie charts
+#   (one hour or a whole day of bar charts),
+#   forecasts, reports
+# - submit_generation() validates the parameters, queues the job
+#   and returns its ID plus the URLs the artifacts will have
+# - Handlers run through the single-flight layer, so a job and a
+#   synchronous request for the same artifact share one render
+# - Used by /api/generate_heatmap, POST /api/jobs and GET /api/jobs/<id>
+# ===========================================================
+
+import os
+from urllib.parse import urlencode
+
+from backend.analytics.daily_linechart import generate_line_charts_combined
+from backend.analytics.distribution_pie import generate_combined_pie_dashboard
+from backend.analytics.export import export_report
+from backend.analytics.generate_barchart import HOURLY_TIMES, bar_chart_path, export_day_bar_charts
+from backend.analytics.model import generate_forecast_chart
+from backend.analytics.statistics import get_summary_stats
+from backend.jobs.async_jobs import AsyncJobPool
+from backend.jobs.single_flight import generation_flight, make_key
+from backend.pipeline.helpers.helpers import normalize_time
+from backend.visualizer.generator.generate_heatmap import heatmap_path
+from backend.visualizer.generator.generate_range import generate_range_heatmap, normalize_range_params, range_path
+from backend.visualizer.generator.generate_timeline import generate_day_timeline, timeline_path
+from backend.visualizer.generator.smart_generate import smart_generate
+
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", 2))
+GENERATION_QUEUE_SIZE = int(os.getenv("GENERATION_QUEUE_SIZE", 100))
+
+generation_pool = AsyncJobPool("generation", workers=GENERATION_WORKERS, max_queue=GENERATION_QUEUE_SIZE)
+
+def _url(base_url, path):
+    return f"{base_url}/{path.replace(os.sep, '/')}"
+
+# =====================================================
+# Job kinds: (required params, runner, artifact URLs)
+# =====================================================
+def _heatmap_urls(base_url, date, time, traffic_type):
+    viewer_params = urlencode({"date": date, "time": time, "type": traffic_type})
+    return {
+        "heatmap_url": _url(base_url, heatmap_path(date, time, traffic_type)),
+        "barchart_url": _url(base_url, bar_chart_path(date, time, traffic_type)),
+        "viewer_url": f"{base_url}/heatmaps/viewer.html#{viewer_params}"
+    }
+
+# prophet is slow to import and only needed for this job
+def _run_prophet_batch():
+    from backend.analytics.prophet_batch import run_prophet_batch
+    return run_prophet_batch()
+
+JOB_KINDS = {
+    "heatmap": (
+        ("date", "time", "traffic_type"),
+        lambda date, time, traffic_type: smart_generate(date, time, traffic_type),
+        _heatmap_urls
+    ),
+    "timeline": (
+        ("date", "traffic_type"),
+        lambda date, traffic_type: generate_day_timeline(date, traffic_type),
+        lambda base_url, date, traffic_type: {"timeline_url": _url(base_url, timeline_path(date, traffic_type))}
+    ),
+    # hours / weekdays / agg are optional, see RANGE_PARAMS
+    "range": (
+        ("date_from", "date_to", "traffic_type"),
+        lambda **params: generate_range_heatmap(**params),
+        lambda base_url, **params: {"heatmap_url": _url(base_url, range_path(**params))}
+    ),
+    # The bar chart is rendered as part of the summary
+    "bar_chart": (
+        ("date", "time", "traffic_type"),
+        lambda date, time, traffic_type: get_summary_stats(date, time, traffic_type),
+        lambda base_url, date, time, traffic_type: {"barchart_url": _url(base_url, bar_chart_path(date, time, traffic_type))}
+    ),
+    # All 24 bar charts of a day from one query
+    "bar_chart_day": (
+        ("date", "traffic_type"),
+        lambda date, traffic_type: export_day_bar_charts(date, traffic_type),
+        lambda base_url, date, traffic_type: {
+            "barchart_urls": {t: _url(base_url, bar_chart_path(date, t, traffic_type)) for t in HOURLY_TIMES}
+        }
+    ),
+    "line_chart": (
+        ("date", "traffic_type"),
+        lambda date, traffic_type: generate_line_charts_combined(date, traffic_type),
+        lambda base_url, date, traffic_type: {"url": f"{base_url}/linecharts/line_{date}_{traffic_type.replace(' ', '')}.html"}
+    ),
+    "pie_chart": (
+        ("date",),
+        lambda date: generate_combined_pie_dashboard(date),
+        lambda base_url, date: {"url": f"{base_url}/piecharts/pie_dashboard_{date}.html"}
+    ),
+    "forecast": (
+        ("traffic_type",),
+        lambda traffic_type: generate_forecast_chart(traffic_type),
+        lambda base_url, traffic_type: {"url": f"{base_url}/forecast/forecast_chart_{traffic_type.replace(' ', '_').lower()}.html"}
+    ),
+    # Every sensor's Prophet forecast
+    "prophet_forecasts": (
+        (),
+        lambda: _run_prophet_batch(),
+        lambda base_url: {}
+    ),
+    # time is 'HH:MM' here, as in /api/download_report
+    "report": (
+        ("date", "time", "traffic_type"),
+        lambda date, time, traffic_type: export_report(date, time, traffic_type),
+        lambda base_url, date, time, traffic_type: {"url": f"{base_url}/downloads/report_{date}.html"}
+    )
+}
+
+# Kinds whose parameters need more than a presence check;
+# range accepts the API's "from"/"to" names
+PARAM_NORMALIZERS = {
+    "range": lambda params: normalize_range_params(
+        params.get("from") or params.get("date_from"), params.get("to") or params.get("date_to"),
+        params.get("traffic_type"), params.get("hours"), params.get("weekdays"), params.get("agg")
+    )
+}
+
+# Bar chart jobs share the summary route's single-flight key
+FLIGHT_KINDS = {"bar_chart": "summary"}
+
+# Kinds keyed (and named on disk) by one hour: date and time are
+# normalized like the synchronous routes do, so keys match theirs
+HOURLY_KINDS = {"heatmap", "bar_chart"}
+
+def _register(kind, runner):
+    # Same key the synchronous routes use, so both share one render
+    flight_kind = FLIGHT_KINDS.get(kind, kind)
+    def handler(**params):
+        return generation_flight.do(make_key(flight_kind, **params), runner, **params)
+    generation_pool.register(kind, handler)
+
+for _kind, (_, _runner, _) in JOB_KINDS.items():
+    _register(_kind, _runner)
+
+# =====================================================
+# FUNCTION: Queue a generation job
+# Returns (job record, created)
+# Raises ValueError for unknown kinds / missing params,
+# QueueFullError when the pool is saturated
+# =====================================================
+def submit_generation(kind, params, base_url):
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}. Expected one of {sorted(JOB_KINDS)}")
+
+    required, _, build_urls = JOB_KINDS[kind]
+    if kind in PARAM_NORMALIZERS:
+        job_params = PARAM_NORMALIZERS[kind](params)
+    else:
+        missing = [name for name in required if not params.get(name)]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)} for {kind} job")
+        job_params = {name: params[name] for name in required}
+
+    if kind in HOURLY_KINDS:
+        job_params["date"] = str(job_params["date"])[:10]
+        job_params["time"] = normalize_time(job_params["time"])
+
+    return generation_pool.submit(
+        kind, make_key(kind, **job_params), job_params,
+        extra={"urls": build_urls(base_url, **job_params)}
+    )
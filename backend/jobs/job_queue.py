@@ -0,0 +1,107 @@
+# ===========================================================
+# In-Process Job Queue for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Small worker pool fed by a thread-safe queue
+# - Dedupes in-flight jobs by (job type, key), so repeated
+#   clicks on the same date never run the same work twice
+# - Optional skip check runs right before a job starts
+# - Keeps counters, running jobs and recent failures for
+#   the status endpoint
+# ===========================================================
+
+import time
+import queue
+import traceback
+from collections import deque
+from threading import Thread, Lock
+from rich.console import Console
+
+console = Console()
+
+class JobQueue:
+    def __init__(self, name, workers=2, max_failures=50):
+        self.name = name
+        self.workers = workers
+        self.jobs = queue.Queue()
+        self.lock = Lock()
+        self.in_flight = set()          # (job_type, key) queued or running
+        self.running = {}               # (job_type, key) -> start time
+        self.failures = deque(maxlen=max_failures)
+        self.counts = {"submitted": 0, "deduped": 0, "skipped": 0, "completed": 0, "failed": 0}
+        self.threads = []
+
+    # Workers are started on first use so importing never spawns threads
+    def _ensure_workers(self):
+        if self.threads:
+            return
+        for i in range(self.workers):
+            thread = Thread(target=self._worker, name=f"{self.name}-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    # =====================================================
+    # FUNCTION: Submit a job
+    # Returns False if the same (job_type, key) is already queued/running
+    # skip_if: optional callable, job is skipped if it returns True
+    # =====================================================
+    def submit(self, job_type, key, fn, *args, skip_if=None, **kwargs):
+        job_key = (job_type, key)
+        with self.lock:
+            if job_key in self.in_flight:
+                self.counts["deduped"] += 1
+                return False
+            self.in_flight.add(job_key)
+            self.counts["submitted"] += 1
+            self._ensure_workers()
+
+        self.jobs.put((job_key, fn, args, kwargs, skip_if))
+        return True
+
+    def _worker(self):
+        while True:
+            job_key, fn, args, kwargs, skip_if = self.jobs.get()
+            try:
+                if skip_if is not None and skip_if():
+                    with self.lock:
+                        self.counts["skipped"] += 1
+                    continue
+
+                with self.lock:
+                    self.running[job_key] = time.time()
+
+                fn(*args, **kwargs)
+
+                with self.lock:
+                    self.counts["completed"] += 1
+
+            except Exception as e:
+                with self.lock:
+                    self.counts["failed"] += 1
+                    self.failures.append({
+                        "job_type": job_key[0],
+                        "key": str(job_key[1]),
+                        "error": str(e),
+                        "failed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "trace": traceback.format_exc(limit=3)
+                    })
+                console.print(f"[red]{self.name} job {job_key} failed: {e}[/red]")
+
+            finally:
+                with self.lock:
+                    self.running.pop(job_key, None)
+                    self.in_flight.discard(job_key)
+                self.jobs.task_done()
+
+    def status(self):
+        now = time.time()
+        with self.lock:
+            return {
+                "queue_depth": self.jobs.qsize(),
+                "workers": self.workers,
+                "running": [
+                    {"job_type": job_type, "key": str(key), "running_for": round(now - started, 2)}
+                    for (job_type, key), started in self.running.items()
+                ],
+                "counts": dict(self.counts),
+                "failures": list(self.failures)
+            }
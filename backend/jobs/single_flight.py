@@ -0,0 +1,113 @@
+# ===========================================================
+# Single-Flight Request Coalescing for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Concurrent calls with the same key run the work once:
+#   the first caller computes, duplicates wait and share its
+#   result (or its exception)
+# - Keys are normalized request parameters (make_key)
+# - Optional cross-process lock: set SINGLE_FLIGHT_LOCK_DIR and
+#   the computing caller also holds an fcntl file lock, so other
+#   server processes queue behind it and then hit the generators'
+#   own up-to-date checks instead of rendering the same file
+#   (no-op on platforms without fcntl)
+# - Used by the heatmap, summary and line chart routes
+# ===========================================================
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from threading import Event, Lock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR")
+
+# Same parameters in any order/spacing/casing of the keys -> same key
+def make_key(kind, **params):
+    normalized = {name.lower(): str(value).strip() for name, value in params.items() if value is not None}
+    return kind + ":" + json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, name, lock_dir=SINGLE_FLIGHT_LOCK_DIR):
+        self.name = name
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.lock = Lock()
+        self.calls = {}     # key -> _Call in progress
+        self.counts = {"executed": 0, "shared": 0, "failed": 0}
+
+    @contextmanager
+    def _process_lock(self, key):
+        if not self.lock_dir:
+            yield
+            return
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        path = os.path.join(self.lock_dir, f"{self.name}-{digest}.lock")
+        with open(path, "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # =====================================================
+    # FUNCTION: Run fn once per key among concurrent callers
+    # Returns fn's result; duplicates get the same object
+    # =====================================================
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.counts["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with self._process_lock(key):
+                call.result = fn(*args, **kwargs)
+            with self.lock:
+                self.counts["executed"] += 1
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self.lock:
+                self.counts["failed"] += 1
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            call.done.set()
+
+    def status(self):
+        with self.lock:
+            return {
+                "in_flight": [
+                    {"key": key, "waiters": call.waiters}
+                    for key, call in self.calls.items()
+                ],
+                "cross_process": bool(self.lock_dir),
+                "counts": dict(self.counts)
+            }
+
+# Shared by the generation endpoints
+generation_flight = SingleFlight("generation")
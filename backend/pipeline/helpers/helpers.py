@@ -3,6 +3,7 @@
 # -----------------------------------------------------------
 # - Defines traffic types and folder icons
 # - Extracts clean location names from filenames
+# - Normalizes request times to 'HH:MM:SS'
 # - Checks for missing hourly data across all locations/types
 # - Used in preprocessing pipeline scripts
 # ===========================================================
@@ -17,6 +18,15 @@ from collections import defaultdict
 # =====================================================
 TRAFFIC_TYPES = ['Pedestrian Count', 'Cyclist Count', 'Vehicle Count']
 
+# =====================================================
+# NORMALIZE A REQUEST TIME
+# '8', '08:00' and '08:00:00' all become '08:00:00', so
+# cache/file keys don't depend on how the client wrote it
+# =====================================================
+def normalize_time(value):
+    parts = (str(value or "00").strip().split(":") + ["00", "00"])[:3]
+    return ":".join(f"{int(part):02}" for part in parts)
+
 # =====================================================
 # EMOJIS FOR LOGGING / VISUAL SECTIONS
 # The traffic type folders emojis
@@ -20,6 +20,9 @@ from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from backend.config import DB_CONFIG
+from backend.db.data_versions import bump_data_versions
+from backend.db.traffic_rollups import rebuild_rollups
+from backend.forecast.weather_index import refresh_dates
 from backend.pipeline.helpers.helpers import (
     extract_location, check_missing_hours,
     TRAFFIC_TYPES, FOLDER_ICONS
@@ -71,6 +74,7 @@ def preprocess_data():
                 continue
 
     traffic_seen = set()
+    loaded_dates = set()
     file_index_tracker = {t: 0 for t in TRAFFIC_TYPES}
 
     progress = Progress(
@@ -203,6 +207,7 @@ def preprocess_data():
 
                 progress.update(task, advance=1)
 
+            loaded_dates.update(df['Date'])
             elapsed = round(time.time() - start_time, 2)
             console.print(f"\n[green]Inserted:[/green] {inserted} rows from: {file_name}")
             console.print(f"Took {elapsed} seconds")
@@ -214,6 +219,19 @@ def preprocess_data():
     # Commit everything
     conn.commit()
     logging.info("All CSVs committed to MySQL.")
+
+    # Every date was reloaded, so anything generated from the old rows is stale
+    cursor.execute("SELECT DISTINCT Date FROM processed_data")
+    bumped = bump_data_versions([row[0] for row in cursor.fetchall()], conn)
+    logging.info(f"Data versions bumped for {bumped} date(s).")
+
+    # Expected hours changed for these dates: recompute their weather completeness
+    refresh_dates(loaded_dates, conn)
+    logging.info(f"Weather completeness refreshed for {len(loaded_dates)} date(s).")
+
+    # Range heatmaps read the daily/hourly rollups, never the raw rows
+    hourly_rows, daily_rows = rebuild_rollups(conn)
+    logging.info(f"Rollups rebuilt: {hourly_rows} hourly, {daily_rows} daily rows.")
     logging.info("Checking missing hours...")
     check_missing_hours(cursor)
 
@@ -0,0 +1,158 @@
+# ======================================
+# Generated Artifact Storage and Serving
+# --------------------------------------
+# - write_artifact() saves a generated HTML/JS file plus
+#   precompressed siblings: .gz always, .br if brotli is installed
+# - send_artifact() serves the best precompressed copy the
+#   client accepts (Accept-Encoding), falling back to the raw file
+# - Compression happens once at generation time, never per request
+# - Every file is written to a temp file and atomically renamed,
+#   so readers never see a half-written page
+# - Responses carry the content hash as ETag; a matching
+#   If-None-Match is answered 304 after a single stat
+# - public_url() turns a stored path into the URL saved in the DB
+# ======================================
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import tempfile
+
+from flask import Response, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Content hashes of served/written files: abs path -> (mtime_ns, size, sha256)
+# Re-hashed only when the file's stat changes
+_hashes = {}
+
+# Writes next to the target and renames over it (atomic on the same filesystem)
+def _write_bytes(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+# =====================================================
+# FUNCTION: Content hash of a stored artifact
+# st: optional os.stat result the caller already has
+# =====================================================
+def artifact_hash(path, st=None):
+    st = st or os.stat(path)
+    key = os.path.abspath(path)
+    cached = _hashes.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    with open(path, "rb") as f:
+        digest = content_hash(f.read())
+    _hashes[key] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+# =====================================================
+# FUNCTION: Save an artifact with compressed siblings
+# content: str (written as UTF-8) or bytes
+# Returns the path of the uncompressed file
+# =====================================================
+def write_artifact(path, content):
+    data = content.encode("utf-8") if isinstance(content, str) else content
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    # Raw file first: until the siblings are rewritten they are older
+    # than it, so send_artifact() serves the new raw file meanwhile
+    _write_bytes(path, data)
+    st = os.stat(path)
+    _hashes[os.path.abspath(path)] = (st.st_mtime_ns, st.st_size, content_hash(data))
+
+    # mtime=0 keeps the .gz identical for identical content
+    _write_bytes(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_bytes(path + ".br", brotli.compress(data, quality=11))
+    elif os.path.exists(path + ".br"):
+        os.remove(path + ".br")  # never leave a stale .br behind
+
+    return path
+
+# =====================================================
+# FUNCTION: Public URL of a stored artifact
+# Uses BASE_URL when running locally, PROD_URL otherwise
+# =====================================================
+def public_url(path):
+    base_url = os.getenv("BASE_URL", "http://localhost:5000")
+    prod_url = os.getenv("PROD_URL", "https://smart-foot-traffic-backend.onrender.com")
+
+    root = base_url if "localhost" in base_url or "127.0.0.1" in base_url else prod_url
+    return f"{root}/{path.replace(os.sep, '/')}"
+
+# A compressed sibling is only used if it is at least as new as the raw file
+# (files written some other way keep being served raw until regenerated)
+def _fresh_sibling(full_path, suffix, raw_mtime):
+    try:
+        return os.path.getmtime(full_path + suffix) >= raw_mtime
+    except OSError:
+        return False
+
+# Representation tags: the raw hash, with the encoding appended for compressed copies
+def _etag(digest, encoding=None):
+    return f"{digest}-{encoding}" if encoding else digest
+
+# =====================================================
+# FUNCTION: Flask response for a stored artifact
+# Drop-in for send_from_directory(folder, filename)
+# =====================================================
+def send_artifact(folder, filename):
+    full_path = safe_join(folder, filename)
+    try:
+        st = os.stat(full_path) if full_path else None
+    except OSError:
+        st = None
+
+    if st is not None and stat.S_ISREG(st.st_mode):
+        digest = artifact_hash(full_path, st)
+
+        # Client already has this content (in whichever encoding): no body
+        for encoding in (None,) + tuple(name for name, _ in ENCODINGS):
+            tag = _etag(digest, encoding)
+            if request.if_none_match.contains(tag):
+                response = Response(status=304)
+                response.set_etag(tag)
+                response.vary.add("Accept-Encoding")
+                return response
+
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            if accepted[encoding] and _fresh_sibling(full_path, suffix, st.st_mtime):
+                mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                response = send_from_directory(folder, filename + suffix, mimetype=mimetype, etag=_etag(digest, encoding))
+                response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+
+        response = send_from_directory(folder, filename, etag=digest)
+        response.vary.add("Accept-Encoding")
+        return response
+
+    response = send_from_directory(folder, filename)
+    response.vary.add("Accept-Encoding")
+    return response
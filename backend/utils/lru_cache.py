@@ -0,0 +1,93 @@
+# ======================================
+# Byte-Sized LRU Cache
+# --------------------------------------
+# - Thread-safe LRU bounded by total size in bytes,
+#   not by number of entries
+# - Size of each value comes from a sizeof() callable
+#   (DataFrames are measured with memory_usage(deep=True))
+# - Evicts least recently used entries until the new one fits
+# - Keeps hit/miss/eviction counters for status endpoints
+# ======================================
+
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+import pandas as pd
+
+# Deep size for DataFrames, shallow sys.getsizeof for anything else
+def sizeof_value(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+class ByteLRUCache:
+    def __init__(self, name, max_bytes, sizeof=sizeof_value):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.lock = Lock()
+        self.entries = OrderedDict()    # key -> (value, size), oldest first
+        self.current_bytes = 0
+        self.counts = {"hits": 0, "misses": 0, "evictions": 0, "rejected": 0}
+
+    # Returns the cached value (and marks it recently used) or None
+    # valid: optional check on the value; a value failing it counts as a miss
+    def get(self, key, valid=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or (valid is not None and not valid(entry[0])):
+                self.counts["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counts["hits"] += 1
+            return entry[0]
+
+    # Cached value without counting a lookup or touching LRU order
+    def peek(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[0]
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    # =====================================================
+    # FUNCTION: Store a value, evicting LRU entries to fit
+    # Returns False if the value alone is larger than the cache
+    # =====================================================
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+
+            if size > self.max_bytes:
+                self.counts["rejected"] += 1
+                return False
+
+            while self.entries and self.current_bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.counts["evictions"] += 1
+
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counts["hits"] + self.counts["misses"]
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self.counts["hits"] / lookups, 3) if lookups else None,
+                "counts": dict(self.counts)
+            }
@@ -0,0 +1,210 @@
+# ======================================
+# In-Process Metrics for Smart Foot Traffic
+# --------------------------------------
+# - Counters, gauges and histograms with labels, thread-safe
+# - Collectors read live values (cache stats, queue depth)
+#   only when /metrics is scraped
+# - render() returns the Prometheus text format (0.0.4)
+# - stage_timer(generator, stage) times one step of a generator
+#   (fetch / render / save / db ...) into a shared histogram,
+#   so p95/p99 per stage come from histogram_quantile()
+# ======================================
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+# Seconds; covers a sub-millisecond cache hit up to a 2 minute forecast fit
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.lock = Lock()
+        self.values = {}    # label values tuple -> value
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, key, None, value) for key, value in self.values.items()]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        if not self.label_names:
+            self.values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        if not self.label_names:
+            self.values[()] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    # values[key] = [per-bucket counts (+Inf last), sum, count]
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            snapshot = [(key, list(state[0]), state[1], state[2]) for key, state in self.values.items()]
+
+        samples = []
+        for key, bucket_counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", key, {"le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", key, None, total))
+            samples.append((f"{self.name}_count", key, None, count))
+        return samples
+
+# Values computed at scrape time: fn() -> [(labels dict, value), ...]
+class _Collector:
+    def __init__(self, name, help_text, type_name, fn):
+        self.name = name
+        self.help = help_text
+        self.type_name = type_name
+        self.fn = fn
+
+    def samples(self):
+        samples = []
+        for labels, value in self.fn():
+            if value is None:
+                continue
+            samples.append((self.name, tuple(labels.values()), None, value, tuple(labels)))
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = Lock()
+        self.metrics = {}   # name -> metric, in registration order
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                # Re-imports (e.g. in the reloader) get the same metric back
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.type_name}")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def collect(self, name, help_text, type_name, fn):
+        with self.lock:
+            self.metrics[name] = _Collector(name, help_text, type_name, fn)
+
+    # =====================================================
+    # FUNCTION: Prometheus text exposition of every metric
+    # A failing collector is skipped, never the whole scrape
+    # =====================================================
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample in samples:
+                name, key, extra, value = sample[:4]
+                label_names = sample[4] if len(sample) > 4 else metric.label_names
+                lines.append(f"{name}{_format_labels(label_names, key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "sft_generation_stage_seconds",
+    "Time spent in one stage of a generator",
+    ("generator", "stage")
+)
+GENERATIONS = registry.counter(
+    "sft_generations_total",
+    "Finished generator runs by outcome (generated, cached, failed)",
+    ("generator", "outcome")
+)
+
+# e.g. with stage_timer("heatmap", "fetch"): df = fetch_traffic_data(...)
+def stage_timer(generator, stage):
+    return STAGE_SECONDS.time(generator=generator, stage=stage)
+
+def observe_stage(generator, stage, seconds):
+    STAGE_SECONDS.observe(seconds, generator=generator, stage=stage)
@@ -0,0 +1,89 @@
+# ===========================================================
+# Heatmap Renderer Benchmark for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Compares the Folium renderer with the template renderer
+# - Reports average render time and HTML size for each
+# - Uses a synthetic DataFrame by default (no DB needed),
+#   or real data with --db (plus --date/--time/--type)
+#
+# Usage:
+#   python -m backend.visualizer.benchmark_renderer [--runs 20]
+#   python -m backend.visualizer.benchmark_renderer --db --date 2024-03-04 --time 08:00:00
+# ===========================================================
+
+import argparse
+import random
+import time
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
+from backend.visualizer.services.map_renderer import render_heatmap_map
+from backend.visualizer.services.template_renderer import get_map_shell, minify_html, render_heatmap_html
+
+console = Console()
+
+def _sample_frame(date_filter, time_filter):
+    rng = random.Random(42)
+    return pd.DataFrame({
+        "Location": list(LOCATION_COORDINATES),
+        "Interval_Count": [rng.randint(0, 700) for _ in LOCATION_COORDINATES],
+        "DateTime_String": [f"{date_filter} {time_filter}"] * len(LOCATION_COORDINATES),
+        "Weather": ["Partly cloudy"] * len(LOCATION_COORDINATES),
+        "Temperature": [rng.uniform(10, 25) for _ in LOCATION_COORDINATES]
+    })
+
+def _time_renderer(render, runs):
+    durations = []
+    html = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        html = render()
+        durations.append(time.perf_counter() - start)
+    return sum(durations) / len(durations), len(html.encode("utf-8"))
+
+def run_benchmark(df, selected_type, label, time_filter, runs=20):
+    folium_render = lambda: minify_html(render_heatmap_map(df, selected_type, label, time_filter).get_root().render())
+    template_render = lambda: render_heatmap_html(df, selected_type, label, time_filter)
+
+    # Shell is built once per process, time it separately
+    start = time.perf_counter()
+    get_map_shell()
+    shell_time = time.perf_counter() - start
+
+    results = {
+        "folium": _time_renderer(folium_render, runs),
+        "template": _time_renderer(template_render, runs)
+    }
+
+    table = Table(title=f"Heatmap render ({runs} runs, {selected_type} @ {label} {time_filter})")
+    table.add_column("Renderer", style="cyan")
+    table.add_column("Avg render (ms)", justify="right")
+    table.add_column("HTML size (KB)", justify="right")
+    for name, (avg, size) in results.items():
+        table.add_row(name, f"{avg * 1000:.1f}", f"{size / 1024:.1f}")
+    console.print(table)
+
+    folium_avg, template_avg = results["folium"][0], results["template"][0]
+    console.print(f"One-off shell build: {shell_time * 1000:.1f} ms")
+    console.print(f"[green]Template renderer is {folium_avg / template_avg:.0f}x faster per request[/green]")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Folium vs template heatmap rendering")
+    parser.add_argument("--date", default="2024-03-04")
+    parser.add_argument("--time", default="08:00:00")
+    parser.add_argument("--type", default="Pedestrian Count")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--db", action="store_true", help="Use real data from MySQL instead of a sample")
+    args = parser.parse_args()
+
+    if args.db:
+        from backend.visualizer.services.data_fetcher import fetch_traffic_data
+        frame = fetch_traffic_data(args.date, args.time, args.type)
+    else:
+        frame = _sample_frame(args.date, args.time)
+
+    run_benchmark(frame, args.type, args.date, args.time, args.runs)
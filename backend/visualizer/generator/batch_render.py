@@ -0,0 +1,264 @@
+# ====================================================
+# Batch Pre-Renderer for Smart Foot Traffic
+# ----------------------------------------------------
+# - Pre-warms heatmaps + bar charts for a whole date range
+# - One query per day (all hours, all types), split in memory
+# - Each (date, type) renders its 24 hours in one task; the CLI
+#   spreads tasks over a process pool, server-queued runs render
+#   them serially in-process (a pool would re-import the server)
+# - Resumable: artifacts whose manifest entry matches their
+#   date's current data version are skipped, so an interrupted
+#   run just picks up where it stopped
+# - Manifest entries and heatmaps rows (incl. BarChart_URL)
+#   are upserted once per day
+#
+# Usage:
+#   python -m backend.visualizer.generator.batch_render --from 2025-03-01 --to 2025-05-31
+#   python -m backend.visualizer.generator.batch_render --from 2025-03-01 --types "Vehicle Count" --force
+# ====================================================
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import mysql.connector
+import pandas as pd
+from rich.console import Console
+
+from backend.analytics.generate_barchart import bar_chart_path, build_bar_chart_html
+from backend.config import DB_CONFIG
+from backend.db.artifact_manifest import current_artifacts, params_key, record_artifacts
+from backend.db.data_versions import get_data_versions
+from backend.forecast.weather_index import is_weather_complete
+from backend.jobs.job_queue import JobQueue
+from backend.pipeline.helpers.helpers import TRAFFIC_TYPES
+from backend.utils.artifacts import public_url, write_artifact
+from backend.visualizer.generator.generate_heatmap import heatmap_path, render_heatmap_page
+from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
+from backend.visualizer.services.data_fetcher import fetch_day_traffic_data, filter_hour_window
+
+console = Console()
+
+# Render processes for the CLI (server-queued runs always render serially)
+PRERENDER_WORKERS = int(os.getenv("PRERENDER_WORKERS", os.cpu_count() or 2))
+
+# Background queue for /api/prerender (one batch at a time)
+prerender_queue = JobQueue("prerender", workers=1)
+
+HOURLY_TIMES = [f"{h:02}:00:00" for h in range(24)]
+
+def date_range(date_from, date_to):
+    day = datetime.strptime(date_from, "%Y-%m-%d").date()
+    last = datetime.strptime(date_to, "%Y-%m-%d").date()
+    while day <= last:
+        yield day.strftime("%Y-%m-%d")
+        day += timedelta(days=1)
+
+def _params(date_filter, time_filter, traffic_type):
+    return {"date": date_filter, "time": time_filter, "type": traffic_type}
+
+# =====================================================
+# FUNCTION: Hours that still need rendering for a date
+# An hour is done when both its heatmap and bar chart are
+# in the manifest with the date's current data version
+# Returns {traffic_type: [time, ...]}
+# =====================================================
+def stale_hours(date_filter, traffic_types, version=0, force=False):
+    wanted = [(traffic_type, t) for traffic_type in traffic_types for t in HOURLY_TIMES]
+    if force:
+        done = set()
+    else:
+        params_list = [_params(date_filter, t, traffic_type) for traffic_type, t in wanted]
+        heatmaps_done = current_artifacts("heatmap", params_list, version)
+        bars_done = current_artifacts("bar_chart", params_list, version)
+        done = {
+            (traffic_type, t) for (traffic_type, t), params in zip(wanted, params_list)
+            if params_key(params)[0] in heatmaps_done and params_key(params)[0] in bars_done
+        }
+
+    todo = {}
+    for traffic_type, t in wanted:
+        if (traffic_type, t) not in done:
+            todo.setdefault(traffic_type, []).append(t)
+    return todo
+
+# =====================================================
+# FUNCTION: Bar chart inputs for every hour of one type
+# Same numbers get_summary_stats computes per request
+# Returns (selected_by_hour, total_data, average_data)
+# =====================================================
+def bar_chart_inputs(type_df):
+    counts = pd.to_numeric(type_df["Interval_Count"], errors="coerce").fillna(0)
+    hours = (pd.to_timedelta(type_df["Time"]) // pd.Timedelta(hours=1)).rename("Hour")
+
+    per_hour = counts.groupby([hours, type_df["Location"]]).sum()
+    selected_by_hour = {
+        int(hour): {loc: int(count) for (_, loc), count in group.items()}
+        for hour, group in per_hour.groupby(level=0)
+    }
+
+    total_data = {loc: int(count) for loc, count in counts.groupby(type_df["Location"]).sum().items()}
+    average_data = {
+        loc: round(total_data.get(loc, 0) / 24, 2)
+        for loc in LOCATION_COORDINATES
+    }
+    return selected_by_hour, total_data, average_data
+
+# =====================================================
+# FUNCTION: Render the given hours of one (date, type)
+# Runs inside a pool worker; no DB access
+# Returns [(time, heatmap_file, bar_file), ...]
+# =====================================================
+def render_type_day(date_filter, traffic_type, day_df, times):
+    type_df = day_df[day_df["Traffic_Type"] == traffic_type]
+    selected_by_hour, total_data, average_data = bar_chart_inputs(type_df)
+
+    rendered = []
+    for time_filter in times:
+        df = filter_hour_window(type_df, date_filter, time_filter, traffic_type)
+        heatmap_file = write_artifact(
+            heatmap_path(date_filter, time_filter, traffic_type),
+            render_heatmap_page(df, traffic_type, date_filter, time_filter)
+        )
+
+        selected_data = selected_by_hour.get(int(time_filter[:2]), {})
+        bar_file = write_artifact(
+            bar_chart_path(date_filter, time_filter, traffic_type),
+            build_bar_chart_html(selected_data, total_data, average_data, date_filter, time_filter, traffic_type)
+        )
+        rendered.append((time_filter, heatmap_file, bar_file))
+    return rendered
+
+# =====================================================
+# FUNCTION: Record one day's rendered artifacts
+# Manifest entries + heatmaps rows, written after the files,
+# so a crash before this point just re-renders those hours
+# rendered: [(traffic_type, time), ...]
+# =====================================================
+def record_day(date_filter, rendered, version):
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    manifest_rows, heatmap_rows = [], []
+    for traffic_type, time_filter in rendered:
+        params = _params(date_filter, time_filter, traffic_type)
+        heatmap_file = heatmap_path(date_filter, time_filter, traffic_type)
+        bar_file = bar_chart_path(date_filter, time_filter, traffic_type)
+        manifest_rows += [("heatmap", params, version, heatmap_file), ("bar_chart", params, version, bar_file)]
+        heatmap_rows.append((generated_at, traffic_type, date_filter, time_filter, "Generated", public_url(heatmap_file), public_url(bar_file)))
+
+    if not heatmap_rows:
+        return 0
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    record_artifacts(manifest_rows, conn)
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO heatmaps (Generated_At, Traffic_Type, Date_Filter, Time_Filter, Status, Heatmap_URL, BarChart_URL)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Generated_At = VALUES(Generated_At),
+            Heatmap_URL = VALUES(Heatmap_URL),
+            BarChart_URL = VALUES(BarChart_URL),
+            Status = 'Regenerated'
+    """, heatmap_rows)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return len(heatmap_rows)
+
+# =====================================================
+# FUNCTION: Pre-render a date range
+# workers > 1 renders in a process pool, otherwise serially
+# Returns totals {"days", "rendered", "skipped", "empty_days"}
+# =====================================================
+def prerender_range(date_from, date_to=None, traffic_types=None, workers=None, force=False):
+    date_to = date_to or date_from
+    traffic_types = list(traffic_types or TRAFFIC_TYPES)
+    workers = max(1, workers or 1)
+
+    versions = get_data_versions(date_from, date_to)
+    totals = {"days": 0, "rendered": 0, "skipped": 0, "empty_days": 0}
+    per_day = len(traffic_types) * len(HOURLY_TIMES)
+    start = time.time()
+
+    console.print("\n[bold magenta]========== BATCH PRE-RENDER ==========[/bold magenta]")
+    console.print(f"Range: [green]{date_from} → {date_to}[/green]  Types: [green]{', '.join(traffic_types)}[/green]  Workers: [green]{workers}[/green]")
+
+    def finish_day(date_filter, version, futures):
+        rendered = [
+            (traffic_type, time_filter)
+            for traffic_type, future in futures
+            for time_filter, _, _ in future.result()
+        ]
+        record_day(date_filter, rendered, version)
+        totals["rendered"] += len(rendered)
+        totals["skipped"] += per_day - len(rendered)
+        console.print(f"[green]{date_filter}[/green]: rendered {len(rendered)}, skipped {per_day - len(rendered)}")
+
+    # A single thread keeps the future bookkeeping but runs one task at a time
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+    with executor as pool:
+        pending = []  # (date, version, [(type, future)]) oldest first
+        for date_filter in date_range(date_from, date_to):
+            totals["days"] += 1
+            version = versions.get(date_filter, (0, None))[0]
+            todo = stale_hours(date_filter, traffic_types, version, force)
+
+            if not todo:
+                totals["skipped"] += per_day
+                console.print(f"[cyan]{date_filter}: up to date[/cyan]")
+                continue
+
+            day_df = fetch_day_traffic_data(date_filter)
+            if day_df.empty:
+                totals["empty_days"] += 1
+                totals["skipped"] += per_day
+                console.print(f"[yellow]{date_filter}: no traffic data[/yellow]")
+                continue
+
+            if not is_weather_complete(date_filter):
+                console.print(f"[yellow]{date_filter}: weather incomplete, maps will be re-rendered once it is filled[/yellow]")
+
+            pending.append((date_filter, version, [
+                (traffic_type, pool.submit(render_type_day, date_filter, traffic_type, day_df, hours))
+                for traffic_type, hours in todo.items()
+            ]))
+
+            # Keep only a few days in flight so memory stays flat over long ranges
+            while len(pending) > max(1, workers // len(traffic_types)) + 1:
+                finish_day(*pending.pop(0))
+
+        for day in pending:
+            finish_day(*day)
+
+    totals["seconds"] = round(time.time() - start, 2)
+    console.print(
+        f"[bold green]Done:[/bold green] {totals['days']} days, {totals['rendered']} rendered, "
+        f"{totals['skipped']} skipped in {totals['seconds']}s"
+    )
+    return totals
+
+# =====================================================
+# FUNCTION: Queue a pre-render in the background
+# Renders serially in-process
+# Returns False if the same batch is already queued/running
+# =====================================================
+def enqueue_prerender(date_from, date_to=None, traffic_types=None, force=False):
+    traffic_types = tuple(traffic_types or TRAFFIC_TYPES)
+    key = (date_from, date_to or date_from, traffic_types, force)
+    return prerender_queue.submit(
+        "prerender", key,
+        prerender_range, date_from, date_to, traffic_types, None, force
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render heatmaps and bar charts for a date range")
+    parser.add_argument("--from", dest="date_from", required=True, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Last date (YYYY-MM-DD), defaults to --from")
+    parser.add_argument("--types", nargs="+", choices=TRAFFIC_TYPES, help="Traffic types (default: all)")
+    parser.add_argument("--workers", type=int, default=PRERENDER_WORKERS, help="Render processes")
+    parser.add_argument("--force", action="store_true", help="Re-render even if artifacts are current")
+    args = parser.parse_args()
+
+    prerender_range(args.date_from, args.date_to, args.types, args.workers, args.force)
@@ -11,6 +11,7 @@ import pandas as pd
 import os
 from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 from backend.visualizer.services.map_renderer import render_heatmap_map
+from backend.utils.artifacts import write_artifact
 
 def generate_default_map():
     output_path = os.path.join("heatmaps", "default_map.html")
@@ -30,4 +31,4 @@ def generate_default_map():
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     map_obj = render_heatmap_map(df, "Pedestrian Count", "Default Map", None)
-    map_obj.save(output_path)
+    write_artifact(output_path, map_obj.get_root().render())
@@ -4,6 +4,9 @@
 # - Builds HTML heatmap based on traffic data
 # - Assigns weather/temp and renders map
 # - Saves map file and updates DB with metadata
+# - Skips only if the artifact manifest says the file was built
+#   from the date's current data version
+# - Stage timings (fetch/render/save/db) go to /metrics
 # - Used by smart_generate and CLI runs
 # ====================================================
 
@@ -12,42 +15,51 @@ from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
 import os, time
 from datetime import datetime
 import mysql.connector
-from threading import Thread
 from rich.errors import LiveError
 
 from backend.visualizer.services.heatmap_log import log_heatmap_duration
-from backend.config import DB_CONFIG
-from backend.forecast.temperature import assign_temperature
-from backend.forecast.weather import assign_weather
+from backend.db.connection import get_connection
+from backend.db.artifact_manifest import is_artifact_current, record_artifact
+from backend.db.data_versions import get_data_version
+from backend.utils.artifacts import public_url, write_artifact
+from backend.utils.metrics import GENERATIONS, observe_stage, stage_timer
+from backend.forecast.weather_index import is_weather_complete
+from backend.forecast.weather_jobs import enqueue_weather_assignment
 from backend.visualizer.services.data_fetcher import fetch_traffic_data
 from backend.visualizer.services.map_renderer import render_heatmap_map
+from backend.visualizer.services.template_renderer import minify_html, render_heatmap_html
 
 console = Console()
 
+# "template" (default) injects data into a cached map shell,
+# "folium" rebuilds the full Folium map per request (reference path)
+HEATMAP_RENDERER = os.getenv("HEATMAP_RENDERER", "template")
+
+# Renders the heatmap page and returns minified HTML
+def render_heatmap_page(df, selected_type, label, time_filter):
+    if HEATMAP_RENDERER == "folium":
+        base_map = render_heatmap_map(df, selected_type, label, time_filter)
+        return minify_html(base_map.get_root().render())
+    return render_heatmap_html(df, selected_type, label, time_filter)
+
+# heatmaps/heatmap_{date}_{HH-MM-SS}_{Type_With_Underscores}.html
+def heatmap_path(date_filter, time_filter, selected_type):
+    return os.path.join(
+        "heatmaps",
+        f"heatmap_{date_filter}_{(time_filter or 'all').replace(':', '-')}_{selected_type.replace(' ', '_')}.html"
+    )
+
 # Checks if weather and temperature data exists for the given date
 # Returns a tuple (weather_exists, temperature_exists)
-# If not then assign weather and temperature data in the background
+# Answered from the in-memory completeness index, no DB round trip
+# If not then queue weather and temperature assignment in the background
 def check_weather_and_temp_exists(date_filter):
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        # Date is assign %s to take user input (date_filter)
-        cursor.execute("""
-            SELECT
-                MAX(CASE WHEN Weather IS NOT NULL THEN 1 ELSE 0 END),
-                MAX(CASE WHEN Temperature IS NOT NULL THEN 1 ELSE 0 END)
-            FROM weather_season_data
-            WHERE DATE(Date_ID) = %s
-        """, (date_filter,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return result[0] == 1, result[1] == 1
-    except mysql.connector.Error:
-        return False, False
+    complete = is_weather_complete(date_filter)
+    return complete, complete
 
 # Generates a heatmap HTML file for the given date and time filter
-def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count", quiet=False, df=None):
+# data_version: version a passed-in df was fetched at (recorded in the manifest)
+def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count", quiet=False, df=None, data_version=None):
     start = time.time()
     label = date_filter
     timings = {}
@@ -55,35 +67,26 @@ def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count",
     def mark(name):
         timings[name] = time.time()
 
-    filename = os.path.join(
-        "heatmaps",
-        f"heatmap_{label}_{(time_filter or 'all').replace(':', '-')}_{selected_type.replace(' ', '_')}.html"
-    )
-
-    if os.path.exists(filename):
-        if not quiet:
-            console.print(f"[green]Skipping (already exists): {filename}[/green]")
-        return
+    filename = heatmap_path(label, time_filter, selected_type)
 
-    existing_id = None
+    # Current = manifest row built from this date's current data version
+    params = {"date": date_filter, "time": time_filter, "type": selected_type}
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        # %s = user input value for (type, date, time)
-        cursor.execute("""
-            SELECT Heatmap_ID FROM heatmaps
-            WHERE Traffic_Type = %s AND Date_Filter = %s AND Time_Filter = %s
-        """, (selected_type, date_filter, time_filter))
-        result = cursor.fetchone()
-        if result:
-            existing_id = result[0]
-        cursor.close()
-        conn.close()
+        version = get_data_version(date_filter)
+        if is_artifact_current("heatmap", params, version):
+            GENERATIONS.inc(generator="heatmap", outcome="cached")
+            if not quiet:
+                console.print(f"[green]Skipping (up to date): {filename}[/green]")
+            return
     except mysql.connector.Error as e:
         if not quiet:
             console.print(f"[red]DB check failed:[/red] {e}")
         return
 
+    # Rows fetched here are at the version just read; a passed-in df may be older
+    if data_version is None or df is None or getattr(df, "empty", True):
+        data_version = version
+
     if not quiet:
         console.print(f"\nGenerating: [bold magenta]{selected_type}[/bold magenta] @ [cyan]{date_filter} {time_filter}[/cyan]")
 
@@ -91,23 +94,16 @@ def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count",
         if quiet:
             weather_ok, temp_ok = check_weather_and_temp_exists(date_filter)
             if df is None or getattr(df, "empty", True):
-                df = fetch_traffic_data(date_filter, time_filter, selected_type)
+                with stage_timer("heatmap", "fetch"):
+                    df = fetch_traffic_data(date_filter, time_filter, selected_type)
 
             if not (weather_ok and temp_ok):
-                def background_weather_temp():
-                    if not weather_ok:
-                        assign_weather(date_filter)
-                    if not temp_ok:
-                        assign_temperature(date_filter)
-                    console.print(f"[green]\u2705 Weather/temp background assignment finished for {date_filter}[/green]")
-                Thread(target=background_weather_temp, daemon=True).start()
-
-            base_map = render_heatmap_map(df, selected_type, label, time_filter)
-            os.makedirs("heatmaps", exist_ok=True)
-            html = base_map.get_root().render()
-            minified = ''.join(line.strip() for line in html.splitlines())
-            with open(filename, "w", encoding="utf-8", errors="ignore") as f:
-                f.write(minified)
+                enqueue_weather_assignment(date_filter)
+
+            with stage_timer("heatmap", "render"):
+                minified = render_heatmap_page(df, selected_type, label, time_filter)
+            with stage_timer("heatmap", "save"):
+                write_artifact(filename, minified)
 
         else:
             with Progress(
@@ -123,31 +119,25 @@ def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count",
                 weather_ok, temp_ok = check_weather_and_temp_exists(date_filter)
 
                 if not (weather_ok and temp_ok):
-                    def background_weather_temp():
-                        if not weather_ok:
-                            assign_weather(date_filter)
-                        if not temp_ok:
-                            assign_temperature(date_filter)
-                    Thread(target=background_weather_temp, daemon=True).start()
+                    enqueue_weather_assignment(date_filter)
 
                 progress.advance(task_id, 2)
                 mark("weather")
                 mark("temperature")
 
                 if df is None or getattr(df, "empty", True):
-                    df = fetch_traffic_data(date_filter, time_filter, selected_type)
+                    with stage_timer("heatmap", "fetch"):
+                        df = fetch_traffic_data(date_filter, time_filter, selected_type)
                 progress.advance(task_id)
                 mark("fetch")
 
-                base_map = render_heatmap_map(df, selected_type, label, time_filter)
+                with stage_timer("heatmap", "render"):
+                    minified = render_heatmap_page(df, selected_type, label, time_filter)
                 progress.advance(task_id)
                 mark("render")
 
-                os.makedirs("heatmaps", exist_ok=True)
-                html = base_map.get_root().render()
-                minified = ''.join(line.strip() for line in html.splitlines())
-                with open(filename, "w", encoding="utf-8", errors="ignore") as f:
-                    f.write(minified)
+                with stage_timer("heatmap", "save"):
+                    write_artifact(filename, minified)
                 progress.advance(task_id)
                 mark("save")
 
@@ -155,52 +145,51 @@ def generate_heatmap(date_filter, time_filter, selected_type="Pedestrian Count",
         if not quiet:
             print("Rich LiveError: running in headless mode.")
 
+    db_start = time.perf_counter()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         # Is the time and date when the heatmap was generated
         generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        heatmap_url = public_url(filename)
 
-        base_url = os.getenv("BASE_URL", "http://localhost:5000")
-        prod_url = os.getenv("PROD_URL", "https://smart-foot-traffic-backend.onrender.com")
+        if os.path.exists(filename):
+            record_artifact("heatmap", params, data_version, filename, conn)
 
-        if "localhost" in base_url or "127.0.0.1" in base_url:
-            heatmap_url = f"{base_url}/{filename.replace(os.sep, '/')}"
-        else:
-            heatmap_url = f"{prod_url}/{filename.replace(os.sep, '/')}"
-
-        if existing_id:
-            cursor.execute("""
-                UPDATE heatmaps
-                SET Generated_At = %s, Heatmap_URL = %s, Status = 'Regenerated'
-                WHERE Heatmap_ID = %s
-            """, (generated_at, heatmap_url, existing_id))
-            if not quiet:
-                console.print(f"[green]Updated heatmap ID {existing_id}[/green]")
-        else:
-            cursor.execute("""
-                INSERT INTO heatmaps (Generated_At, Traffic_Type, Date_Filter, Time_Filter, Status, Heatmap_URL)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                generated_at,
-                selected_type,
-                date_filter,
-                time_filter,
-                "Generated",
-                heatmap_url
-            ))
-            if not quiet:
-                console.print(f"[green]Inserted new heatmap record[/green]")
+        # One row per (type, date, time), enforced by unique_heatmap
+        cursor.execute("""
+            INSERT INTO heatmaps (Generated_At, Traffic_Type, Date_Filter, Time_Filter, Status, Heatmap_URL)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                Generated_At = VALUES(Generated_At),
+                Heatmap_URL = VALUES(Heatmap_URL),
+                Status = 'Regenerated'
+        """, (
+            generated_at,
+            selected_type,
+            date_filter,
+            time_filter,
+            "Generated",
+            heatmap_url
+        ))
+        if not quiet:
+            # rowcount is 1 for a new row, 2 for an updated one
+            action = "Updated" if cursor.rowcount == 2 else "Inserted new"
+            console.print(f"[green]{action} heatmap record[/green]")
 
         conn.commit()
         cursor.close()
         conn.close()
+        observe_stage("heatmap", "db", time.perf_counter() - db_start)
+        observe_stage("heatmap", "total", time.time() - start)
+        GENERATIONS.inc(generator="heatmap", outcome="generated")
 
         if not quiet:
             mark("db")
             log_heatmap_duration(date_filter, time_filter, selected_type, None, timings, start)
 
     except mysql.connector.Error as e:
+        GENERATIONS.inc(generator="heatmap", outcome="failed")
         if not quiet:
             console.print(f"[red]DB insert/update failed:[/red] {e}")
 
@@ -0,0 +1,156 @@
+# ====================================================
+# Range Heatmap Generator for Smart Foot Traffic
+# ----------------------------------------------------
+# - Week / month / custom from-to heatmaps per location
+# - Optional hour-of-day and weekday filters
+# - Shows the sum or the per-day average of the counts
+# - Served from the daily/hourly rollups (one small grouped
+#   query), so a whole year costs about as much as one hour
+# - Colors use the mean per hour, so ranges share the hourly scale
+# - Used by /api/generate_heatmap with mode "range"
+# ====================================================
+
+import hashlib
+import os
+import time
+from datetime import datetime
+
+import mysql.connector
+from rich.console import Console
+
+from backend.db.artifact_manifest import is_artifact_current, record_artifact
+from backend.db.data_versions import get_range_version
+from backend.utils.artifacts import write_artifact
+from backend.visualizer.services.data_fetcher import fetch_range_traffic_data
+from backend.visualizer.services.heatmap_payload import build_heatmap_payload
+from backend.visualizer.services.template_renderer import render_payload_html
+
+console = Console()
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+AGGREGATES = ("sum", "avg")
+
+# "7,8,9" -> ["7", "8", "9"]; lists pass through
+def _as_list(values):
+    return list(values) if isinstance(values, (list, tuple)) else str(values).split(",")
+
+# Accepts 8, "8", "08" or "08:00:00"
+def parse_hours(hours):
+    if not hours:
+        return None
+    hours = _as_list(hours)
+    parsed = sorted({int(str(hour).split(":")[0]) for hour in hours})
+    if parsed[0] < 0 or parsed[-1] > 23:
+        raise ValueError("hours must be between 0 and 23")
+    return parsed
+
+# Accepts 0-6 (Monday = 0) or day names ("mon", "Monday")
+def parse_weekdays(weekdays):
+    if not weekdays:
+        return None
+    parsed = set()
+    weekdays = _as_list(weekdays)
+    for day in weekdays:
+        if isinstance(day, str) and not day.strip().isdigit():
+            name = day.strip().lower()[:3]
+            if name not in WEEKDAY_NAMES:
+                raise ValueError(f"Unknown weekday: {day}")
+            parsed.add(WEEKDAY_NAMES.index(name))
+        else:
+            parsed.add(int(day))
+    if min(parsed) < 0 or max(parsed) > 6:
+        raise ValueError("weekdays must be between 0 (Monday) and 6 (Sunday)")
+    return sorted(parsed)
+
+# =====================================================
+# FUNCTION: Validate and normalize range parameters
+# Raises ValueError with a message for the API response
+# =====================================================
+def normalize_range_params(date_from, date_to, traffic_type, hours=None, weekdays=None, agg="sum"):
+    if not date_from or not date_to or not traffic_type:
+        raise ValueError("Missing from, to or traffic_type")
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d")
+        end = datetime.strptime(date_to, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("from/to must be YYYY-MM-DD")
+    if end < start:
+        raise ValueError("to must not be before from")
+
+    agg = (agg or "sum").lower()
+    if agg not in AGGREGATES:
+        raise ValueError(f"agg must be one of {AGGREGATES}")
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "traffic_type": traffic_type,
+        "hours": parse_hours(hours),
+        "weekdays": parse_weekdays(weekdays),
+        "agg": agg
+    }
+
+# heatmaps/range_{from}_{to}_{Type}_{agg}[_{filter hash}].html
+def range_path(date_from, date_to, traffic_type, hours=None, weekdays=None, agg="sum"):
+    name = f"range_{date_from}_{date_to}_{traffic_type.replace(' ', '_')}_{agg}"
+    if hours or weekdays:
+        filters = f"h={hours or ''};w={weekdays or ''}"
+        name += "_" + hashlib.sha1(filters.encode("utf-8")).hexdigest()[:8]
+    return os.path.join("heatmaps", f"{name}.html")
+
+# Info box texts: "2025-03-01 → 2025-03-31", "Avg/day · 07,08h · Mon,Fri"
+def _labels(date_from, date_to, hours, weekdays, agg):
+    label = date_from if date_from == date_to else f"{date_from} → {date_to}"
+    parts = ["Avg/day" if agg == "avg" else "Total"]
+    if hours:
+        parts.append(",".join(f"{hour:02}" for hour in hours) + "h")
+    if weekdays:
+        parts.append(",".join(WEEKDAY_NAMES[day].title() for day in weekdays))
+    return label, " · ".join(parts)
+
+# =====================================================
+# FUNCTION: Build the range heatmap payload
+# =====================================================
+def build_range_payload(date_from, date_to, traffic_type, hours=None, weekdays=None, agg="sum"):
+    df = fetch_range_traffic_data(date_from, date_to, traffic_type, hours, weekdays)
+
+    days = df["Days"].clip(lower=1)
+    df["Interval_Count"] = (df["Total"] / days).round() if agg == "avg" else df["Total"]
+    df["DateTime_String"] = "Unknown"
+    hourly_mean = df["Total"] / (days * (len(hours) if hours else 24))
+
+    label, time_label = _labels(date_from, date_to, hours, weekdays, agg)
+    return build_heatmap_payload(df, traffic_type, label, time_label, color_counts=hourly_mean)
+
+# =====================================================
+# FUNCTION: Generate (or reuse) a range heatmap page
+# Returns the file path
+# =====================================================
+def generate_range_heatmap(date_from, date_to, traffic_type, hours=None, weekdays=None, agg="sum"):
+    start = time.time()
+    filename = range_path(date_from, date_to, traffic_type, hours, weekdays, agg)
+    params = {"from": date_from, "to": date_to, "type": traffic_type, "hours": hours, "weekdays": weekdays, "agg": agg}
+
+    try:
+        version = get_range_version(date_from, date_to)
+        if is_artifact_current("range", params, version):
+            console.print(f"[green]Skipping (up to date): {filename}[/green]")
+            return filename
+    except mysql.connector.Error as e:
+        console.print(f"[red]DB check failed:[/red] {e}")
+        version = None
+
+    payload = build_range_payload(date_from, date_to, traffic_type, hours, weekdays, agg)
+    write_artifact(filename, render_payload_html(payload))
+
+    if version is not None:
+        try:
+            record_artifact("range", params, version, filename)
+        except mysql.connector.Error as e:
+            console.print(f"[red]Manifest update failed:[/red] {e}")
+
+    console.print(f"[green]Range heatmap saved to {filename} in {time.time() - start:.2f}s[/green]")
+    return filename
+
+if __name__ == "__main__":
+    generate_range_heatmap("2025-03-01", "2025-03-31", "Pedestrian Count", hours=[8], agg="avg")
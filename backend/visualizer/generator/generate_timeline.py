@@ -0,0 +1,74 @@
+# ====================================================
+# Day Timeline Heatmap Generator for Smart Foot Traffic
+# ----------------------------------------------------
+# - One page per (date, type) with all 24 hours and a time slider
+# - One query for the whole day (shared with smart_generate's
+#   day cache, reused only at the date's current data version),
+#   hours are split in memory
+# - Replaces 24 separate heatmap generations + page loads
+# - Skips pages the artifact manifest says are current
+# - Used by /api/generate_heatmap with mode "timeline"
+# ====================================================
+
+import os
+import time
+import mysql.connector
+from rich.console import Console
+
+from backend.db.artifact_manifest import is_artifact_current, record_artifact
+from backend.db.data_versions import get_data_version
+from backend.forecast.weather_index import is_weather_complete
+from backend.forecast.weather_jobs import enqueue_weather_assignment
+from backend.utils.artifacts import write_artifact
+from backend.visualizer.generator.smart_generate import get_cached_day, preprocess_heatmap_data
+from backend.visualizer.services.data_fetcher import fetch_day_traffic_data
+from backend.visualizer.services.template_renderer import render_timeline_html
+
+console = Console()
+
+# heatmaps/timeline_{date}_{Type_With_Underscores}.html
+def timeline_path(date_filter, selected_type):
+    return os.path.join("heatmaps", f"timeline_{date_filter}_{selected_type.replace(' ', '_')}.html")
+
+# =====================================================
+# FUNCTION: Generate (or reuse) a day timeline page
+# Returns the file path
+# =====================================================
+def generate_day_timeline(date_filter, selected_type="Pedestrian Count"):
+    start = time.time()
+    filename = timeline_path(date_filter, selected_type)
+    params = {"date": date_filter, "type": selected_type}
+
+    try:
+        version = get_data_version(date_filter)
+        if is_artifact_current("timeline", params, version):
+            console.print(f"[green]Skipping (up to date): {filename}[/green]")
+            return filename
+    except mysql.connector.Error as e:
+        console.print(f"[red]DB check failed:[/red] {e}")
+        version = None
+
+    if not is_weather_complete(date_filter):
+        enqueue_weather_assignment(date_filter)
+
+    # Without a version the day can't be checked against (or stored in) the cache
+    if version is None:
+        day_df = fetch_day_traffic_data(date_filter, selected_type)
+    else:
+        day_df = get_cached_day(date_filter, selected_type, version)
+        if day_df is None:
+            day_df = preprocess_heatmap_data(date_filter, selected_type, version)
+
+    write_artifact(filename, render_timeline_html(day_df, selected_type, date_filter))
+
+    if version is not None:
+        try:
+            record_artifact("timeline", params, version, filename)
+        except mysql.connector.Error as e:
+            console.print(f"[red]Manifest update failed:[/red] {e}")
+
+    console.print(f"[green]Timeline saved to {filename} in {time.time() - start:.2f}s[/green]")
+    return filename
+
+if __name__ == "__main__":
+    generate_day_timeline("2025-02-27", "Vehicle Count")
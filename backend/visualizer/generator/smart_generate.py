@@ -2,64 +2,76 @@
 # Smart Heatmap Generator for Smart Foot Traffic
 # ----------------------------------------------------
 # - Generates heatmap immediately with cache if exists
-# - Starts background job to assign weather/temp + cache other hours
+# - Queues weather/temp assignment + caches the whole day in background
+# - Traffic cache holds one DataFrame per (date, type) day,
+#   fetched with a single query and split by hour in memory
+# - Cache is an LRU bounded in bytes (SMART_CACHE_MAX_MB); each day
+#   carries the data version it was fetched at and only counts while
+#   that is still the date's version (e.g. until weather is written)
 # - Used by /api/generate_heatmap backend route
 # ====================================================
 
+import os
 import time
-from threading import Thread, Lock
+from threading import Thread
 from rich.console import Console
-from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
 
+from backend.db.data_versions import cached_data_version
+from backend.utils.lru_cache import ByteLRUCache, sizeof_value
+from backend.utils.metrics import stage_timer
 from backend.visualizer.generator.generate_heatmap import generate_heatmap
-from backend.visualizer.services.data_fetcher import fetch_traffic_data
-from backend.forecast.weather import assign_weather
-from backend.forecast.temperature import assign_temperature
+from backend.visualizer.services.data_fetcher import fetch_day_traffic_data, fetch_traffic_data, filter_hour_window
+from backend.forecast.weather_index import is_weather_complete
+from backend.forecast.weather_jobs import enqueue_weather_assignment
 
 console = Console()
 
-# Global control variables
-current_batch_id = 0
-cached_data = {}              
-preprocessed_times = set()    
-cache_lock = Lock()
+SMART_CACHE_MAX_MB = float(os.getenv("SMART_CACHE_MAX_MB", 64))
+
+# (date, traffic_type) -> (data version, that day's traffic rows)
+day_cache = ByteLRUCache(
+    "traffic_days", int(SMART_CACHE_MAX_MB * 1024 * 1024), sizeof=lambda entry: sizeof_value(entry[1])
+)
 
 def get_all_hourly_times():
     return [f"{h:02}:00:00" for h in range(24)]
 
-# Caches traffic data (no weather/temp here)
-def preprocess_heatmap_data(date_filter, time_filter, traffic_type):
-    df = fetch_traffic_data(date_filter, time_filter, traffic_type)
-
-    if df is not None and not df.empty:
-        with cache_lock:
-            cached_data[(date_filter, time_filter, traffic_type)] = df
-            preprocessed_times.add(time_filter)
+# Cached day, or None if missing or fetched at another data version
+# (a stale entry counts as a cache miss)
+def get_cached_day(date_filter, traffic_type, version):
+    entry = day_cache.get((date_filter, traffic_type), valid=lambda entry: entry[0] == version)
+    return None if entry is None else entry[1]
+
+# Caches one whole day of a traffic type with a single query
+# version: the date's data version read before the fetch
+def preprocess_heatmap_data(date_filter, traffic_type, version=None):
+    if version is None:
+        version = cached_data_version(date_filter)
+    day_df = fetch_day_traffic_data(date_filter, traffic_type)
+    day_cache.put((date_filter, traffic_type), (version, day_df))
+    return day_df
 
 # Entry point for generating + background work
 def smart_generate(date_filter, time_filter, traffic_type):
-    global current_batch_id
-    current_batch_id += 1
-    batch_id = current_batch_id
-
     console.print("\n[bold magenta]========== HEATMAP GENERATION ==========[/bold magenta]")
     console.print(f"Date: [green]{date_filter}[/green]  Time: [green]{time_filter}[/green]  Type: [green]{traffic_type}[/green]")
 
-    # Try to use cached data first
-    cache_key = (date_filter, time_filter, traffic_type)
-    with cache_lock:
-        df = cached_data.get(cache_key)
+    # Try to use the cached day first (only if fetched at the current version)
+    version = cached_data_version(date_filter)
+    day_df = get_cached_day(date_filter, traffic_type, version)
 
-    if df is not None and not df.empty:
-        console.print(f"[green]Using cached data for {time_filter}[/green]")
-    else:
-        console.print(f"[yellow]No valid cache for {time_filter}, fetching...[/yellow]")
-        df = fetch_traffic_data(date_filter, time_filter, traffic_type)
+    with stage_timer("heatmap", "fetch"):
+        if day_df is not None:
+            console.print(f"[green]Using cached day for {date_filter} {traffic_type}[/green]")
+            df = filter_hour_window(day_df, date_filter, time_filter, traffic_type)
+        else:
+            console.print(f"[yellow]No cached day for {date_filter}, fetching {time_filter}...[/yellow]")
+            df = fetch_traffic_data(date_filter, time_filter, traffic_type)
 
     console.print("[cyan]Skipping immediate weather/temp assignment (moved to background).[/cyan]")
 
     # Generate the heatmap immediately
-    generate_heatmap(date_filter, time_filter, traffic_type, quiet=False, df=df)
+    generate_heatmap(date_filter, time_filter, traffic_type, quiet=False, df=df, data_version=version)
     console.print("[green]Heatmap generation completed.[/green]")
 
     # Background preprocessing thread
@@ -67,67 +79,26 @@ def smart_generate(date_filter, time_filter, traffic_type):
         time.sleep(1.5)
         console.print("\n[bold magenta]=== Starting Background Preprocessing ===[/bold magenta]")
 
-        # Assign weather/temp in background
-        try:
-            with Progress(
-                TextColumn("[bold cyan]Assigning Weather/Temp"),
-                BarColumn(bar_width=None),
-                "[progress.percentage]{task.percentage:>3.0f}%",
-                TimeElapsedColumn(),
-                console=console,
-                transient=True
-            ) as progress:
-                task_id = progress.add_task("Assigning Weather/Temp", total=2)
+        # Queue weather/temp (deduped per date, skipped if already complete)
+        if is_weather_complete(date_filter):
+            console.print(f"[cyan]Weather/temp already complete for {date_filter}[/cyan]")
+        elif enqueue_weather_assignment(date_filter):
+            console.print(f"[cyan]Weather/temp assignment queued for {date_filter}[/cyan]")
+        else:
+            console.print(f"[cyan]Weather/temp assignment already queued for {date_filter}[/cyan]")
 
-                assign_weather(date_filter)
-                progress.advance(task_id)
-
-                assign_temperature(date_filter)
-                progress.advance(task_id)
-
-            console.print(f"[green]Weather/temp assignment done for {date_filter}[/green]")
+        cached = day_cache.peek((date_filter, traffic_type))
+        if cached is not None and cached[0] == version:
+            return
 
+        try:
+            start = time.time()
+            cached_day = preprocess_heatmap_data(date_filter, traffic_type, version)
+            console.print(
+                f"[green]Cached [bold]{traffic_type}[/bold] for {date_filter}: "
+                f"{len(cached_day)} rows in {time.time() - start:.2f}s[/green]"
+            )
         except Exception as e:
-            console.print(f"[red]Failed assigning weather/temp: {e}[/red]")
-
-        preprocessed_hours = []
-        hours_to_process = [h for h in get_all_hourly_times() if h != time_filter]
-
-        with Progress(
-            TextColumn("[bold cyan]Caching traffic data"),
-            BarColumn(),
-            "[progress.percentage]{task.percentage:>3.0f}%",
-            TimeElapsedColumn(),
-            console=console,
-            transient=True
-        ) as progress:
-            task_id = progress.add_task("Caching traffic data", total=len(hours_to_process))
-
-            for hour in hours_to_process:
-                if batch_id != current_batch_id:
-                    console.print("[bold red]Preprocessing cancelled due to newer request.[/bold red]")
-                    return
-
-                key = (date_filter, hour, traffic_type)
-                with cache_lock:
-                    if key in cached_data:
-                        progress.advance(task_id)
-                        continue
-
-                try:
-                    df = fetch_traffic_data(date_filter, hour, traffic_type)
-                    if df is not None and not df.empty:
-                        with cache_lock:
-                            cached_data[(date_filter, hour, traffic_type)] = df
-                            preprocessed_times.add(hour)
-                            preprocessed_hours.append(int(hour.split(":" )[0]))
-                except Exception:
-                    pass  # skip logging errors to avoid clutter
-
-                progress.advance(task_id)
-
-        if preprocessed_hours:
-            short_list = sorted(preprocessed_hours)
-            console.print(f"[green]Preprocessed [bold]{traffic_type}[/bold] hours: {short_list}[/green]")
+            console.print(f"[red]Background caching failed for {date_filter}: {e}[/red]")
 
     Thread(target=background_preprocessing, daemon=True).start()
@@ -13,46 +13,52 @@ from datetime import datetime
 from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
 
 
+# Season to month range
+season_ranges = {
+    "Summer": "December – February",
+    "Autumn": "March – May",
+    "Winter": "June – August",
+    "Spring": "September – November"
+}
+
+# Convert time_filter (e.g. "00:00:00") to Duration format (e.g. "00:00 - 01:00")
+def convert_time_to_duration(time_str):
+    try:
+        dt = datetime.strptime(time_str, "%H:%M:%S")
+        start = dt.strftime("%H:%M")
+        end_dt = dt.replace(hour=(dt.hour + 1) % 24)
+        end = end_dt.strftime("%H:%M")
+        return f"{start} - {end}"
+    except:
+        return time_str  # fallback
+
+# Auto-assign season if date_filter is a date string
+def get_season_from_date(date_str):
+    try:
+        month = int(datetime.strptime(date_str, "%Y-%m-%d").month)
+        if month in [12, 1, 2]:
+            return "Summer"
+        elif month in [3, 4, 5]:
+            return "Autumn"
+        elif month in [6, 7, 8]:
+            return "Winter"
+        elif month in [9, 10, 11]:
+            return "Spring"
+    except:
+        return None
+
+# Season shown in the box (date_filter may already be a season name)
+def get_current_season(date_filter):
+    return date_filter if date_filter in season_ranges else get_season_from_date(date_filter)
+
+
 def generate_description_box(date_filter, time_filter, selected_type, included_locations):
     traffic_label = selected_type.replace(" Count", "")
     all_locations = sorted(LOCATION_COORDINATES.keys())
 
-    season_ranges = {
-        "Summer": "December – February",
-        "Autumn": "March – May",
-        "Winter": "June – August",
-        "Spring": "September – November"
-    }
-
-    # Convert time_filter (e.g. "00:00:00") to Duration format (e.g. "00:00 - 01:00")
-    def convert_time_to_duration(time_str):
-        try:
-            dt = datetime.strptime(time_str, "%H:%M:%S")
-            start = dt.strftime("%H:%M")
-            end_dt = dt.replace(hour=(dt.hour + 1) % 24)
-            end = end_dt.strftime("%H:%M")
-            return f"{start} - {end}"
-        except:
-            return time_str  # fallback
-
     duration_str = convert_time_to_duration(time_filter)
 
-    # Auto-assign season if date_filter is a date string
-    def get_season_from_date(date_str):
-        try:
-            month = int(datetime.strptime(date_str, "%Y-%m-%d").month)
-            if month in [12, 1, 2]:
-                return "Summer"
-            elif month in [3, 4, 5]:
-                return "Autumn"
-            elif month in [6, 7, 8]:
-                return "Winter"
-            elif month in [9, 10, 11]:
-                return "Spring"
-        except:
-            return None
-
-    current_season = date_filter if date_filter in season_ranges else get_season_from_date(date_filter)
+    current_season = get_current_season(date_filter)
     season_range = season_ranges.get(current_season, "")
 
     # Build HTML for each location
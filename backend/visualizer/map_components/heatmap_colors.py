@@ -4,78 +4,155 @@
 # - Maps traffic count values to corresponding color codes
 # - Higher counts = deeper reds; lower = yellow or orange
 # - Used for coloring heatmap zones by intensity
+# - Scale is a breakpoint array (np.searchsorted), cached per
+#   traffic type; breakpoints can come from a JSON file or be
+#   quantile-based from historical counts
+#
+# Config (env):
+#   HEATMAP_COLOR_SCALE=fixed|quantile   (default fixed)
+#   HEATMAP_BREAKPOINTS_FILE=path.json   {"Pedestrian Count": [1, 10, ...], ...}
+#     (one ascending breakpoint per color step, 31 values)
 # ===========================================================
 
-def get_color_by_count(count):
+import json
+import os
+from threading import Lock
+
+import numpy as np
+
+# (count is above, color) from warmest to palest
+COLOR_STEPS = [
     # Red Zone (Warmest → Deepest)
-    if count > 600:
-        return "#800000"  # 🟥 Deepest Dark Red
-    elif count > 550:
-        return "#8B0000"  # 🟥 Very Dark Red
-    elif count > 500:
-        return "#990000"  # 🟥 Dark Red
-    elif count > 475:
-        return "#A60000"  # 🟥 Rich Crimson
-    elif count > 450:
-        return "#B30000"  # 🔴 Strong Red
-    elif count > 425:
-        return "#BF0000"  # 🔴 Bold Red
-    elif count > 400:
-        return "#e30015"  # 🔴 Clear Red
-    elif count > 375:
-        return "#e90000"  # 🔴 Bright Red
-    elif count > 350:
-        return "#F20000"  # 🔴 Intense Red
-    elif count > 325:
-        return "#FF0033"  # 🔴 Light-Intense Red
-    elif count > 300:
-        return "#FF0033"  # 🔴 Light Red
-    elif count > 180:
-        return "#FF3333"  # 🔴 Soft Red
+    (600, "#800000"),   # 🟥 Deepest Dark Red
+    (550, "#8B0000"),   # 🟥 Very Dark Red
+    (500, "#990000"),   # 🟥 Dark Red
+    (475, "#A60000"),   # 🟥 Rich Crimson
+    (450, "#B30000"),   # 🔴 Strong Red
+    (425, "#BF0000"),   # 🔴 Bold Red
+    (400, "#e30015"),   # 🔴 Clear Red
+    (375, "#e90000"),   # 🔴 Bright Red
+    (350, "#F20000"),   # 🔴 Intense Red
+    (325, "#FF0033"),   # 🔴 Light-Intense Red
+    (300, "#FF0033"),   # 🔴 Light Red
+    (180, "#FF3333"),   # 🔴 Soft Red
 
     # Pink Zone (Red-Pink Blend)
-    elif count > 170:
-        return "#ff174b"  # 🌺 Vivid Red-Pink
-    elif count > 160:
-        return "#FF1A4D"  # 🌺 Deep Pink-Red
-    elif count > 150:
-        return "#FF2E5A"  # 🌺 Mid Coral Pink
-    elif count > 140:
-        return "#FF4470"  # 🌸 Rose Pink
-    elif count > 130:
-        return "#FF5A85"  # 🌸 Blush Pink
-    elif count > 120:
-        return "#FF7F7A"  # 🌸 Light Coral Pink
+    (170, "#ff174b"),   # 🌺 Vivid Red-Pink
+    (160, "#FF1A4D"),   # 🌺 Deep Pink-Red
+    (150, "#FF2E5A"),   # 🌺 Mid Coral Pink
+    (140, "#FF4470"),   # 🌸 Rose Pink
+    (130, "#FF5A85"),   # 🌸 Blush Pink
+    (120, "#FF7F7A"),   # 🌸 Light Coral Pink
 
     # Orange Zone (Bright & Bold)
-    elif count > 110:
-        return "#FF6600"  # 🟧 Dark Orange
-    elif count > 100:
-        return "#FF751A"  # 🟧 Bold Orange
-    elif count > 90:
-        return "#FFAE33"  # 🟧 Medium Orange
-    elif count > 85:
-        return "#FEB001"  # 🟧 Bright Golden Orange
-    elif count > 80:
-        return "#FFB101"  # 🟧 Soft Golden Orange
+    (110, "#FF6600"),   # 🟧 Dark Orange
+    (100, "#FF751A"),   # 🟧 Bold Orange
+    (90, "#FFAE33"),    # 🟧 Medium Orange
+    (85, "#FEB001"),    # 🟧 Bright Golden Orange
+    (80, "#FFB101"),    # 🟧 Soft Golden Orange
 
     # Yellow Zone (Warm → Pale)
-    elif count > 65:
-        return "#FFCC00"  # 🟨 Strong Yellow
-    elif count > 55:
-        return "#FFD200"  # 🟨 Bright Yellow
-    elif count > 50:
-        return "#FFC133"  # 🟨 Light Orange-Yellow
-    elif count > 40:
-        return "#FFC000"  # 🟨 Golden Yellow
-    elif count > 30:
-        return "#FFD000"  # 🟨 Yellow-Gold
-    elif count > 20:
-        return "#FFDF00"  # 🟨 Soft Yellow-Gold
-    elif count > 10:
-        return "#FFE800"  # 🟨 Light Yellow
-    elif count > 1:
-        return "#FFEA00"  # 🟨 Faint Yellow
-
-    else:
-        return "#FFEA00"  # ⚪ 
+    (65, "#FFCC00"),    # 🟨 Strong Yellow
+    (55, "#FFD200"),    # 🟨 Bright Yellow
+    (50, "#FFC133"),    # 🟨 Light Orange-Yellow
+    (40, "#FFC000"),    # 🟨 Golden Yellow
+    (30, "#FFD000"),    # 🟨 Yellow-Gold
+    (20, "#FFDF00"),    # 🟨 Soft Yellow-Gold
+    (10, "#FFE800"),    # 🟨 Light Yellow
+    (1, "#FFEA00"),     # 🟨 Faint Yellow
+]
+
+# Color for counts at or below the lowest breakpoint
+BASE_COLOR = "#FFEA00"  # ⚪
+
+# Ascending arrays for searchsorted:
+# COLORS[i] is used when count > DEFAULT_BREAKPOINTS[i - 1]
+DEFAULT_BREAKPOINTS = np.array([threshold for threshold, _ in reversed(COLOR_STEPS)], dtype=float)
+COLORS = np.array([BASE_COLOR] + [color for _, color in reversed(COLOR_STEPS)])
+
+COLOR_SCALE_MODE = os.getenv("HEATMAP_COLOR_SCALE", "fixed")
+BREAKPOINTS_FILE = os.getenv("HEATMAP_BREAKPOINTS_FILE")
+
+_lock = Lock()
+_scales = {}  # traffic type -> breakpoint array
+
+def _load_breakpoints_file(traffic_type):
+    if not BREAKPOINTS_FILE or not os.path.exists(BREAKPOINTS_FILE):
+        return None
+    with open(BREAKPOINTS_FILE, "r") as f:
+        configured = json.load(f)
+    values = configured.get(traffic_type, configured.get("default"))
+    if values is None or len(values) != len(DEFAULT_BREAKPOINTS):
+        return None
+    return np.sort(np.array(values, dtype=float))
+
+# =====================================================
+# FUNCTION: Quantile breakpoints from historical counts
+# One breakpoint per color step, spread evenly over the
+# distribution of non-zero counts for the traffic type
+# =====================================================
+def quantile_breakpoints(counts):
+    counts = np.asarray(counts, dtype=float)
+    counts = counts[counts > 0]
+    if counts.size == 0:
+        return DEFAULT_BREAKPOINTS
+    levels = np.linspace(0, 1, len(DEFAULT_BREAKPOINTS) + 1)[:-1]
+    return np.maximum.accumulate(np.quantile(counts, levels))
+
+def _load_history(traffic_type):
+    import mysql.connector
+    from backend.config import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Interval_Count FROM traffic_counts
+        WHERE Traffic_Type = %s AND Interval_Count > 0
+    """, (traffic_type,))
+    counts = np.fromiter((row[0] for row in cursor), dtype=float)
+    cursor.close()
+    conn.close()
+    return counts
+
+def _build_scale(traffic_type):
+    configured = _load_breakpoints_file(traffic_type)
+    if configured is not None:
+        return configured
+    if COLOR_SCALE_MODE == "quantile" and traffic_type:
+        try:
+            return quantile_breakpoints(_load_history(traffic_type))
+        except Exception:
+            return DEFAULT_BREAKPOINTS
+    return DEFAULT_BREAKPOINTS
+
+# =====================================================
+# FUNCTION: Breakpoints for a traffic type (cached)
+# =====================================================
+def get_breakpoints(traffic_type=None):
+    scale = _scales.get(traffic_type)
+    if scale is None:
+        with _lock:
+            scale = _scales.get(traffic_type)
+            if scale is None:
+                scale = _build_scale(traffic_type)
+                _scales[traffic_type] = scale
+    return scale
+
+# Override (or reset with None) the scale for a traffic type
+def set_breakpoints(traffic_type, breakpoints=None):
+    with _lock:
+        if breakpoints is None:
+            _scales.pop(traffic_type, None)
+        else:
+            _scales[traffic_type] = np.sort(np.asarray(breakpoints, dtype=float))
+
+# =====================================================
+# FUNCTION: Colors for many counts at once
+# Returns a numpy array of color codes
+# =====================================================
+def colors_for_counts(counts, traffic_type=None):
+    counts = np.asarray(counts, dtype=float)
+    return COLORS[np.searchsorted(get_breakpoints(traffic_type), counts, side="left")]
+
+def get_color_by_count(count, traffic_type=None):
+    return str(colors_for_counts([count], traffic_type)[0])
@@ -8,6 +8,9 @@
 
 import folium
 
+# Light fill colors that need dark text on top
+BRIGHT_COLORS = {"#FFEB33", "#FFF066", "#FFF599", "#FFFACB", "#F0F9A3"}
+
 def abbreviate_count(count):
     if count >= 1_000_000:
         return f"{count // 100_000 / 10:.1f}M".rstrip("0").rstrip(".")  # e.g., 2.5M
@@ -17,8 +20,7 @@ def abbreviate_count(count):
         return str(count)
 
 def add_center_marker(map_obj, coords, cnt, fill_color):
-    bright_colors = {"#FFEB33", "#FFF066", "#FFF599", "#FFFACB", "#F0F9A3"}
-    text_color = "#000000" if fill_color in bright_colors else "#FFFFFF"
+    text_color = "#000000" if fill_color in BRIGHT_COLORS else "#FFFFFF"
     display_count = abbreviate_count(cnt)
 
     folium.Marker(
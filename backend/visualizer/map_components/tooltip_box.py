@@ -8,26 +8,25 @@
 
 import pandas as pd
 
-def generate_tooltip_html(location, traffic_type, count, datetime_string, 
-                          season="Unknown", weather="Unknown", temperature="?"):
-    # Color for each traffic type
-    type_color_map = {
-        "Pedestrian": "#3bffc1",
-        "Cyclist": "#ffe53b",
-        "Vehicle": "#8b4dff"
-    }
-
-    color = type_color_map.get(traffic_type, "#ccc")
-
-    # Season to month range
-    season_ranges = {
-        "Summer": "December – February",
-        "Autumn": "March – May",
-        "Winter": "June – August",
-        "Spring": "September – November"
-    }
-
-    is_season_mode = season in season_ranges
+# Color for each traffic type
+TYPE_COLOR_MAP = {
+    "Pedestrian": "#3bffc1",
+    "Cyclist": "#ffe53b",
+    "Vehicle": "#8b4dff"
+}
+
+# Season to month range
+SEASON_RANGES = {
+    "Summer": "December – February",
+    "Autumn": "March – May",
+    "Winter": "June – August",
+    "Spring": "September – November"
+}
+
+# Works out the date, time and season shown in a tooltip
+# Returns a tuple (show_date, show_time, show_season)
+def get_tooltip_fields(datetime_string, season="Unknown"):
+    is_season_mode = season in SEASON_RANGES
 
     # Ensure datetime string format
     safe_datetime_str = str(datetime_string) if pd.notna(datetime_string) else "N/A"
@@ -58,7 +57,20 @@ def generate_tooltip_html(location, traffic_type, count, datetime_string,
 
     show_time = "Unknown" if is_season_mode else time_part
     show_date = date_part
-    show_season = season if season in season_ranges else "Unknown"
+    show_season = season if season in SEASON_RANGES else "Unknown"
+    return show_date, show_time, show_season
+
+def generate_tooltip_html(location, traffic_type, count, datetime_string, 
+                          season="Unknown", weather="Unknown", temperature="?"):
+    show_date, show_time, show_season = get_tooltip_fields(datetime_string, season)
+    return build_tooltip_html(location, traffic_type, count, show_date, show_time,
+                              show_season, weather, temperature)
+
+# Tooltip markup from already resolved display values
+# (mirrored by tooltipHtml in templates/heatmap_client.js)
+def build_tooltip_html(location, traffic_type, count, show_date, show_time,
+                       show_season, weather, temperature):
+    color = TYPE_COLOR_MAP.get(traffic_type, "#ccc")
 
     return f"""
     <div style="
@@ -0,0 +1,152 @@
+# ====================================================
+# Shared Public Transport Layer for Heatmaps
+# ----------------------------------------------------
+# - Builds the PT stops into one static JS asset
+#   (heatmaps/assets/pt_layer.js): GeoJSON + icons + loader
+# - Stops outside the locked map bounds are dropped
+# - Dense stops are clustered in the browser
+# - Every heatmap just links the asset, so the browser
+#   downloads it once and renders never read the stops JSON
+#
+# Usage (rebuild after nearby_pt_stops.json changes):
+#   python -m backend.visualizer.pt.pt_layer
+# ====================================================
+
+import base64
+import hashlib
+import json
+import os
+from threading import Lock
+
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from backend.utils.artifacts import write_artifact
+from backend.visualizer.pt.pt_locations import ICON_FOLDER, ICON_MAP, ICON_SIZE, STOPS_FILE
+
+PT_LAYER_FILE = os.path.join("heatmaps", "assets", "pt_layer.js")
+
+# Path as seen from pages in /heatmaps (relative, so it also works in report iframes)
+PT_LAYER_URL = "assets/pt_layer.js"
+
+# Stops closer than this (pixels) are merged into one cluster until CLUSTER_OFF_ZOOM
+CLUSTER_RADIUS_PX = 30
+CLUSTER_OFF_ZOOM = 17
+
+_lock = Lock()
+_layer_url = None
+
+def _icon_data_uri(icon_file):
+    with open(os.path.join(ICON_FOLDER, icon_file), "rb") as f:
+        return "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+
+def _in_bounds(stop, bounds):
+    (lat_min, lon_min), (lat_max, lon_max) = bounds
+    return lat_min <= stop["lat"] <= lat_max and lon_min <= stop["lon"] <= lon_max
+
+# =====================================================
+# FUNCTION: Write the PT layer asset
+# Returns (path, number of stops kept)
+# =====================================================
+def build_pt_layer(bounds, path=PT_LAYER_FILE):
+    with open(STOPS_FILE, "r") as f:
+        all_stops = json.load(f)
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [stop["lon"], stop["lat"]]},
+            "properties": {"name": stop["name"], "type": stop["type"]}
+        }
+        for stop in all_stops
+        if stop.get("type") in ICON_MAP and _in_bounds(stop, bounds)
+    ]
+
+    icons = {stop_type: _icon_data_uri(icon_file) for stop_type, icon_file in ICON_MAP.items()}
+    stops = {"type": "FeatureCollection", "features": features}
+
+    script = f"""/* Generated by backend/visualizer/pt/pt_layer.py, do not edit */
+var PT_ICONS = {json.dumps(icons)};
+var PT_STOPS = {json.dumps(stops, ensure_ascii=False, separators=(",", ":"))};
+
+function addTransportLayer(map) {{
+    var group = L.markerClusterGroup ? L.markerClusterGroup({{
+        maxClusterRadius: {CLUSTER_RADIUS_PX},
+        disableClusteringAtZoom: {CLUSTER_OFF_ZOOM},
+        showCoverageOnHover: false,
+        iconCreateFunction: function (cluster) {{
+            return L.divIcon({{
+                className: "pt-cluster",
+                iconSize: [22, 22],
+                html: '<div style="width:22px;height:22px;line-height:22px;border-radius:11px;' +
+                    'background:#ffffff;border:1px solid #666;font-size:11px;font-weight:700;text-align:center;">' +
+                    cluster.getChildCount() + '</div>'
+            }});
+        }}
+    }}) : L.layerGroup();
+
+    var icons = {{}};
+    Object.keys(PT_ICONS).forEach(function (stopType) {{
+        icons[stopType] = L.icon({{iconUrl: PT_ICONS[stopType], iconSize: [{ICON_SIZE[0]}, {ICON_SIZE[1]}], iconAnchor: [14, 14]}});
+    }});
+
+    L.geoJSON(PT_STOPS, {{
+        pointToLayer: function (feature, latlng) {{
+            return L.marker(latlng, {{icon: icons[feature.properties.type]}})
+                .bindTooltip(feature.properties.name + " (" + feature.properties.type + ")");
+        }}
+    }}).addTo(group);
+
+    group.addTo(map);
+    return group;
+}}
+"""
+
+    write_artifact(path, script)
+
+    return path, len(features)
+
+# =====================================================
+# FUNCTION: Versioned URL of the PT layer asset
+# Builds the asset the first time it is needed; the content
+# hash in the URL lets browsers cache it indefinitely
+# =====================================================
+def get_pt_layer_url(bounds):
+    global _layer_url
+    if _layer_url is None:
+        with _lock:
+            if _layer_url is None:
+                if not os.path.exists(PT_LAYER_FILE):
+                    build_pt_layer(bounds)
+                with open(PT_LAYER_FILE, "rb") as f:
+                    version = hashlib.sha1(f.read()).hexdigest()[:10]
+                _layer_url = f"{PT_LAYER_URL}?v={version}"
+    return _layer_url
+
+
+class TransportLayer(JSCSSMixin, MacroElement):
+    """Links the shared PT asset and draws it on the parent map."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            addTransportLayer({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, bounds):
+        super().__init__()
+        self._name = "TransportLayer"
+        self.default_js = MarkerCluster.default_js + [("pt_layer", get_pt_layer_url(bounds))]
+        self.default_css = MarkerCluster.default_css
+
+# Adds the shared PT layer to a folium map (replaces add_transport_icons)
+def add_transport_layer(folium_map, bounds):
+    TransportLayer(bounds).add_to(folium_map)
+
+if __name__ == "__main__":
+    from backend.visualizer.services.map_renderer import MAP_BOUNDS
+
+    path, count = build_pt_layer(MAP_BOUNDS)
+    print(f"PT layer written to {path} ({count} stops inside map bounds)")
@@ -4,6 +4,8 @@
 # - Loads PT stops from JSON file
 # - Adds icons for bus, tram, and train stops
 # - Uses custom icon images
+# - One marker per stop; heatmaps now use the shared
+#   asset from pt_layer.py instead
 # ====================================================
 
 import folium
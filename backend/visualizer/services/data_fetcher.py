@@ -3,31 +3,30 @@
 # -----------------------------------------------------------
 # - Queries MySQL to get traffic + weather data for each sensor
 # - Supports exact datetime filters or seasonal summaries
+# - Date ranges are read from the daily/hourly rollups
 # - Returns a cleaned DataFrame for use in heatmap rendering
 # ===========================================================
 
-import mysql.connector
 import pandas as pd
 from datetime import datetime, timedelta
-from backend.config import DB_CONFIG
+from backend.db.connection import get_connection
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
 def fetch_traffic_data(date_filter=None, time_filter=None, selected_type="Vehicle Count", season_filter=None, max_age_minutes=30):
     import pandas as pd
-    import mysql.connector
-    from backend.config import DB_CONFIG
     from datetime import datetime, timedelta
 
-    conn = mysql.connector.connect(**DB_CONFIG)
+    conn = get_connection()
 
     if season_filter:
         query = """
             SELECT pd.Location, tc.Traffic_Type, SUM(tc.Total_Count) AS Interval_Count, 
-                   MAX(wsd.Weather) AS Weather, MAX(wsd.Temperature) AS Temperature
+                   MAX(wh.Weather) AS Weather, MAX(wh.Temperature) AS Temperature
             FROM traffic_counts tc
             JOIN weather_season_data wsd ON tc.Data_ID = wsd.Data_ID
             JOIN processed_data pd ON tc.Data_ID = pd.Data_ID
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
             WHERE wsd.Season = %s AND tc.Traffic_Type = %s
             GROUP BY pd.Location, tc.Traffic_Type
         """
@@ -44,10 +43,10 @@ def fetch_traffic_data(date_filter=None, time_filter=None, selected_type="Vehicl
 
         query = """
             SELECT pd.Location, tc.Traffic_Type, tc.Interval_Count,
-                   pd.Time, pd.Date, wsd.Weather, wsd.Temperature
+                   pd.Time, pd.Date, wh.Weather, wh.Temperature
             FROM processed_data pd
             JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
-            JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
             WHERE pd.Date = %s
               AND tc.Traffic_Type = %s
               AND pd.Time BETWEEN %s AND %s
@@ -63,3 +62,73 @@ def fetch_traffic_data(date_filter=None, time_filter=None, selected_type="Vehicl
 
     conn.close()
     return df
+
+# =====================================================
+# FUNCTION: Fetch a whole day in one query
+# All hours (and all traffic types unless selected_type
+# is given), for batch rendering and smart_generate's cache
+# Split per heatmap with filter_hour_window()
+# =====================================================
+def fetch_day_traffic_data(date_filter, selected_type=None):
+    conn = get_connection()
+    query = """
+        SELECT pd.Location, tc.Traffic_Type, tc.Interval_Count,
+               pd.Time, pd.Date, wh.Weather, wh.Temperature
+        FROM processed_data pd
+        JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
+        LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
+        WHERE pd.Date = %s
+    """
+    params = (date_filter,)
+    if selected_type:
+        query += " AND tc.Traffic_Type = %s"
+        params = (date_filter, selected_type)
+    df = pd.read_sql(query, conn, params=params)
+    conn.close()
+
+    df["DateTime_String"] = [
+        f"{d} {t}" if pd.notna(d) and pd.notna(t) else "N/A"
+        for d, t in zip(df["Date"], df["Time"])
+    ]
+    return df
+
+# Same rows fetch_traffic_data(date, time, type) returns, taken from a day frame
+def filter_hour_window(day_df, date_filter, time_filter, selected_type, max_age_minutes=30):
+    selected_dt = datetime.strptime(f"{date_filter} {time_filter}", "%Y-%m-%d %H:%M:%S")
+    time_lower = (selected_dt - timedelta(minutes=max_age_minutes)).time()
+    time_upper = selected_dt.time()
+
+    # pd.Time comes back from MySQL as a timedelta since midnight
+    lower = pd.Timedelta(hours=time_lower.hour, minutes=time_lower.minute, seconds=time_lower.second)
+    upper = pd.Timedelta(hours=time_upper.hour, minutes=time_upper.minute, seconds=time_upper.second)
+    times = pd.to_timedelta(day_df["Time"])
+
+    mask = (day_df["Traffic_Type"] == selected_type) & (times >= lower) & (times <= upper)
+    return day_df[mask]
+
+# =====================================================
+# FUNCTION: Per-location totals for a date range
+# Reads traffic_rollup_daily, or traffic_rollup_hourly when
+# hours are given; weekdays: 0 = Monday ... 6 = Sunday
+# Returns Location, Total, Days (dates with data)
+# =====================================================
+def fetch_range_traffic_data(date_from, date_to, selected_type, hours=None, weekdays=None):
+    table = "traffic_rollup_hourly" if hours else "traffic_rollup_daily"
+    query = f"""
+        SELECT Location, SUM(Count_Sum) AS Total, COUNT(DISTINCT Date) AS Days
+        FROM {table}
+        WHERE Traffic_Type = %s AND Date BETWEEN %s AND %s
+    """
+    params = [selected_type, date_from, date_to]
+    if hours:
+        query += f" AND Hour IN ({', '.join(['%s'] * len(hours))})"
+        params += list(hours)
+    if weekdays:
+        query += f" AND Weekday IN ({', '.join(['%s'] * len(weekdays))})"
+        params += list(weekdays)
+    query += " GROUP BY Location"
+
+    conn = get_connection()
+    df = pd.read_sql(query, conn, params=tuple(params))
+    conn.close()
+    return df
@@ -8,19 +8,19 @@
 
 import mysql.connector
 from datetime import datetime
-from backend.config import DB_CONFIG
+from backend.db.connection import get_connection
 import os
 
 def log_heatmap_to_db(filename, selected_type, date_filter, time_filter):
     """
-    Insert heatmap metadata into the `heatmaps` table.
+    Insert (or refresh) heatmap metadata in the `heatmaps` table.
     - filename: full path to the saved HTML file
     - selected_type: traffic type (Pedestrian Count, etc.)
     - date_filter: filter used to generate map
     - time_filter: time used to generate map
     """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
 
         heatmap_url = f"http://localhost:5000/{filename.replace(os.sep, '/')}"
@@ -30,6 +30,10 @@ def log_heatmap_to_db(filename, selected_type, date_filter, time_filter):
         cursor.execute("""
             INSERT INTO heatmaps (Generated_At, Traffic_Type, Date_Filter, Time_Filter, Status, Heatmap_URL)
             VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                Generated_At = VALUES(Generated_At),
+                Heatmap_URL = VALUES(Heatmap_URL),
+                Status = 'Regenerated'
         """, (
             generated_at,
             selected_type,
@@ -0,0 +1,129 @@
+# ===========================================================
+# Heatmap Payload Builder for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Turns a traffic DataFrame into the small set of values a
+#   heatmap actually shows (count, color, tooltip fields)
+# - Shared by the Folium renderer and the template renderer,
+#   so both paths show exactly the same numbers
+# - Plain dict, safe to send as JSON
+# - Frame is indexed by location once and colors are mapped
+#   in one vectorized call
+# - build_day_timeline_payload() bundles all 24 hours of a day
+#   for the timeline page
+# ===========================================================
+
+import numpy as np
+import pandas as pd
+
+from backend.visualizer.map_components.description_box import convert_time_to_duration, get_current_season
+from backend.visualizer.map_components.heatmap_colors import colors_for_counts
+from backend.visualizer.map_components.sensor_locations import LOCATION_COORDINATES
+from backend.visualizer.map_components.tooltip_box import TYPE_COLOR_MAP, get_tooltip_fields
+from backend.visualizer.services.data_fetcher import filter_hour_window
+
+NO_DATA_COLOR = "#444444"
+
+# Temperatures are shown with one decimal, text values (e.g. "N/A") as-is
+def _clean_temperature(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "?"
+    try:
+        return round(float(value), 1)
+    except (TypeError, ValueError):
+        return str(value)
+
+def _clean_weather(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "Unknown"
+    return str(value)
+
+# =====================================================
+# FUNCTION: One row per sensor location, in map order
+# Indexes the frame once (first row per location, as the
+# renderer always used) instead of filtering per location
+# Missing locations come back as NaN rows
+# =====================================================
+def index_by_location(df):
+    if df is None or "Location" not in df.columns:
+        return pd.DataFrame(index=pd.Index(list(LOCATION_COORDINATES), name="Location"))
+    return df.drop_duplicates("Location").set_index("Location").reindex(list(LOCATION_COORDINATES))
+
+# =====================================================
+# FUNCTION: Build the per-request heatmap payload
+# label is the date (or season) shown in the info box
+# color_counts: optional per-row values to color by instead
+# of Interval_Count (range maps color by their hourly mean)
+# =====================================================
+def build_heatmap_payload(df, selected_type, label, time_filter, color_counts=None):
+    traffic_label = selected_type.replace(" Count", "")
+
+    rows = index_by_location(df)
+    has_row = rows.index.isin(df["Location"]) if df is not None and "Location" in df.columns else np.zeros(len(rows), bool)
+
+    if "Interval_Count" in rows.columns:
+        counts = pd.to_numeric(rows["Interval_Count"], errors="coerce").fillna(0).astype(int).to_numpy()
+    else:
+        counts = np.zeros(len(rows), dtype=int)
+    if color_counts is not None and df is not None and "Location" in df.columns:
+        scale = pd.Series(np.asarray(color_counts, dtype=float), index=df["Location"])
+        scale = scale[~scale.index.duplicated()].reindex(rows.index).fillna(0).to_numpy()
+    else:
+        scale = counts
+    colors = np.where(counts > 0, colors_for_counts(scale, selected_type), NO_DATA_COLOR)
+
+    def column(name, default):
+        return rows[name].tolist() if name in rows.columns else [default] * len(rows)
+
+    dt_strings = column("DateTime_String", "Unknown")
+    weathers = column("Weather", "Unknown")
+    temperatures = column("Temperature", "?")
+
+    locations = []
+    for i, loc in enumerate(rows.index):
+        lat, lon = LOCATION_COORDINATES[loc]
+        dt_string = dt_strings[i] if has_row[i] else "Unknown"
+        show_date, show_time, show_season = get_tooltip_fields(dt_string)
+
+        locations.append({
+            "name": loc,
+            "lat": lat,
+            "lon": lon,
+            "count": int(counts[i]),
+            "color": str(colors[i]),
+            "date": show_date,
+            "time": show_time,
+            "season": show_season,
+            "weather": _clean_weather(weathers[i]) if has_row[i] else "Unknown",
+            "temperature": _clean_temperature(temperatures[i]) if has_row[i] else "?"
+        })
+
+    return {
+        "date": label,
+        "time": time_filter,
+        "traffic_type": selected_type,
+        "type_label": traffic_label,
+        "type_color": TYPE_COLOR_MAP.get(traffic_label, "#ccc"),
+        "season": get_current_season(label) or "N/A",
+        "duration": convert_time_to_duration(time_filter or "All"),
+        "locations": locations
+    }
+
+# =====================================================
+# FUNCTION: Build the 24-hour timeline payload
+# day_df: one day of one type (fetch_day_traffic_data)
+# Each frame is a regular heatmap payload for that hour
+# =====================================================
+def build_day_timeline_payload(day_df, selected_type, date_filter, start_hour=0):
+    frames = [
+        build_heatmap_payload(
+            filter_hour_window(day_df, date_filter, f"{hour:02}:00:00", selected_type),
+            selected_type, date_filter, f"{hour:02}:00:00"
+        )
+        for hour in range(24)
+    ]
+    return {
+        "date": date_filter,
+        "traffic_type": selected_type,
+        "start_hour": start_hour,
+        "frames": frames
+    }
@@ -26,8 +26,8 @@ def get_location_data():
             SELECT
                 pd.Location,
                 MAX(pd.Date_Time) AS latest_timestamp,
-                MAX(wsd.Weather) AS weather,
-                MAX(wsd.Temperature) AS temperature,
+                MAX(wh.Weather) AS weather,
+                MAX(wh.Temperature) AS temperature,
                 MAX(wsd.Season) AS season,
                 SUM(CASE WHEN tc.Traffic_Type = 'Pedestrian Count' THEN tc.Total_Count ELSE 0 END) AS pedestrian_total,
                 SUM(CASE WHEN tc.Traffic_Type = 'Vehicle Count' THEN tc.Total_Count ELSE 0 END) AS vehicle_total,
@@ -35,6 +35,7 @@ def get_location_data():
             FROM processed_data pd
             JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
             JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
             WHERE pd.Location = %s
             GROUP BY pd.Location;
         """, (location,))
@@ -0,0 +1,123 @@
+# ===========================================================
+# Template Heatmap Renderer for Smart Foot Traffic
+# -----------------------------------------------------------
+# - Fast path for heatmap HTML: no Folium objects per request
+# - The static map shell (tiles, layer control, styling, bounds,
+#   public transport icons) is rendered once and cached
+# - Each request only injects a small JSON payload that
+#   heatmap_client.js draws on the map (same look as Folium)
+# - Also builds heatmaps/viewer.html: the same shell with no data,
+#   drawing whatever /api/heatmap_data returns in the browser
+# - Also builds day timeline pages: the same shell with all 24
+#   hourly payloads and a slider (templates/heatmap_timeline.js)
+# - render_heatmap_map() in map_renderer stays the reference path
+# ===========================================================
+
+import json
+import os
+from threading import Lock
+
+from backend.utils.artifacts import write_artifact
+from backend.visualizer.services.heatmap_payload import build_day_timeline_payload, build_heatmap_payload
+from backend.visualizer.services.map_renderer import build_base_map
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+CLIENT_JS_PATH = os.path.join(TEMPLATE_DIR, "heatmap_client.js")
+VIEWER_JS_PATH = os.path.join(TEMPLATE_DIR, "heatmap_viewer.js")
+TIMELINE_JS_PATH = os.path.join(TEMPLATE_DIR, "heatmap_timeline.js")
+
+# Static client-side heatmap page (served from /heatmaps/viewer.html)
+VIEWER_FILE = os.path.join("heatmaps", "viewer.html")
+
+_shell_lock = Lock()
+_shell = None  # (page_html_without_closing_tag, map_variable_name, client_js)
+
+# Same minification generate_heatmap has always applied
+def minify_html(html):
+    return ''.join(line.strip() for line in html.splitlines())
+
+# JSON that is safe to drop inside a <script> tag
+def to_script_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+def load_client_js():
+    with open(CLIENT_JS_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+# =====================================================
+# FUNCTION: Build (once) and return the static map shell
+# =====================================================
+def get_map_shell():
+    global _shell
+    if _shell is None:
+        with _shell_lock:
+            if _shell is None:
+                base_map = build_base_map()
+                html = minify_html(base_map.get_root().render())
+                head, _, _ = html.rpartition("</html>")
+                _shell = (head, base_map.get_name(), minify_html(load_client_js()))
+    return _shell
+
+# Drops the cached shell (e.g. after the PT stops file changes)
+def reset_map_shell():
+    global _shell
+    with _shell_lock:
+        _shell = None
+
+# =====================================================
+# FUNCTION: Render a heatmap page from a payload
+# =====================================================
+def render_payload_html(payload):
+    head, map_name, client_js = get_map_shell()
+    return (
+        f"{head}"
+        f"<script>{client_js}</script>"
+        f"<script>renderHeatmap({map_name}, {to_script_json(payload)});</script>"
+        f"</html>"
+    )
+
+# =====================================================
+# FUNCTION: Render the static viewer page
+# Same shell, but the data comes from /api/heatmap_data
+# in the browser, so one cached page serves every heatmap
+# =====================================================
+def render_viewer_html():
+    head, map_name, client_js = get_map_shell()
+    with open(VIEWER_JS_PATH, "r", encoding="utf-8") as f:
+        viewer_js = minify_html(f.read())
+    return (
+        f"{head}"
+        f"<script>{client_js}</script>"
+        f"<script>{viewer_js}</script>"
+        f"<script>startHeatmapViewer({map_name});</script>"
+        f"</html>"
+    )
+
+def write_viewer_page(path=VIEWER_FILE):
+    return write_artifact(path, render_viewer_html())
+
+# =====================================================
+# FUNCTION: Render a heatmap page from a DataFrame
+# Drop-in for render_heatmap_map(...).get_root().render()
+# Returns the minified HTML string
+# =====================================================
+def render_heatmap_html(df, selected_type, label, time_filter):
+    payload = build_heatmap_payload(df, selected_type, label, time_filter)
+    return render_payload_html(payload)
+
+# =====================================================
+# FUNCTION: Render a day timeline page
+# One page, all 24 hours; the slider swaps frames in the browser
+# =====================================================
+def render_timeline_html(day_df, selected_type, date_filter, start_hour=0):
+    head, map_name, client_js = get_map_shell()
+    with open(TIMELINE_JS_PATH, "r", encoding="utf-8") as f:
+        timeline_js = minify_html(f.read())
+    timeline = build_day_timeline_payload(day_df, selected_type, date_filter, start_hour)
+    return (
+        f"{head}"
+        f"<script>{client_js}</script>"
+        f"<script>{timeline_js}</script>"
+        f"<script>startHeatmapTimeline({map_name}, {to_script_json(timeline)});</script>"
+        f"</html>"
+    )
@@ -0,0 +1,72 @@
+/* ===========================================================
+   Chart Viewer Loader for Smart Foot Traffic
+   -----------------------------------------------------------
+   - Runs inside the static charts/viewer.html page
+   - Reads the chart kind and its parameters from the URL hash
+     (or query string), e.g.
+     viewer.html#kind=line_chart&date=2024-03-04&traffic_type=Pedestrian%20Count
+   - Fetches /api/chart/<kind> (a Plotly figure as JSON) and
+     redraws in place with Plotly.react
+   - Parent pages can call loadChart(kind, params) or
+     postMessage({kind, ...params}) to switch without a reload
+   - Block comments only: the page is minified line by line
+   =========================================================== */
+
+function startChartViewer() {
+    var chart = document.getElementById("chart");
+    var title = document.querySelector("h2");
+    var requestId = 0;
+
+    function currentParams() {
+        var source = window.location.hash ? window.location.hash.substring(1) : window.location.search.substring(1);
+        return new URLSearchParams(source);
+    }
+
+    function showError(message) {
+        title.textContent = message;
+        Plotly.purge(chart);
+    }
+
+    function load() {
+        var params = currentParams();
+        var kind = params.get("kind");
+        if (!kind) {
+            return;
+        }
+        params.delete("kind");
+        var thisRequest = ++requestId;
+
+        fetch("/api/chart/" + encodeURIComponent(kind) + "?" + params.toString())
+            .then(function (response) { return response.json(); })
+            .then(function (spec) {
+                /* A newer selection may have been made while this one was loading */
+                if (thisRequest !== requestId) {
+                    return;
+                }
+                if (spec.status === "error") {
+                    showError(spec.message);
+                    return;
+                }
+                title.textContent = spec.title;
+                Plotly.react(chart, spec.figure.data, spec.figure.layout, {responsive: true});
+            })
+            .catch(function (err) { console.error("Chart request failed:", err); });
+    }
+
+    window.loadChart = function (kind, params) {
+        var query = new URLSearchParams(params || {});
+        query.set("kind", kind);
+        window.location.hash = query.toString();
+    };
+
+    window.addEventListener("hashchange", load);
+    window.addEventListener("message", function (event) {
+        if (event.data && event.data.kind) {
+            var params = Object.assign({}, event.data);
+            delete params.kind;
+            window.loadChart(event.data.kind, params);
+        }
+    });
+
+    load();
+}
@@ -0,0 +1,112 @@
+/* ===========================================================
+   Heatmap Client Renderer for Smart Foot Traffic
+   -----------------------------------------------------------
+   - Draws the per-request heatmap layer on an existing Leaflet map
+   - Input is the payload from services/heatmap_payload.py
+   - Mirrors the Folium renderer: zone circles with tooltips,
+     center count labels and the info box (same markup/styles)
+   - Block comments only: generated pages are minified line by line
+   =========================================================== */
+
+var BRIGHT_COLORS = ["#FFEB33", "#FFF066", "#FFF599", "#FFFACB", "#F0F9A3"];
+
+function escapeHtml(value) {
+    return String(value)
+        .replace(/&/g, "&amp;")
+        .replace(/</g, "&lt;")
+        .replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;");
+}
+
+/* Same as marker_helpers.abbreviate_count (e.g. 47000 -> 47K) */
+function abbreviateCount(count) {
+    if (count >= 1000000) {
+        return (Math.floor(count / 100000) / 10).toFixed(1) + "M";
+    } else if (count >= 10000) {
+        return Math.floor(count / 1000) + "K";
+    }
+    return String(count);
+}
+
+/* Temperatures arrive rounded to one decimal, text values as-is */
+function formatTemperature(value) {
+    return typeof value === "number" ? value.toFixed(1) : escapeHtml(value);
+}
+
+/* Same markup as tooltip_box.build_tooltip_html */
+function tooltipHtml(payload, item) {
+    var row = '<div style="display: flex; justify-content: space-between;">';
+    var hr = '<hr style="margin: 8px 0; border: none; height: 1px; background-color: #444;">';
+    return '<div style="font-size: 14px;line-height: 1.6;font-weight: normal;border: 1px solid #ccc;' +
+        'border-radius: 10px;padding: 14px 16px;background-color: #ffffff;' +
+        'box-shadow: 0 4px 10px rgba(0, 0, 0, 0.15);width: 350px;">' +
+        '<div style="font-weight: bold; font-size: 16px; margin-bottom: 8px;">📍 ' + escapeHtml(item.name) + '</div>' +
+        hr +
+        '<div style="display: flex; align-items: center; justify-content: space-between;">' +
+        '<span><b>🚦 Type:</b></span><span style="display:flex; align-items:center;">' +
+        '<span style="display:inline-block; width:14px; height:14px; background-color:' + payload.type_color +
+        '; border-radius:3px; margin-right:8px;"></span>' + escapeHtml(payload.type_label) + '</span></div>' +
+        row + '<span><b>🔢 Count:</b></span> <span>' + item.count + '</span></div>' +
+        row + '<span><b>📅 Date:</b></span> <span>' + escapeHtml(item.date) + '</span></div>' +
+        row + '<span><b>🕒 Time:</b></span> <span>' + escapeHtml(item.time) + '</span></div>' +
+        hr +
+        row + '<span><b>🌿 Season:</b></span> <span>' + escapeHtml(item.season) + '</span></div>' +
+        row + '<span><b>☁️ Weather:</b></span> <span>' + escapeHtml(item.weather) + '</span></div>' +
+        row + '<span><b>🌡️ Temperature:</b></span> <span>' + formatTemperature(item.temperature) + '°C</span></div>' +
+        hr +
+        '<div style="font-size: 14px; color: #888; text-align: center;">Smart Foot Traffic System 🚶‍♂️🚴‍♀️🚗</div>' +
+        '</div>';
+}
+
+/* Same markup as description_box.generate_description_box */
+function descriptionHtml(payload) {
+    return '<div style="position: absolute;top: 10px;left: 10px;width: 240px;background-color: #fff;' +
+        'border: 1px solid #444;z-index: 9999;font-size: 16px;padding: 12px;border-radius: 8px;' +
+        'box-shadow: 0 2px 6px rgba(0, 0, 0, 0.2);line-height: 1.4;">' +
+        '<b style="color:#0275d8;">ℹ️ Heatmap Info</b><br>' +
+        '<hr style="margin: 8px 0; border: none; height: 1px; background-color: #444;">' +
+        '<b>🌦️ Season:</b> ' + escapeHtml(payload.season) + '<br>' +
+        '<b>🗓️ Date:</b> ' + escapeHtml(payload.date) + '<br>' +
+        '<b>🕒 Time:</b> ' + escapeHtml(payload.duration) + '<br>' +
+        '<b>📊 Type:</b> ' + escapeHtml(payload.type_label) + '<br>' +
+        '</div>';
+}
+
+/* Draws the payload on the map; returns the layer so callers can
+   remove it when switching hour/type. Redraws replace the info box. */
+function renderHeatmap(map, payload) {
+    var layer = L.layerGroup();
+
+    payload.locations.forEach(function (item) {
+        L.circleMarker([item.lat, item.lon], {
+            radius: 35,
+            color: item.color,
+            fill: true,
+            fillColor: item.color,
+            fillOpacity: 0.7
+        }).bindTooltip("<div>" + tooltipHtml(payload, item) + "</div>", {sticky: true}).addTo(layer);
+
+        var textColor = BRIGHT_COLORS.indexOf(item.color) >= 0 ? "#000000" : "#FFFFFF";
+        L.marker([item.lat, item.lon], {
+            icon: L.divIcon({
+                className: "empty",
+                iconSize: [40, 20],
+                iconAnchor: [20, 10],
+                html: '<div style="font-size: 14px; font-weight: 800; color: ' + textColor +
+                    '; text-align: center;">' + abbreviateCount(item.count) + '</div>'
+            })
+        }).addTo(layer);
+    });
+
+    layer.addTo(map);
+
+    var box = document.getElementById("heatmap-info");
+    if (!box) {
+        box = document.createElement("div");
+        box.id = "heatmap-info";
+        document.body.appendChild(box);
+    }
+    box.innerHTML = descriptionHtml(payload);
+
+    return layer;
+}
@@ -0,0 +1,75 @@
+/* ===========================================================
+   Day Timeline Control for Smart Foot Traffic
+   -----------------------------------------------------------
+   - Runs inside heatmaps/timeline_*.html pages
+   - timeline.frames holds one heatmap payload per hour (00-23),
+     all embedded in the page by the server
+   - A slider (plus play/pause) swaps the drawn frame client-side,
+     no requests after the page has loaded
+   - Start hour comes from the URL hash (#hour=08) if given
+   - Block comments only: the page is minified line by line
+   =========================================================== */
+
+function startHeatmapTimeline(map, timeline) {
+    var frames = timeline.frames;
+    var layer = null;
+    var timer = null;
+    var index = 0;
+
+    var control = L.control({position: "bottomleft"});
+    control.onAdd = function () {
+        var div = L.DomUtil.create("div");
+        div.style.cssText = "background:#fff;border:1px solid #444;border-radius:8px;padding:8px 12px;" +
+            "font-size:14px;box-shadow:0 2px 6px rgba(0,0,0,0.2);";
+        div.innerHTML = '<button id="timeline-play" style="margin-right:8px;width:32px;">&#9654;</button>' +
+            '<input id="timeline-slider" type="range" min="0" max="' + (frames.length - 1) + '" step="1" value="0" ' +
+            'style="width:260px;vertical-align:middle;">' +
+            '<b id="timeline-label" style="margin-left:8px;"></b>';
+        L.DomEvent.disableClickPropagation(div);
+        L.DomEvent.disableScrollPropagation(div);
+        return div;
+    };
+    control.addTo(map);
+
+    var slider = document.getElementById("timeline-slider");
+    var label = document.getElementById("timeline-label");
+    var play = document.getElementById("timeline-play");
+
+    function show(i) {
+        index = i;
+        if (layer) {
+            map.removeLayer(layer);
+        }
+        layer = renderHeatmap(map, frames[i]);
+        slider.value = i;
+        label.textContent = frames[i].time.substring(0, 5);
+    }
+
+    function stop() {
+        if (timer) {
+            clearInterval(timer);
+            timer = null;
+        }
+        play.innerHTML = "&#9654;";
+    }
+
+    slider.addEventListener("input", function () {
+        stop();
+        show(parseInt(slider.value, 10));
+    });
+
+    play.addEventListener("click", function () {
+        if (timer) {
+            stop();
+            return;
+        }
+        play.innerHTML = "&#10074;&#10074;";
+        timer = setInterval(function () {
+            show((index + 1) % frames.length);
+        }, timeline.interval_ms || 1000);
+    });
+
+    var hash = new URLSearchParams(window.location.hash.substring(1));
+    var startHour = parseInt(hash.get("hour") || timeline.start_hour || "0", 10);
+    show(Math.min(Math.max(startHour, 0), frames.length - 1));
+}
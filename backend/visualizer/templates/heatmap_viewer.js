@@ -0,0 +1,67 @@
+/* ===========================================================
+   Heatmap Viewer Loader for Smart Foot Traffic
+   -----------------------------------------------------------
+   - Runs inside the static heatmaps/viewer.html page
+   - Reads date/time/type from the URL hash (or query string)
+     e.g. viewer.html#date=2024-03-04&time=08:00:00&type=Pedestrian%20Count
+   - Fetches /api/heatmap_data and redraws only the data layer
+   - Parent pages can call loadHeatmap(date, time, type) or
+     postMessage({date, time, type}) to switch without a reload
+   - Block comments only: the page is minified line by line
+   =========================================================== */
+
+function startHeatmapViewer(map) {
+    var layer = null;
+    var requestId = 0;
+
+    function currentParams() {
+        var source = window.location.hash ? window.location.hash.substring(1) : window.location.search.substring(1);
+        return new URLSearchParams(source);
+    }
+
+    function load() {
+        var params = currentParams();
+        if (!params.get("date")) {
+            return;
+        }
+
+        var query = new URLSearchParams({
+            date: params.get("date"),
+            time: params.get("time") || "",
+            type: params.get("type") || "Pedestrian Count"
+        });
+        var thisRequest = ++requestId;
+
+        fetch("/api/heatmap_data?" + query.toString())
+            .then(function (response) { return response.json(); })
+            .then(function (payload) {
+                /* A newer selection may have been made while this one was loading */
+                if (thisRequest !== requestId) {
+                    return;
+                }
+                if (payload.status === "error") {
+                    console.error("Heatmap data error:", payload.message);
+                    return;
+                }
+                if (layer) {
+                    map.removeLayer(layer);
+                }
+                layer = renderHeatmap(map, payload);
+            })
+            .catch(function (err) { console.error("Heatmap data request failed:", err); });
+    }
+
+    window.loadHeatmap = function (date, time, type) {
+        var params = new URLSearchParams({date: date, time: time || "", type: type || "Pedestrian Count"});
+        window.location.hash = params.toString();
+    };
+
+    window.addEventListener("hashchange", load);
+    window.addEventListener("message", function (event) {
+        if (event.data && event.data.date) {
+            window.loadHeatmap(event.data.date, event.data.time, event.data.type);
+        }
+    });
+
+    load();
+}
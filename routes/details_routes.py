@@ -32,12 +32,13 @@ def location_snapshot():
                 tc.Traffic_Type,
                 tc.Interval_Count,
                 pd.Date_Time,
-                wsd.Weather,
+                wh.Weather,
                 wsd.Season,
-                wsd.Temperature
+                wh.Temperature
             FROM processed_data pd
             JOIN traffic_counts tc ON pd.Data_ID = tc.Data_ID
             JOIN weather_season_data wsd ON pd.Data_ID = wsd.Data_ID
+            LEFT JOIN weather_hourly wh ON wh.Location = pd.Location AND wh.Hour_TS = pd.Date_Time
             WHERE DATE(pd.Date_Time) = %s
               AND TIME(pd.Date_Time) = %s
               AND tc.Traffic_Type = %s
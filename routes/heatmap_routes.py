@@ -2,13 +2,27 @@
 # Heatmap API Route for Smart Foot Traffic
 # ----------------------------------------------------
 # - Accepts date, time, and type from frontend
-# - Calls smart_generate to build heatmap + bar chart
-# - Returns URLs to generated HTML files
+# - Queues smart_generate (heatmap) in the generation worker pool
+# - Returns a job ID and the URLs the HTML files will have
+# - mode "timeline" builds one page with all 24 hours and a slider
+# - mode "range" sums/averages a from-to date range per location,
+#   optionally only some hours and weekdays (served from rollups)
+# - Identical concurrent requests share one job / render
 # - Used by /api/generate_heatmap endpoint
+# - /api/heatmap_data returns just the per-location values as JSON
+#   for the static heatmaps/viewer.html page
+# - /api/prerender queues a batch pre-render for a date range
 # ====================================================
 
 from flask import Blueprint, request, jsonify
-from backend.visualizer.generator.smart_generate import smart_generate
+from backend.forecast.weather_index import is_weather_complete
+from backend.forecast.weather_jobs import enqueue_weather_assignment
+from backend.jobs.async_jobs import QueueFullError
+from backend.jobs.generation_jobs import submit_generation
+from backend.pipeline.helpers.helpers import TRAFFIC_TYPES
+from backend.visualizer.generator.batch_render import enqueue_prerender
+from backend.visualizer.services.data_fetcher import fetch_traffic_data
+from backend.visualizer.services.heatmap_payload import build_heatmap_payload
 from rich.console import Console
 
 # Blueprint setup
@@ -24,32 +38,81 @@ def api_generate_heatmap():
         data = request.get_json(force=True)
         console.print(f"Data received: [green]{data}[/green]")
 
-        date_filter = data.get('date')
-        time_filter = data.get('time')
-        traffic_type = data.get('traffic_type')
+        # Day timeline: one page for all 24 hours, no time needed
+        # Range: {"mode": "range", "from": ..., "to": ..., "hours": [7, 8],
+        #         "weekdays": ["mon", "fri"], "agg": "avg"}
+        kind = data.get('mode') if data.get('mode') in ('timeline', 'range') else 'heatmap'
 
-        # Validate required fields
-        if not date_filter or not time_filter or not traffic_type:
-            console.print("[bold red]Missing required fields: date, time, or traffic_type[/bold red]")
-            return jsonify({"status": "error", "message": "Missing date, time, or traffic_type"}), 400
+        # Queue the render; the worker pool does the work, this thread returns now
+        job, created = submit_generation(kind, data, request.host_url.rstrip('/'))
+        console.print(f"[green]{'Queued' if created else 'Already queued'} {kind} job {job['job_id']}[/green]")
 
-        # Call backend generator
-        console.print("[yellow]Calling smart_generate...[/yellow]")
-        smart_generate(date_filter, time_filter, traffic_type)
-        console.print("[green]smart_generate completed successfully.[/green]")
-        console.print("[bold magenta]" + "=" * 50 + "[/bold magenta]\n")
-
-        # Build URLs
-        base_url = request.host_url.rstrip('/')
-        time_str = (time_filter or 'all').replace(':', '-')
-        type_str = traffic_type.replace(' ', '_')
+        urls = dict(job["urls"])
+        if kind == 'timeline':
+            urls["timeline_url"] += f"#hour={(data.get('time') or '00')[:2]}"
 
         return jsonify({
             "status": "generating",
-            "heatmap_url": f"{base_url}/heatmaps/heatmap_{date_filter}_{time_str}_{type_str}.html",
-            "barchart_url": f"{base_url}/barchart/bar_{date_filter}_{time_str}_{type_str}.html"
+            "job_id": job["job_id"],
+            "job_url": f"{request.host_url.rstrip('/')}/api/jobs/{job['job_id']}",
+            **urls
         }), 202
 
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503, {"Retry-After": "5"}
     except Exception as e:
         console.print(f"[bold red]ERROR in /api/generate_heatmap:[/bold red] {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
+
+# Per-location counts, colors, weather and temperature (~2 KB)
+# e.g. /api/heatmap_data?date=2024-03-04&time=08:00:00&type=Pedestrian Count
+@heatmap_bp.route('/api/heatmap_data', methods=['GET'])
+def api_heatmap_data():
+    date_filter = request.args.get('date')
+    time_filter = request.args.get('time')
+    traffic_type = request.args.get('type', 'Pedestrian Count')
+
+    if not date_filter or not time_filter:
+        return jsonify({"status": "error", "message": "Missing date or time"}), 400
+
+    try:
+        df = fetch_traffic_data(date_filter, time_filter, traffic_type)
+
+        if not is_weather_complete(date_filter):
+            enqueue_weather_assignment(date_filter)
+
+        response = jsonify(build_heatmap_payload(df, traffic_type, date_filter, time_filter))
+        response.headers['Cache-Control'] = 'public, max-age=300'
+        return response, 200
+
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        console.print(f"[bold red]ERROR in /api/heatmap_data:[/bold red] {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# Pre-warms every hour x type for a date range in the background
+# e.g. {"from": "2025-03-01", "to": "2025-05-31", "types": ["Vehicle Count"], "force": false}
+@heatmap_bp.route('/api/prerender', methods=['POST'])
+def api_prerender():
+    data = request.get_json(force=True) or {}
+    date_from = data.get('from')
+    date_to = data.get('to') or date_from
+    traffic_types = data.get('types') or TRAFFIC_TYPES
+
+    if not date_from:
+        return jsonify({"status": "error", "message": "Missing from date"}), 400
+    unknown = [t for t in traffic_types if t not in TRAFFIC_TYPES]
+    if unknown:
+        return jsonify({"status": "error", "message": f"Unknown traffic types: {unknown}"}), 400
+
+    queued = enqueue_prerender(date_from, date_to, traffic_types, bool(data.get('force')))
+    return jsonify({
+        "status": "queued" if queued else "already_queued",
+        "from": date_from,
+        "to": date_to,
+        "types": traffic_types
+    }), 202
@@ -0,0 +1,61 @@
+# ====================================================
+# Background Job Routes for Smart Foot Traffic
+# ----------------------------------------------------
+# - Reports queue depth, running jobs and failures
+# - Covers the weather/temperature assignment queue,
+#   the batch pre-render queue and the generation pool
+# - Also reports hit/miss stats of the traffic day cache and
+#   the in-memory summary cache, and coalesced (single-flight)
+#   generation requests
+# - Plus DB pool size and checked-out connections
+# - POST /api/jobs queues any generation job (heatmap, timeline, range,
+#   bar_chart, bar_chart_day, line_chart, pie_chart, forecast, report)
+# - GET /api/jobs/<id> returns a job's state, timings and result
+# - Used by /api/jobs/status endpoint
+# ====================================================
+
+from flask import Blueprint, jsonify, request
+from backend.analytics.statistics import summary_memory
+from backend.db.connection import pool_status
+from backend.forecast.weather_jobs import weather_queue
+from backend.jobs.async_jobs import QueueFullError
+from backend.jobs.generation_jobs import generation_pool, submit_generation
+from backend.jobs.single_flight import generation_flight
+from backend.visualizer.generator.batch_render import prerender_queue
+from backend.visualizer.generator.smart_generate import day_cache
+
+jobs_bp = Blueprint('jobs_bp', __name__)
+
+@jobs_bp.route('/api/jobs/status', methods=['GET'])
+def jobs_status():
+    return jsonify({
+        "weather": weather_queue.status(),
+        "prerender": prerender_queue.status(),
+        "generation": generation_pool.status(),
+        "traffic_cache": day_cache.stats(),
+        "summary_cache": summary_memory.stats(),
+        "single_flight": generation_flight.status(),
+        "db_pool": pool_status()
+    }), 200
+
+# e.g. {"kind": "line_chart", "date": "2024-03-04", "traffic_type": "Pedestrian Count"}
+@jobs_bp.route('/api/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json(force=True) or {}
+    try:
+        job, created = submit_generation(data.get('kind'), data, request.host_url.rstrip('/'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503, {"Retry-After": "5"}
+
+    job["job_url"] = f"{request.host_url.rstrip('/')}/api/jobs/{job['job_id']}"
+    job["created"] = created
+    return jsonify(job), 202
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = generation_pool.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown job {job_id}"}), 404
+    return jsonify(job), 200
@@ -0,0 +1,70 @@
+# ====================================================
+# Metrics Route for Smart Foot Traffic
+# ----------------------------------------------------
+# - GET /metrics in Prometheus text format
+# - Stage latency histograms of the heatmap, summary, chart and
+#   forecast generators (sft_generation_stage_seconds)
+# - DB pool checkout waits (sft_db_pool_checkout_seconds)
+# - Live values read at scrape time: traffic/summary cache hit ratio,
+#   queue depth / running jobs of every job queue, single-flight
+#   counts and checked-out DB connections
+# - Same objects /api/jobs/status reports, as numbers
+# ====================================================
+
+from flask import Blueprint, Response
+from backend.analytics.statistics import summary_memory
+from backend.db.connection import pool_status
+from backend.forecast.weather_jobs import weather_queue
+from backend.jobs.generation_jobs import generation_pool
+from backend.jobs.single_flight import generation_flight
+from backend.utils.metrics import registry
+from backend.visualizer.generator.batch_render import prerender_queue
+from backend.visualizer.generator.smart_generate import day_cache
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+CACHES = [day_cache, summary_memory]
+QUEUES = [weather_queue, prerender_queue, generation_pool]
+
+def _cache_samples(field):
+    def collect():
+        for cache in CACHES:
+            stats = cache.stats()
+            value = stats["counts"][field] if field in stats["counts"] else stats[field]
+            yield {"cache": cache.name}, value
+    return collect
+
+def _queue_samples(field):
+    def collect():
+        for job_queue in QUEUES:
+            status = job_queue.status()
+            value = len(status["running"]) if field == "running" else status[field]
+            yield {"queue": job_queue.name}, value
+    return collect
+
+def _queue_counts():
+    for job_queue in QUEUES:
+        for outcome, count in job_queue.status()["counts"].items():
+            yield {"queue": job_queue.name, "outcome": outcome}, count
+
+def _flight_counts():
+    for outcome, count in generation_flight.status()["counts"].items():
+        yield {"outcome": outcome}, count
+
+registry.collect("sft_cache_hits_total", "Cache lookups that found an entry", "counter", _cache_samples("hits"))
+registry.collect("sft_cache_misses_total", "Cache lookups that found nothing", "counter", _cache_samples("misses"))
+registry.collect("sft_cache_evictions_total", "Entries evicted to make room", "counter", _cache_samples("evictions"))
+registry.collect("sft_cache_hit_ratio", "Hits / lookups since start", "gauge", _cache_samples("hit_rate"))
+registry.collect("sft_cache_bytes", "Bytes held by the cache", "gauge", _cache_samples("bytes"))
+registry.collect("sft_job_queue_depth", "Jobs waiting in the queue", "gauge", _queue_samples("queue_depth"))
+registry.collect("sft_job_running", "Jobs currently running", "gauge", _queue_samples("running"))
+registry.collect("sft_jobs_total", "Jobs by outcome (submitted, deduped, completed, failed ...)", "counter", _queue_counts)
+registry.collect("sft_single_flight_total", "Coalesced calls by outcome (executed, shared, failed)", "counter", _flight_counts)
+registry.collect(
+    "sft_db_pool_connections", "Pool size and connections checked out", "gauge",
+    lambda: [({"state": state}, value) for state, value in pool_status().items()]
+)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
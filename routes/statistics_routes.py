@@ -5,14 +5,23 @@
 # - Calls analytics engine for traffic data and trends
 # - Returns JSON for frontend charts and dashboard
 # - Used by /api/summary_stats and /api/seasonal_stats
+# - Identical concurrent summary/line chart requests share
+#   one computation (single flight)
+# - /api/chart/<kind> returns a chart as Plotly figure JSON
+#   (line_chart, bar_chart, pie_chart, forecast) for the static
+#   charts/viewer.html page
 # ====================================================
 
 import os
 from flask import Blueprint, request, jsonify
+from backend.analytics.chart_spec import get_chart_spec, normalize_chart_params
 from backend.analytics.daily_linechart import generate_line_charts_combined
 from backend.analytics.distribution_pie import generate_combined_pie_dashboard
 from backend.analytics.model import generate_forecast_chart
 from backend.analytics.statistics import get_summary_stats
+from backend.jobs.single_flight import generation_flight, make_key
+from backend.pipeline.helpers.helpers import normalize_time
+from backend.utils.artifacts import send_artifact
 
 stats_bp = Blueprint('stats_bp', __name__)
 
@@ -20,7 +29,12 @@ stats_bp = Blueprint('stats_bp', __name__)
 def api_summary_stats():
     try:
         data = request.get_json()
-        return jsonify(get_summary_stats(data['date'], data['time'], data['traffic_type'])), 200
+        date, time_input = str(data['date'])[:10], normalize_time(data['time'])
+        summary = generation_flight.do(
+            make_key("summary", date=date, time=time_input, traffic_type=data['traffic_type']),
+            get_summary_stats, date, time_input, data['traffic_type']
+        )
+        return jsonify(summary), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -33,7 +47,10 @@ def api_generate_linechart():
         safe_type = traffic_type.replace(" ", "")
         filename = f"line_{date}_{safe_type}.html"
 
-        output_path = generate_line_charts_combined(date, traffic_type)
+        output_path = generation_flight.do(
+            make_key("line_chart", date=date, traffic_type=traffic_type),
+            generate_line_charts_combined, date, traffic_type
+        )
 
         if output_path:
             return jsonify({
@@ -106,3 +123,26 @@ def api_generate_forecast():
             "status": "error",
             "message": str(e)
         }), 500
+
+# e.g. /api/chart/bar_chart?date=2024-03-04&time=08:00&traffic_type=Pedestrian Count
+@stats_bp.route("/api/chart/<kind>", methods=["GET"])
+def api_chart_spec(kind):
+    try:
+        params = normalize_chart_params(kind, request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        path = generation_flight.do(make_key(f"{kind}_spec", **params), get_chart_spec, kind, params)
+        if not path:
+            return jsonify({"status": "error", "message": "No data found to generate chart."}), 404
+
+        # Specs are rebuilt when the data version changes; revalidation is a 304
+        response = send_artifact(os.getcwd(), path)
+        response.cache_control.public = True
+        response.cache_control.max_age = 300
+        response.cache_control.no_cache = None
+        return response
+
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -3,16 +3,19 @@
 # ----------------------------------------------------
 # - Hosts Flask app and registers all API routes
 # - Serves heatmap and bar chart HTML files
+# - Serves the static chart viewer (charts/viewer.html) and chart specs
 # - Auto-generates default map on first request
 # - Adds CORS and basic security headers
 # ====================================================
 
 import time
-from flask import Flask, send_from_directory
+from flask import Flask, abort
 from flask_cors import CORS
 import os
 import logging
+from fnmatch import fnmatch
 from rich.console import Console
+from backend.utils.artifacts import send_artifact
 
 # Console setup
 console = Console()
@@ -26,6 +29,8 @@ from routes.heatmap_routes import heatmap_bp
 from routes.statistics_routes import stats_bp
 from routes.details_routes import snapshot_bp
 from routes.export_routes import export_bp
+from routes.jobs_routes import jobs_bp
+from routes.metrics_routes import metrics_bp
 
 # Suppress Werkzeug's default logs
 logging.getLogger('werkzeug').setLevel(logging.WARNING)
@@ -35,6 +40,8 @@ app.register_blueprint(heatmap_bp)
 app.register_blueprint(stats_bp)
 app.register_blueprint(snapshot_bp)
 app.register_blueprint(export_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(metrics_bp)
 
 # Folder Paths
 BASE_DIR = os.getcwd()
@@ -43,7 +50,18 @@ BARCHART_FOLDER = os.path.join(BASE_DIR, 'barchart')
 LINECHART_FOLDER = os.path.join(BASE_DIR, 'linecharts')
 PIECHART_FOLDER = os.path.join(BASE_DIR, 'piecharts')
 FORECAST_FOLDER = os.path.join(BASE_DIR, 'model_results')
+CHART_FOLDER = os.path.join(BASE_DIR, 'charts')
 default_map_generated = False
+viewer_generated = False
+chart_viewer_generated = False
+VIEWER_FILENAME = 'viewer.html'
+
+# Weather Completeness Index (one small query, then O(1) checks per request)
+from backend.forecast.weather_index import load_index
+try:
+    console.print(f"[cyan]Weather completeness index loaded ({load_index()} location-days)[/cyan]")
+except Exception as e:
+    console.print(f"[yellow]Weather completeness index not loaded yet:[/yellow] {e}")
 
 # Serve Heatmap HTML
 @app.route('/heatmaps/<path:filename>')
@@ -52,7 +70,16 @@ def serve_heatmap(filename):
     start = time.time()
     
     console.print(f"Requested heatmap file: [green]{filename}[/green]")
-    response = send_from_directory(HEATMAP_FOLDER, filename)
+    response = send_artifact(HEATMAP_FOLDER, filename)
+
+    # The viewer page has no data in it, browsers can keep it for a day
+    if filename == VIEWER_FILENAME:
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+    # Shared assets (PT layer) are linked with a content version, cache for a year
+    elif filename.startswith('assets/'):
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
     
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
@@ -65,7 +92,7 @@ def serve_barchart(filename):
     start = time.time()
     
     console.print(f"Requested bar chart file: [green]{filename}[/green]")
-    response = send_from_directory(BARCHART_FOLDER, filename)
+    response = send_artifact(BARCHART_FOLDER, filename)
     
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
@@ -79,7 +106,7 @@ def serve_linechart(filename):
 
     linechart_folder = os.path.join(os.getcwd(), 'linecharts')
     console.print(f"Requested line chart file: [green]{filename}[/green]")
-    response = send_from_directory(linechart_folder, filename)
+    response = send_artifact(linechart_folder, filename)
 
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
@@ -92,20 +119,42 @@ def serve_piechart(filename):
     start = time.time()
 
     console.print(f"Requested pie chart file: [green]{filename}[/green]")
-    response = send_from_directory(PIECHART_FOLDER, filename)
+    response = send_artifact(PIECHART_FOLDER, filename)
 
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
     return response
 
 # Serve Forecast Chart HTML
+# Only the chart pages: model_results also holds plots and fitted models
 @app.route('/forecast/<path:filename>')
 def serve_forecast_chart(filename):
     console.print("\n[bold magenta]========== Serving Forecast Chart ==========[/bold magenta]")
     start = time.time()
 
     console.print(f"Requested forecast chart file: [green]{filename}[/green]")
-    response = send_from_directory(FORECAST_FOLDER, filename)
+    if not fnmatch(filename, "forecast_chart_*.html") or "/" in filename:
+        abort(404)
+    response = send_artifact(FORECAST_FOLDER, filename)
+
+    duration = time.time() - start
+    console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
+    return response
+
+# Serve Chart Viewer and Chart Specs
+@app.route('/charts/<path:filename>')
+def serve_chart(filename):
+    console.print("\n[bold magenta]========== Serving Chart ==========[/bold magenta]")
+    start = time.time()
+
+    console.print(f"Requested chart file: [green]{filename}[/green]")
+    response = send_artifact(CHART_FOLDER, filename)
+
+    # One page for every chart kind, no data in it
+    if filename == VIEWER_FILENAME:
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+        response.cache_control.no_cache = None
 
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
@@ -118,7 +167,7 @@ def serve_exported_report(filename):
     start = time.time()
 
     console.print(f"Requested report file: [green]{filename}[/green]")
-    response = send_from_directory(os.path.join(BASE_DIR, 'downloads'), filename)
+    response = send_artifact(os.path.join(BASE_DIR, 'downloads'), filename)
 
     duration = time.time() - start
     console.print(f"[cyan]Time taken: {duration:.2f} seconds[/cyan]")
@@ -143,6 +192,30 @@ def ensure_default_map():
         except Exception as e:
             console.print(f"[bold red]Failed to generate default map:[/bold red] {e}")
 
+# Static Heatmap Viewer (rebuilt once per server start)
+@app.before_request
+def ensure_viewer_page():
+    global viewer_generated
+    if not viewer_generated:
+        from backend.visualizer.services.template_renderer import write_viewer_page
+        try:
+            write_viewer_page(os.path.join(HEATMAP_FOLDER, VIEWER_FILENAME))
+            viewer_generated = True
+        except Exception as e:
+            console.print(f"[bold red]Failed to generate heatmap viewer:[/bold red] {e}")
+
+# Static Chart Viewer (rebuilt once per server start)
+@app.before_request
+def ensure_chart_viewer_page():
+    global chart_viewer_generated
+    if not chart_viewer_generated:
+        from backend.analytics.chart_spec import write_chart_viewer_page
+        try:
+            write_chart_viewer_page(os.path.join(CHART_FOLDER, VIEWER_FILENAME))
+            chart_viewer_generated = True
+        except Exception as e:
+            console.print(f"[bold red]Failed to generate chart viewer:[/bold red] {e}")
+
 # CORS & Security Headers
 @app.after_request
 def apply_cors_headers(response):